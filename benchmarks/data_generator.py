@@ -0,0 +1,61 @@
+"""
+Time and peak memory to produce synthetic interactions: the previous
+DataFrame builder (timestamps from a list comprehension of timedeltas,
+whole frame at once) against streaming interaction_batches chunks.
+
+    python -m benchmarks.data_generator --rows 100000 1000000 5000000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.data.stream import MESSAGE_TEMPLATES, interaction_batches
+
+def legacy_channel_data(channel_type: str, n_samples: int) -> pd.DataFrame:
+    """IntegratedAnalysis.generate_channel_data as it was"""
+    data = {
+        'timestamp': [datetime.now() - timedelta(minutes=x) for x in range(n_samples)],
+        'channel': [channel_type] * n_samples,
+        'message': np.random.choice(MESSAGE_TEMPLATES[channel_type], n_samples),
+        'customer_id': [f'CUST-{i:04d}' for i in range(n_samples)],
+        'priority': np.random.choice(['high', 'medium', 'low'], n_samples),
+        'type': np.random.choice(['inquiry', 'complaint', 'support', 'feedback'], n_samples),
+        'response_time': np.random.exponential(2, n_samples),
+        'satisfaction_score': np.random.normal(4, 1, n_samples).clip(1, 5),
+        'customer_history_length': np.random.randint(0, 10, n_samples),
+        'agent_availability': np.random.uniform(0.5, 1.0, n_samples)
+    }
+    return pd.DataFrame(data)
+
+def measure(fn):
+    """Wall time of one run, then peak traced memory of another (tracing is slow)"""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    def consume_stream(n_rows):
+        for chunk in interaction_batches(n_rows, chunk_size=args.chunk_size, poisson=True):
+            pass
+
+    print(f"{'rows':>10} {'legacy':>10} {'peak':>10} {'stream':>10} {'peak':>10} {'rows/s':>14}")
+    for n_rows in args.rows:
+        legacy_seconds, legacy_peak = measure(lambda: legacy_channel_data('chat', n_rows))
+        stream_seconds, stream_peak = measure(lambda: consume_stream(n_rows))
+        print(f"{n_rows:>10} {legacy_seconds:>9.2f}s {legacy_peak:>8.0f}MB "
+              f"{stream_seconds:>9.2f}s {stream_peak:>8.0f}MB {n_rows / stream_seconds:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
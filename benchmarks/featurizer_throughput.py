@@ -0,0 +1,53 @@
+"""
+Throughput of TextFeaturizer on the customer messages from
+customer_serviice_analysis.py, one text per call against whole batches,
+alone and followed by the SentimentAnalyzer forward pass.
+
+    python -m benchmarks.featurizer_throughput --batch-sizes 1 32 1024 100000
+"""
+import argparse
+import time
+import numpy as np
+import torch
+from customer_serviice_analysis import generate_realistic_customer_data
+from src.models.featurizer import TextFeaturizer
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+LOOP_SAMPLE = 1000
+
+def make_messages(n_texts: int, seed: int = 0) -> list:
+    messages = [interaction['message'] for interaction in generate_realistic_customer_data()]
+    rng = np.random.default_rng(seed)
+    return [messages[i] for i in rng.integers(0, len(messages), n_texts)]
+
+def texts_per_second(fn, texts: list, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        fn(texts[offset:offset + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 1024, 100000])
+    parser.add_argument('--texts', type=int, default=100000)
+    args = parser.parse_args()
+
+    featurizer = TextFeaturizer()
+    model = SentimentAnalyzer(input_size=featurizer.n_features, hidden_size=64, num_classes=3).eval()
+
+    def featurize_and_predict(batch):
+        with torch.no_grad():
+            return model(torch.from_numpy(featurizer.transform(batch)))
+
+    texts = make_messages(args.texts)
+    print(f"{args.texts} messages, {featurizer.n_features} hashed features")
+    print(f"{'batch':>8} {'featurize':>14} {'+ forward':>14}")
+    for batch_size in args.batch_sizes:
+        # Per-text calls are timed on a sample only
+        sample = texts if batch_size >= LOOP_SAMPLE else texts[:LOOP_SAMPLE]
+        featurize = texts_per_second(featurizer.transform, sample, batch_size)
+        end_to_end = texts_per_second(featurize_and_predict, sample, batch_size)
+        print(f"{batch_size:>8} {featurize:>10,.0f}/s {end_to_end:>10,.0f}/s")
+
+if __name__ == "__main__":
+    main()
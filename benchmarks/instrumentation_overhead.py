@@ -0,0 +1,51 @@
+"""
+Overhead of the Prometheus histograms on the hot path: cost of one
+observation, and its share of an (uncached) route_request with the timing
+calls in place. Also reports the render time of a scrape.
+
+    python -m benchmarks.instrumentation_overhead --calls 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from benchmarks.router_batch import make_requests, trained_router
+from src.utils import instrumentation
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    histogram = instrumentation.MODEL_INFERENCE_SECONDS
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        histogram.observe(0.0042, 'sentiment')
+    per_observe = (time.perf_counter() - start) / args.calls
+    print(f"observe:             {per_observe * 1e9:8.0f} ns/call")
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(10000):
+        histogram.observe(0.0042, 'sentiment')
+    growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename')
+                 if stat.traceback[0].filename == instrumentation.__file__)
+    tracemalloc.stop()
+    print(f"memory growth:       {growth:8d} bytes over 10000 observations")
+
+    router = trained_router()
+    request = make_requests(1, seed=0).to_dict('records')[0]
+    n = args.calls // 10
+    start = time.perf_counter()
+    for _ in range(n):
+        router.route_request(request)
+    per_route = (time.perf_counter() - start) / n
+    print(f"route_request:       {per_route * 1e9:8.0f} ns/call, "
+          f"timing share {2 * per_observe / per_route:.1%} (estimated)")
+
+    start = time.perf_counter()
+    text = instrumentation.render()
+    print(f"render:              {(time.perf_counter() - start) * 1e3:8.2f} ms for "
+          f"{len(text.splitlines())} lines")
+
+if __name__ == "__main__":
+    main()
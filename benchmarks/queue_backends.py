@@ -0,0 +1,89 @@
+"""
+End-to-end cost of the queue itself, per backend: a producer submits N tasks
+in chunks (as POST /tasks does), keeping a few chunks in flight, and awaits
+every result while consumers
+claim batches and complete them with an echo result, so no model time is
+included. Reports tasks/sec and submit-to-result latency percentiles.
+
+The memory backend always runs. The Redis backends need a running Redis at
+settings.REDIS_HOST:REDIS_PORT and are skipped otherwise; they use the live
+queue keys, so point them at an idle instance.
+
+    python -m benchmarks.queue_backends --tasks 20000 --batch-size 100 --consumers 3 --in-flight 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import numpy as np
+from benchmarks.queue_roundtrips import make_tasks
+from src.distributed.backends import ListBackend, MemoryBackend, StreamBackend
+from src.distributed.backends.lists import worker_queue
+from src.distributed.memory_queue_manager import MemoryQueueManager
+
+async def consume(backend, consumer: str, batch_size: int, done: asyncio.Event):
+    while not done.is_set():
+        tasks = await backend.claim(consumer, batch_size, timeout=0.05)
+        if tasks:
+            results = [{'task_id': task['id'], 'result': {}} for task in tasks]
+            await backend.complete(consumer, tasks, results)
+
+async def run(backend, tasks, batch_size: int, consumers: int, submit_chunk: int, in_flight: int):
+    queue_manager = backend.queue_manager
+    latencies = []
+    slots = asyncio.Semaphore(in_flight)
+
+    async def submit_and_wait(chunk):
+        async with slots:
+            submitted = time.perf_counter()
+            waits = [asyncio.ensure_future(queue_manager.await_result(task['id'], 60)) for task in chunk]
+            await backend.submit(chunk)
+            for wait in asyncio.as_completed(waits):
+                if await wait is not None:
+                    latencies.append(time.perf_counter() - submitted)
+
+    done = asyncio.Event()
+    workers = [asyncio.create_task(consume(backend, worker_queue(i), batch_size, done))
+               for i in range(consumers)]
+    start = time.perf_counter()
+    await asyncio.gather(*[submit_and_wait(tasks[i:i + submit_chunk])
+                           for i in range(0, len(tasks), submit_chunk)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*workers)
+    return elapsed, np.array(latencies) * 1000
+
+async def redis_available(backend) -> bool:
+    try:
+        return await backend.queue_manager.redis_client.ping()
+    except Exception:
+        return False
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--consumers', type=int, default=3)
+    parser.add_argument('--submit-chunk', type=int, default=100)
+    parser.add_argument('--in-flight', type=int, default=4)
+    args = parser.parse_args()
+
+    backends = [MemoryBackend(MemoryQueueManager()), ListBackend(args.consumers),
+                StreamBackend(stream='bench:stream', group='bench')]
+    print(f"{'backend':<10} {'tasks':>7} {'seconds':>8} {'tasks/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for backend in backends:
+        if backend.name != 'memory' and not await redis_available(backend):
+            print(f"{backend.name:<10} skipped: no Redis at the configured host")
+            continue
+        tasks = make_tasks(args.tasks)
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, latencies = await run(backend, tasks, args.batch_size, args.consumers,
+                                           args.submit_chunk, args.in_flight)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        print(f"{backend.name:<10} {len(latencies):>7} {elapsed:>8.2f} {len(latencies) / elapsed:>9.0f} "
+              f"{p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
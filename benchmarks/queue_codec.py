@@ -0,0 +1,66 @@
+"""
+Payload size and encode/decode cost of each queue codec on the tasks that
+IntegratedAnalysis.process_interaction submits and the results a worker
+publishes for them (routed by the published models, or untrained ones).
+
+    python -m benchmarks.queue_codec --interactions 2000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import pandas as pd
+from run_integrated_analysis import IntegratedAnalysis
+from src.data.stream import interaction_batches
+from src.distributed.backends import MemoryBackend
+from src.distributed.codec import CODECS, decode
+from src.distributed.memory_queue_manager import MemoryQueueManager
+from src.distributed.queue_manager import stamp_enqueued
+from src.distributed.worker import Worker
+
+def build_payloads(n_interactions: int):
+    """Tasks and worker results keyed by task type, as they would be queued"""
+    interactions = pd.concat(interaction_batches(n_interactions, seed=0)).to_dict('records')
+    analysis = IntegratedAnalysis()
+    tasks = [stamp_enqueued(task) for interaction in interactions
+             for task in analysis.build_tasks(interaction)]
+    worker = Worker(0, backend=MemoryBackend(MemoryQueueManager()))
+    results = asyncio.run(worker.process_batch(tasks))
+    for result in results:
+        result['worker_id'] = worker.worker_id
+    shapes = {}
+    for kind, messages in (('task', tasks), ('result', results)):
+        for message in messages:
+            shapes.setdefault(f"{message['type']} {kind}", []).append(message)
+    return shapes
+
+def per_call_us(fn, items, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interactions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        shapes = build_payloads(args.interactions)
+    print(f"{'shape':<28} {'codec':<7} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for shape, messages in shapes.items():
+        for name, codec in CODECS.items():
+            payloads = [codec.encode(message) for message in messages]
+            assert all(decode(payload) == message for payload, message in zip(payloads, messages))
+            size = sum(map(len, payloads)) / len(payloads)
+            encode_us = per_call_us(codec.encode, messages, args.repeat)
+            decode_us = per_call_us(decode, payloads, args.repeat)
+            print(f"{shape:<28} {name:<7} {size:>7.1f} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+if __name__ == "__main__":
+    main()
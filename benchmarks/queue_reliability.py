@@ -0,0 +1,56 @@
+"""
+Overhead of reliable consumption: draining N tasks in batches with plain
+pop_many versus claim_many (processing list, leases) with the ack folded into
+push_results, as the worker does. Reports round trips and tasks/sec.
+
+Requires a running Redis at settings.REDIS_HOST:REDIS_PORT.
+
+    python -m benchmarks.queue_reliability --tasks 100000 --batch-size 100
+"""
+import argparse
+import contextlib
+import io
+import time
+from benchmarks.queue_roundtrips import RoundTripCounter, make_tasks
+from src.distributed.queue_manager import QueueManager, lease_key, processing_list
+
+QUEUE = 'bench_tasks'
+CONSUMER = 'bench_consumer'
+
+def drain(queue_manager: QueueManager, batch_size: int, reliable: bool) -> int:
+    processed = 0
+    while True:
+        if reliable:
+            batch = queue_manager.claim_many(QUEUE, CONSUMER, batch_size, timeout=0)
+        else:
+            batch = queue_manager.pop_many(QUEUE, batch_size, timeout=0)
+        if not batch:
+            return processed
+        results = [{'task_id': task['id'], 'result': {}} for task in batch]
+        queue_manager.push_results(results, ttl=60, ack=(CONSUMER, batch) if reliable else None)
+        processed += len(batch)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    queue_manager = QueueManager()
+    tasks = make_tasks(args.tasks)
+    print(f"{'mode':<22} {'round trips':>12} {'seconds':>9} {'tasks/s':>10}")
+    for label, reliable in [('pop_many', False), ('claim_many', True)]:
+        queue_manager.redis_client.delete(QUEUE, processing_list(CONSUMER), lease_key(CONSUMER))
+        with contextlib.redirect_stdout(io.StringIO()):
+            queue_manager.push_many(QUEUE, tasks)
+        with RoundTripCounter() as counter, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            processed = drain(queue_manager, args.batch_size, reliable)
+            elapsed = time.perf_counter() - start
+        print(f"{label:<22} {counter.count:>12} {elapsed:>9.2f} {processed / elapsed:>10.0f}")
+        assert queue_manager.redis_client.llen(processing_list(CONSUMER)) == 0
+
+    queue_manager.redis_client.delete(QUEUE, 'results')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Round trips and wall time for moving 10k tasks through QueueManager,
+one command per task versus the bulk push_many/pop_many calls.
+
+Requires a running Redis at settings.REDIS_HOST:REDIS_PORT.
+
+    python -m benchmarks.queue_roundtrips --tasks 10000
+"""
+import argparse
+import contextlib
+import io
+import time
+import redis
+from src.distributed.queue_manager import QueueManager
+
+QUEUE = 'bench_tasks'
+
+class RoundTripCounter:
+    """Count client->server round trips by wrapping Connection.send_packed_command"""
+    def __init__(self):
+        self.count = 0
+        self._original = redis.connection.Connection.send_packed_command
+
+    def __enter__(self):
+        counter = self
+        original = self._original
+
+        def send_packed_command(conn, command, check_health=True):
+            counter.count += 1
+            return original(conn, command, check_health)
+
+        redis.connection.Connection.send_packed_command = send_packed_command
+        return self
+
+    def __exit__(self, *exc):
+        redis.connection.Connection.send_packed_command = self._original
+
+def make_tasks(n):
+    return [
+        {'id': f'task_{i}', 'type': 'routing',
+         'data': {'channel': 'chat', 'priority': 'high', 'type': 'complaint'}}
+        for i in range(n)
+    ]
+
+def measure(label, fn):
+    with RoundTripCounter() as counter, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {counter.count:>8} round trips {elapsed * 1000:>10.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    queue_manager = QueueManager()
+    queue_manager.redis_client.delete(QUEUE)
+    tasks = make_tasks(args.tasks)
+
+    print(f"Moving {args.tasks} tasks through '{QUEUE}'")
+    measure("push_task x N", lambda: [queue_manager.push_task(QUEUE, t) for t in tasks])
+    measure("pop_task x N", lambda: [queue_manager.pop_task(QUEUE) for _ in tasks])
+
+    measure("push_many", lambda: queue_manager.push_many(QUEUE, tasks))
+
+    def drain():
+        while queue_manager.pop_many(QUEUE, args.batch_size, timeout=0):
+            pass
+    measure(f"pop_many (max_n={args.batch_size})", drain)
+
+    queue_manager.redis_client.delete(QUEUE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Throughput of IntelligentRouter.route_batch against a route_request loop.
+
+The per-row loop is only timed on the first 1k rows (it runs the forest
+once per row) and extrapolated for larger sizes.
+
+    python -m benchmarks.router_batch --rows 1000 100000 1000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.models.intelligent_router import IntelligentRouter
+
+LOOP_SAMPLE = 1000
+
+def make_requests(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'channel': rng.choice(['voice', 'chat', 'email'], n_rows),
+        'priority': rng.choice(['high', 'medium', 'low'], n_rows),
+        'type': rng.choice(['inquiry', 'complaint', 'support', 'feedback'], n_rows),
+        'customer_history_length': rng.integers(0, 10, n_rows),
+        'agent_availability': rng.uniform(0.5, 1.0, n_rows)
+    })
+
+def trained_router(seed: int = 0) -> IntelligentRouter:
+    router = IntelligentRouter(cache_size=0)
+    train = make_requests(5000, seed)
+    router.train(router.preprocess_batch(train), np.random.default_rng(seed).integers(0, 5, len(train)))
+    return router
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    router = trained_router()
+    print(f"{'rows':>10} {'loop (est.)':>14} {'route_batch':>14} {'rows/s':>14} {'speedup':>9}")
+    for n_rows in args.rows:
+        requests = make_requests(n_rows, seed=1)
+
+        sample = requests.iloc[:LOOP_SAMPLE].to_dict('records')
+        start = time.perf_counter()
+        for request in sample:
+            router.route_request(request)
+        loop_seconds = (time.perf_counter() - start) / len(sample) * n_rows
+
+        start = time.perf_counter()
+        router.route_batch(requests)
+        batch_seconds = time.perf_counter() - start
+
+        print(f"{n_rows:>10} {loop_seconds:>13.2f}s {batch_seconds:>13.3f}s "
+              f"{n_rows / batch_seconds:>14,.0f} {loop_seconds / batch_seconds:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Latency of the compiled flat-array forest against sklearn's predict_proba
+for the same trained routing model, from single rows up to large batches.
+
+    python -m benchmarks.router_compiled
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.router_batch import make_requests, trained_router
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 32, 256, 1024, 8192])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    router = trained_router()
+    compiled = router.compiled_model
+    print(f"Forest: {len(compiled.roots)} trees, {compiled.node_count} nodes, "
+          f"max depth {compiled.max_depth}")
+    print(f"{'rows':>8} {'sklearn':>12} {'compiled':>12} {'speedup':>9}")
+    for n_rows in args.rows:
+        features = router.preprocess_batch(make_requests(n_rows, seed=1))
+        assert np.allclose(compiled.predict_proba(features), router.model.predict_proba(features))
+
+        sklearn_seconds = best_of(lambda: router.model.predict_proba(features), args.repeats)
+        compiled_seconds = best_of(lambda: compiled.predict_proba(features), args.repeats)
+        print(f"{n_rows:>8} {sklearn_seconds * 1e6:>10.0f}us {compiled_seconds * 1e6:>10.0f}us "
+              f"{sklearn_seconds / compiled_seconds:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
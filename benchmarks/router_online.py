@@ -0,0 +1,67 @@
+"""
+Cost of online router learning: time to record one feedback event, time
+to retrain and swap at several window sizes, and route_request latency
+while a background retrain is running.
+
+    python -m benchmarks.router_online --windows 1000 10000 50000
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.router_batch import make_requests
+from src.models.intelligent_router import IntelligentRouter
+
+def make_feedback(n_events: int, seed: int = 0) -> list:
+    requests = make_requests(n_events, seed).to_dict('records')
+    routes = np.random.default_rng(seed).integers(0, 5, n_events)
+    return [{'request': request, 'was_correct_routing': False, 'correct_route': int(route)}
+            for request, route in zip(requests, routes)]
+
+def route_latencies(router: IntelligentRouter, requests: list) -> np.ndarray:
+    timings = []
+    for request in requests:
+        start = time.perf_counter()
+        router.route_request(request)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--windows', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    # Cache disabled so every request runs the forest
+    requests = make_requests(2000, seed=1).to_dict('records')
+    print(f"{'window':>8} {'per event':>11} {'retrain':>10} {'p50 idle':>10} "
+          f"{'p50 training':>13} {'p99 training':>13}")
+    for window in args.windows:
+        router = IntelligentRouter(cache_size=0, feedback_window=window)
+        feedback = make_feedback(window)
+
+        start = time.perf_counter()
+        for event in feedback:
+            router.update_routing_model(event)
+        per_event = (time.perf_counter() - start) / len(feedback)
+
+        start = time.perf_counter()
+        router.retrain()
+        retrain_seconds = time.perf_counter() - start
+
+        idle = route_latencies(router, requests)
+
+        # Route continuously while the background thread retrains
+        router.start_online_learning(retrain_every=1, interval=None)
+        generation = router.generation
+        router.update_routing_model(feedback[0])
+        during = []
+        while router.generation == generation:
+            during.extend(route_latencies(router, requests[:100]))
+        router.stop_online_learning()
+        during = np.array(during)
+
+        print(f"{window:>8} {per_event * 1e6:>9.1f}us {retrain_seconds:>9.2f}s "
+              f"{np.percentile(idle, 50):>8.0f}us {np.percentile(during, 50):>11.0f}us "
+              f"{np.percentile(during, 99):>11.0f}us")
+
+if __name__ == "__main__":
+    main()
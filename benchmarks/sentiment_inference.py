@@ -0,0 +1,51 @@
+"""
+CPU latency of SentimentAnalyzer inference: the nn.Module forward against
+the fused NumPy export, at the worker's thread count.
+
+    python -m benchmarks.sentiment_inference --batch-sizes 1 32 1024 --threads 1
+"""
+import argparse
+import time
+import numpy as np
+import torch
+from src.models.fused_inference import FusedSentimentAnalyzer
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+def median_latency(fn, repeats: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 1024])
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=100, hidden_size=64, num_classes=3).eval()
+    fused = FusedSentimentAnalyzer.from_model(model)
+
+    def module_forward(X):
+        with torch.inference_mode():
+            return model(torch.from_numpy(X)).numpy()
+
+    print(f"torch threads: {torch.get_num_threads()}")
+    print(f"{'batch':>8} {'nn.Module':>12} {'fused':>12} {'speedup':>9}")
+    for batch_size in args.batch_sizes:
+        X = np.random.default_rng(0).normal(size=(batch_size, 100)).astype(np.float32)
+        assert np.allclose(module_forward(X), fused.predict_proba(X), atol=1e-6)
+        repeats = max(args.repeats // batch_size, 50)
+        module_seconds = median_latency(lambda: module_forward(X), repeats)
+        fused_seconds = median_latency(lambda: fused.predict_proba(X), repeats)
+        print(f"{batch_size:>8} {module_seconds * 1e6:>10.1f}us {fused_seconds * 1e6:>10.1f}us "
+              f"{module_seconds / fused_seconds:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
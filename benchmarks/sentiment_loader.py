@@ -0,0 +1,52 @@
+"""
+Sentiment training input pipeline: a per-sample DataLoader (a
+__getitem__ per sample and a collate per batch) against
+make_batch_loader's tensor slicing, for iterating an epoch alone and for
+a full training epoch.
+
+    python -m benchmarks.sentiment_loader --samples 1000000 --batch-size 256
+"""
+import argparse
+import time
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from src.models.sentiment_analyzer import SentimentAnalyzer
+from src.training.train_sentiment import make_batch_loader, seed_everything, train_sentiment_analyzer
+
+def iterate_rate(loader, n_samples: int) -> float:
+    start = time.perf_counter()
+    for _ in loader:
+        pass
+    return n_samples / (time.perf_counter() - start)
+
+def train_rate(loader, n_samples: int) -> float:
+    seed_everything(0)
+    model = SentimentAnalyzer(100, 64, 3)
+    start = time.perf_counter()
+    train_sentiment_analyzer(model, loader, num_epochs=1)
+    return n_samples / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2])
+    args = parser.parse_args()
+
+    X = torch.randn(args.samples, 100)
+    y = torch.randint(0, 3, (args.samples,))
+    loaders = {'per-sample': DataLoader(TensorDataset(X, y), batch_size=args.batch_size,
+                                        shuffle=True)}
+    for num_workers in args.workers:
+        loaders[f'sliced/{num_workers}w'] = make_batch_loader(X, y, batch_size=args.batch_size,
+                                                             num_workers=num_workers, seed=0)
+
+    print(f"{args.samples:,} samples, batch {args.batch_size}")
+    print(f"{'loader':>14} {'iterate':>16} {'train':>16}")
+    for name, loader in loaders.items():
+        iterate = iterate_rate(loader, args.samples)
+        train = train_rate(loader, args.samples)
+        print(f"{name:>14} {iterate:>10,.0f} s/sec {train:>10,.0f} s/sec")
+
+if __name__ == "__main__":
+    main()
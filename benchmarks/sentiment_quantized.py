@@ -0,0 +1,83 @@
+"""
+Float32 against int8 dynamically-quantized SentimentAnalyzer on CPU:
+held-out accuracy and agreement, serialized weight size, and latency per
+batch size (the fused NumPy path is included for reference).
+
+    python -m benchmarks.sentiment_quantized --batch-sizes 1 32 1024
+"""
+import argparse
+import io
+import time
+import warnings
+import numpy as np
+import torch
+from src.models.featurizer import TextFeaturizer
+from src.models.fused_inference import FusedSentimentAnalyzer
+from src.models.sentiment_analyzer import SentimentAnalyzer
+from src.training.train_sentiment import (HELD_OUT_MESSAGES, evaluate, generate_sentiment_data,
+                                          make_batch_loader, train_sentiment_analyzer)
+
+def serialized_kb(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 1024
+
+def median_latency(fn, repeats: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 1024])
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    featurizer = TextFeaturizer()
+    texts, labels = generate_sentiment_data(args.samples)
+    X = torch.from_numpy(featurizer.transform(texts))
+    y = torch.tensor(labels)
+
+    model = SentimentAnalyzer(featurizer.n_features, 64, 3)
+    train_sentiment_analyzer(model, make_batch_loader(X, y, batch_size=32, seed=0), num_epochs=3)
+    quantized = model.quantized()
+    fused = FusedSentimentAnalyzer.from_model(model)
+
+    X_test = torch.from_numpy(featurizer.transform([text for text, _ in HELD_OUT_MESSAGES]))
+    y_test = torch.tensor([label for _, label in HELD_OUT_MESSAGES])
+    with torch.inference_mode():
+        float_probs, int8_probs = model(X_test), quantized(X_test)
+    agreement = (float_probs.argmax(dim=1) == int8_probs.argmax(dim=1)).float().mean().item()
+    print(f"held-out accuracy: float32 {evaluate(model, X_test, y_test):.4f}, "
+          f"int8 {evaluate(quantized, X_test, y_test):.4f}, agreement {agreement:.4f}, "
+          f"max |dp| {(float_probs - int8_probs).abs().max().item():.4f}")
+    print(f"serialized weights: float32 {serialized_kb(model):.1f}KB, "
+          f"int8 {serialized_kb(quantized):.1f}KB")
+
+    def module_forward(net, batch):
+        with torch.inference_mode():
+            return net(batch)
+
+    print(f"{'batch':>8} {'float32':>12} {'int8':>12} {'fused':>12}")
+    for batch_size in args.batch_sizes:
+        batch = torch.randn(batch_size, featurizer.n_features)
+        batch_np = batch.numpy()
+        repeats = max(args.repeats // batch_size, 50)
+        timings = [
+            median_latency(lambda: module_forward(model, batch), repeats),
+            median_latency(lambda: module_forward(quantized, batch), repeats),
+            median_latency(lambda: fused.predict_proba(batch_np), repeats)
+        ]
+        print(f"{batch_size:>8} " + " ".join(f"{t * 1e6:>10.1f}us" for t in timings))
+
+if __name__ == "__main__":
+    main()
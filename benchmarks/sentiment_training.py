@@ -0,0 +1,68 @@
+"""
+Training throughput of SentimentAnalyzer: the previous training-mode
+forward, which round-tripped the features through NumPy, against the
+on-tensor SoftmaxHead.
+
+The NumPy path cannot backpropagate, so for it only the forward pass is
+timed; for the head, the full train_sentiment_analyzer step is timed too.
+
+    python -m benchmarks.sentiment_training --batch-sizes 32 256 1024
+"""
+import argparse
+import time
+import torch
+import torch.nn as nn
+from src.models.nlp_functions import SoftmaxClassifier
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+class NumpyRoundTripAnalyzer(SentimentAnalyzer):
+    """SentimentAnalyzer with the training-mode forward as it was"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.numpy_classifier = SoftmaxClassifier(self.layer3.in_features, self.layer3.out_features)
+
+    def forward(self, x):
+        features = self.feature_extraction(x)
+        features_np = features.detach().numpy()
+        probs_np = self.numpy_classifier.softmax(features_np.T)
+        return torch.from_numpy(probs_np.T).float()
+
+def samples_per_second(fn, batches: int, batch_size: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(batches):
+        fn()
+    return batches * batch_size / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 256, 1024])
+    parser.add_argument('--batches', type=int, default=200)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    criterion = nn.CrossEntropyLoss()
+    print(f"{'batch':>8} {'numpy fwd':>14} {'head fwd':>14} {'head step':>14}")
+    for batch_size in args.batch_sizes:
+        x = torch.randn(batch_size, 100)
+        y = torch.randint(0, 3, (batch_size,))
+        before = NumpyRoundTripAnalyzer(100, 64, 3).train()
+        after = SentimentAnalyzer(100, 64, 3).train()
+        optimizer = torch.optim.Adam(after.parameters())
+
+        def step():
+            loss = criterion(after(x), y)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            after.update_weights(x, y)
+
+        numpy_forward = samples_per_second(lambda: before(x), args.batches, batch_size)
+        head_forward = samples_per_second(lambda: after(x), args.batches, batch_size)
+        head_step = samples_per_second(step, args.batches, batch_size)
+        print(f"{batch_size:>8} {numpy_forward:>12,.0f}/s {head_forward:>12,.0f}/s "
+              f"{head_step:>12,.0f}/s")
+
+if __name__ == "__main__":
+    main()
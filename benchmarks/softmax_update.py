@@ -0,0 +1,51 @@
+"""
+Cost of one SentimentAnalyzer.update_weights step: the previous per-sample,
+per-class SoftmaxClassifier update loop against the minibatch update.
+
+    python -m benchmarks.softmax_update --batch-sizes 32 256 1024 4096
+"""
+import argparse
+import time
+import numpy as np
+from src.models.nlp_functions import SoftmaxClassifier
+
+def per_sample_update(classifier: SoftmaxClassifier, X: np.ndarray, y: np.ndarray):
+    """The update as it was: one sample and one class at a time, reallocating θ"""
+    for x, label in zip(X, y):
+        probs = classifier.softmax(x)
+        gradient = np.zeros_like(classifier.theta)
+        for i in range(classifier.num_classes):
+            indicator = 1 if i == label else 0
+            gradient[i] = (probs[i] - indicator) * x
+        classifier.theta = classifier.theta - classifier.learning_rate * gradient
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 256, 1024, 4096])
+    parser.add_argument('--hidden-size', type=int, default=64)
+    parser.add_argument('--classes', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'per-sample':>12} {'minibatch':>12} {'speedup':>9}")
+    for batch_size in args.batch_sizes:
+        X = rng.normal(size=(batch_size, args.hidden_size)).astype(np.float32)
+        y = rng.integers(0, args.classes, batch_size)
+        classifier = SoftmaxClassifier(args.hidden_size, args.classes)
+
+        loop_seconds = best_of(lambda: per_sample_update(classifier, X, y), args.repeats)
+        batch_seconds = best_of(lambda: classifier.gradient_descent_update(X, y), args.repeats)
+        print(f"{batch_size:>8} {loop_seconds * 1e3:>10.2f}ms {batch_seconds * 1e3:>10.3f}ms "
+              f"{loop_seconds / batch_seconds:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
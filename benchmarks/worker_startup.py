@@ -0,0 +1,94 @@
+"""
+Cold start and resident memory of worker processes loading the published
+models from the registry, with and without memory-mapping.
+
+Each process loads both models and reports its load time and the Rss/Pss of
+its address space. Pss splits shared pages between the processes mapping
+them, so with mmap it should stay flat as more workers start.
+
+    python -m src.training.train_sentiment && python -m src.training.train_router
+    python -m benchmarks.worker_startup --workers 1 4 8
+"""
+import argparse
+import multiprocessing as mp
+import time
+import numpy as np
+import torch
+from src.distributed.config import settings
+from src.models.registry import ModelRegistry, SENTIMENT, ROUTER
+from src.models.sentiment_analyzer import SentimentAnalyzer
+from src.models.intelligent_router import IntelligentRouter
+from src.models.forest_compiler import CompiledForest
+
+def memory_kb() -> dict:
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                usage[key] = int(rest.split()[0])
+    return usage
+
+def load_copied(registry: ModelRegistry):
+    """Load both models reading every array into private memory"""
+    version = registry.latest_version(SENTIMENT)
+    manifest = registry.manifest(SENTIMENT, version)
+    model = SentimentAnalyzer(**manifest['config'])
+    model.load_state_dict(torch.load(f"{registry.root}/{SENTIMENT}/{version}/state_dict.pt",
+                                     weights_only=True))
+    version = registry.latest_version(ROUTER)
+    router = IntelligentRouter()
+    router.compiled_model = CompiledForest.from_arrays({
+        field: np.load(f"{registry.root}/{ROUTER}/{version}/{field}.npy")
+        for field in registry.manifest(ROUTER, version)['fields']
+    })
+    return model, router
+
+def load_mapped(registry: ModelRegistry):
+    return registry.load_sentiment(), registry.load_router()
+
+def worker(mode: str, ready, done, results):
+    start = time.perf_counter()
+    registry = ModelRegistry(settings.MODEL_DIR)
+    model, router = (load_mapped if mode == 'mmap' else load_copied)(registry)
+    # Touch every array so all pages are resident
+    sum(float(p.detach().sum()) for p in model.parameters())
+    sum(float(np.asarray(a).sum()) for a in router.compiled_model.arrays().values())
+    load_ms = (time.perf_counter() - start) * 1000
+    ready.wait()
+    results.put((load_ms, memory_kb()))
+    done.wait()
+
+def run(mode: str, n_workers: int):
+    ctx = mp.get_context('spawn')
+    ready, done, results = ctx.Barrier(n_workers + 1), ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, ready, done, results)) for _ in range(n_workers)]
+    for proc in procs:
+        proc.start()
+    # Measure once every worker holds its models at the same time
+    ready.wait()
+    samples = [results.get() for _ in procs]
+    done.set()
+    for proc in procs:
+        proc.join()
+    load_ms = np.mean([sample[0] for sample in samples])
+    pss_mb = sum(sample[1]['Pss'] for sample in samples) / 1024
+    rss_mb = np.mean([sample[1]['Rss'] for sample in samples]) / 1024
+    return load_ms, rss_mb, pss_mb
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    registry = ModelRegistry(settings.MODEL_DIR)
+    print(f"sentiment {registry.latest_version(SENTIMENT)}, router {registry.latest_version(ROUTER)} "
+          f"({registry.manifest(ROUTER)['nodes']} nodes)")
+    print(f"{'mode':>6} {'workers':>8} {'load':>10} {'Rss/worker':>12} {'total Pss':>12}")
+    for mode in ('copy', 'mmap'):
+        for n_workers in args.workers:
+            load_ms, rss_mb, pss_mb = run(mode, n_workers)
+            print(f"{mode:>6} {n_workers:>8} {load_ms:>8.1f}ms {rss_mb:>10.1f}MB {pss_mb:>10.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,33 @@
+import asyncio
 import redis
-import json
+import requests
 from datetime import datetime
+from src.distributed.backends import get_backend
+from src.distributed.codec import decode
+from src.distributed.config import settings
+
+def check_local_system():
+    # The in-memory queues live in the API process, so ask the API
+    try:
+        metrics = requests.get(f"http://localhost:{settings.SERVICE_PORT}/metrics", timeout=5).json()
+        print("✓ API is running (in-memory queue backend)")
+        print("\nQueue Status:")
+        for queue, length in metrics['queue_lengths'].items():
+            print(f"{queue}: {length}")
+        print(f"\nTasks processed in the last {metrics['window_seconds']}s: "
+              f"{metrics['throughput']['tasks_processed']}")
+    except Exception as e:
+        print(f"✗ Could not reach the API: {e}")
 
 def check_system():
+    if settings.QUEUE_BACKEND == 'memory':
+        check_local_system()
+        return
     try:
         # Connect to Redis
         redis_client = redis.Redis(
-            host='localhost', 
-            port=6379, 
-            decode_responses=True
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT
         )
         
         # Test Redis connection
@@ -17,7 +36,8 @@ def check_system():
         
         # Check queues
         print("\nQueue Status:")
-        print(f"Tasks queue size: {redis_client.llen('tasks')}")
+        for queue, length in asyncio.run(get_backend().queue_lengths()).items():
+            print(f"{queue}: {length}")
         print(f"Results queue size: {redis_client.llen('results')}")
         
         # Check last 10 activities
@@ -29,7 +49,7 @@ def check_system():
             print("\nRecent Tasks:")
             for task in recent_tasks:
                 try:
-                    task_data = json.loads(task)
+                    task_data = decode(task)
                     print(f"- Task ID: {task_data.get('id', 'unknown')}")
                 except:
                     continue
@@ -38,7 +58,7 @@ def check_system():
             print("\nRecent Results:")
             for result in recent_results:
                 try:
-                    result_data = json.loads(result)
+                    result_data = decode(result)
                     print(f"- Worker {result_data.get('worker_id', 'unknown')}: "
                           f"Task {result_data.get('task_id', 'unknown')}")
                 except:
@@ -1,49 +1,51 @@
+import argparse
 import asyncio
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from datetime import datetime, timedelta
-import threading
+from datetime import datetime
 import time
 import torch
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Project imports
 from src.models.sentiment_analyzer import SentimentAnalyzer
 from src.models.intelligent_router import IntelligentRouter
 from src.distributed.worker import Worker
 from src.distributed.main import start_distributed_system
-from src.distributed.queue_manager import QueueManager
+from src.distributed.backends import get_backend
+from src.data.stream import interaction_batches, interaction_tasks
 
 class IntegratedAnalysis:
     def __init__(self):
         self.sentiment_analyzer = SentimentAnalyzer(input_size=100, hidden_size=64, num_classes=3)
         self.router = IntelligentRouter()
-        self.queue_manager = QueueManager()
+        # Tasks go through the QUEUE_BACKEND the workers consume: Redis
+        # lists or streams, or the in-process queue for memory
+        self.backend = get_backend()
+        self.queue_manager = self.backend.queue_manager
         
     async def start_system(self):
         """Start the distributed system with explicit worker initialization"""
         print("Starting distributed system...")
+        await self.queue_manager.ping()
         
         # Initialize workers
         self.workers = []
         for worker_id in range(3):  # Start 3 workers
             try:
-                worker = Worker(worker_id)
+                worker = Worker(worker_id, backend=self.backend)
                 self.workers.append(worker)
                 print(f"Initialized worker {worker_id}")
             except Exception as e:
                 print(f"Error initializing worker {worker_id}: {e}")
         
-        # Start workers in separate threads
-        self.worker_threads = []
+        # Run workers as tasks on this event loop, sharing its queue manager
+        self.worker_tasks = []
         for worker in self.workers:
-            thread = threading.Thread(target=worker.run)
-            thread.daemon = True
-            thread.start()
-            self.worker_threads.append(thread)
-            print(f"Started worker thread for worker {worker.worker_id}")
+            self.worker_tasks.append(asyncio.create_task(worker.run()))
+            print(f"Started worker task for worker {worker.worker_id}")
         
         # Wait for workers to initialize
         await asyncio.sleep(2)
@@ -55,90 +57,45 @@ class IntegratedAnalysis:
         
     def generate_channel_data(self, channel_type: str, n_samples: int) -> pd.DataFrame:
         """Generate data for specific channel with all required fields"""
-        # Common customer messages for each channel
-        message_templates = {
-            'voice': [
-                "I need help with my account",
-                "There's a problem with my service",
-                "I'd like to upgrade my plan",
-                "I'm having technical difficulties",
-                "Can you explain my bill?"
-            ],
-            'chat': [
-                "How do I reset my password?",
-                "Where can I find my order status?",
-                "I need help with the website",
-                "Can you help with product selection?",
-                "I have a question about shipping"
-            ],
-            'email': [
-                "Following up on my previous request",
-                "Request for documentation",
-                "Feedback on recent service",
-                "Account modification request",
-                "General inquiry about services"
-            ]
-        }
-        
-        # Generate base data
-        data = {
-            'timestamp': [datetime.now() - timedelta(minutes=x) for x in range(n_samples)],
-            'channel': [channel_type] * n_samples,
-            'message': np.random.choice(message_templates[channel_type], n_samples),
-            'customer_id': [f'CUST-{i:04d}' for i in range(n_samples)],
-            'priority': np.random.choice(['high', 'medium', 'low'], n_samples),
-            'type': np.random.choice(['inquiry', 'complaint', 'support', 'feedback'], n_samples),
-            'response_time': np.random.exponential(2, n_samples),
-            'satisfaction_score': np.random.normal(4, 1, n_samples).clip(1, 5),
-            'customer_history_length': np.random.randint(0, 10, n_samples),
-            'agent_availability': np.random.uniform(0.5, 1.0, n_samples)
-        }
-        
-        return pd.DataFrame(data)
-
+        # One interaction per minute, ending now
+        start = np.datetime64(datetime.now(), 'us') - np.timedelta64(n_samples - 1, 'm')
+        return pd.concat(interaction_batches(n_samples, channels=[channel_type], start=start))
+    
+    def build_tasks(self, interaction: Dict[str, Any]):
+        """Build the sentiment and routing tasks for a single interaction"""
+        return interaction_tasks(interaction)
+    
+    async def submit_interactions(self, data: pd.DataFrame):
+        """
+        Enqueue the tasks for every interaction in `data` in one round trip
+        Returns the (sentiment, routing) task ids for each interaction
+        """
+        tasks = []
+        task_ids = []
+        for interaction in data.to_dict('records'):
+            sentiment_task, routing_task = self.build_tasks(interaction)
+            tasks.extend([sentiment_task, routing_task])
+            task_ids.append((sentiment_task['id'], routing_task['id']))
+        await self.backend.submit(tasks)
+        return task_ids
     
     async def process_interaction(self, interaction: Dict[str, Any]):
         """Process single interaction through the system with debug info"""
         try:
-            # Create sentiment analysis task with unique ID
-            task_id = f"task_{time.time()}_{interaction['customer_id']}"
-            sentiment_task = {
-                "id": f"{task_id}_sentiment",
-                "type": "sentiment_analysis",
-                "data": {
-                    "text": interaction['message'],
-                    "channel": interaction['channel']
-                }
-            }
-            
-            print(f"Submitting sentiment task: {sentiment_task['id']}")
-            self.queue_manager.push_task('tasks', sentiment_task)
-            
-            # Create routing task
-            routing_task = {
-                "id": f"{task_id}_routing",
-                "type": "routing",
-                "data": {
-                    "channel": interaction['channel'],
-                    "priority": interaction['priority'],
-                    "type": interaction['type'],
-                    "customer_history_length": interaction['customer_history_length'],
-                    "agent_availability": interaction['agent_availability']
-                }
-            }
+            sentiment_task, routing_task = self.build_tasks(interaction)
             
-            print(f"Submitting routing task: {routing_task['id']}")
-            self.queue_manager.push_task('tasks', routing_task)
+            print(f"Submitting tasks: {sentiment_task['id']}, {routing_task['id']}")
+            await self.backend.submit([sentiment_task, routing_task])
             
-            # Wait for results with debug info
-            print(f"Waiting for sentiment result: {sentiment_task['id']}")
-            sentiment_result = await self.wait_for_result('results')
+            # Wait for both results, each correlated by its own task id
+            print(f"Waiting for results: {sentiment_task['id']}, {routing_task['id']}")
+            sentiment_result, routing_result = await asyncio.gather(
+                self.wait_for_result(sentiment_task['id']),
+                self.wait_for_result(routing_task['id'])
+            )
             if sentiment_result is None:
                 print(f"Timeout waiting for sentiment result: {sentiment_task['id']}")
                 sentiment_result = {"error": "timeout"}
-                
-            print(f"Waiting for routing result: {routing_task['id']}")
-            routing_result = await self.wait_for_result('results')
             if routing_result is None:
                 print(f"Timeout waiting for routing result: {routing_task['id']}")
                 routing_result = {"error": "timeout"}
@@ -155,18 +112,71 @@ class IntegratedAnalysis:
                 'original_interaction': interaction
             }
         
-    async def wait_for_result(self, queue_name: str, timeout: int = 30):
-        """Wait for result from queue with timeout and debugging"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            result = self.queue_manager.pop_task(queue_name)
-            if result:
-                print(f"Received result from queue {queue_name}")
-                return result
-            await asyncio.sleep(0.1)
-            if (time.time() - start_time) % 5 == 0:  # Log every 5 seconds
-                print(f"Still waiting for result... ({int(time.time() - start_time)}s)")
-        return None
+    async def process_interactions(self, interactions: List[Dict[str, Any]],
+                                   max_in_flight: int = 50, max_queue_length: int = 1000,
+                                   progress_every: int = 100) -> List[Dict[str, Any]]:
+        """
+        Process interactions concurrently, keeping at most `max_in_flight`
+        round trips outstanding. New interactions are held back while the
+        backend's backlog is at `max_queue_length` or more, until workers
+        have drained it to half that. Results are returned in input order
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+        results: List[Dict[str, Any]] = [{} for _ in interactions]
+        progress = {'done': 0, 'throttled': 0.0}
+        started = time.perf_counter()
+        
+        async def run(index: int, interaction: Dict[str, Any]):
+            try:
+                results[index] = await self.process_interaction(interaction)
+            finally:
+                semaphore.release()
+            progress['done'] += 1
+            if progress['done'] % progress_every == 0 or progress['done'] == len(interactions):
+                elapsed = time.perf_counter() - started
+                print(f"Processed {progress['done']}/{len(interactions)} interactions "
+                      f"({progress['done'] / elapsed:.1f}/s)")
+        
+        pending = []
+        next_check = 0.0
+        for index, interaction in enumerate(interactions):
+            # Poll the queue length at most every 100ms rather than per interaction
+            if time.monotonic() >= next_check:
+                progress['throttled'] += await self.wait_for_capacity(max_queue_length)
+                next_check = time.monotonic() + 0.1
+            # Take the slot here, so no more than max_in_flight tasks ever exist
+            await semaphore.acquire()
+            pending.append(asyncio.create_task(run(index, interaction)))
+        await asyncio.gather(*pending)
+        
+        elapsed = time.perf_counter() - started
+        print(f"Processed {len(interactions)} interactions in {elapsed:.2f}s "
+              f"({len(interactions) / elapsed:.1f}/s, throttled {progress['throttled']:.2f}s)")
+        return results
+    
+    async def wait_for_capacity(self, max_queue_length: int) -> float:
+        """
+        Back off while the backend's backlog is full
+        Returns the number of seconds spent waiting
+        """
+        queue_length = await self.backend.depth()
+        if queue_length < max_queue_length:
+            return 0.0
+        print(f"Backlog at {queue_length} tasks, waiting for workers to catch up...")
+        started = time.perf_counter()
+        delay = 0.05
+        while queue_length > max_queue_length // 2:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+            queue_length = await self.backend.depth()
+        return time.perf_counter() - started
+    
+    async def wait_for_result(self, task_id: str, timeout: int = 30):
+        """Wait for the result of a specific task without blocking the event loop"""
+        result = await self.queue_manager.await_result(task_id, timeout)
+        if result:
+            print(f"Received result for task {task_id}")
+        return result
 
     def analyze_results(self, results: list) -> Dict[str, Any]:
         """Analyze processing results"""
@@ -248,7 +258,8 @@ class IntegratedAnalysis:
         print("\nVisualization saved as 'integrated_analysis_results.png'")
         return fig
 
-async def main():
+async def main(samples_per_channel: int = 10, max_in_flight: int = 50,
+               max_queue_length: int = 1000):
     # Initialize analysis
     analysis = IntegratedAnalysis()
     
@@ -257,7 +268,7 @@ async def main():
 
         # Verify system health
     print("\nChecking system health...")
-    queue_length = analysis.queue_manager.get_queue_length('tasks')
+    queue_length = await analysis.backend.depth()
     worker_count = len([w for w in analysis.workers if w.running])
     print(f"Active workers: {worker_count}")
     print(f"Current queue length: {queue_length}")
@@ -268,36 +279,19 @@ async def main():
     
     print("\nGenerating channel data...")
     # Generate larger samples
-    voice_data = analysis.generate_channel_data('voice', 10)  # Increased from 10
-    chat_data = analysis.generate_channel_data('chat', 10)    # Increased from 10
-    email_data = analysis.generate_channel_data('email', 10)  # Increased from 10
+    voice_data = analysis.generate_channel_data('voice', samples_per_channel)
+    chat_data = analysis.generate_channel_data('chat', samples_per_channel)
+    email_data = analysis.generate_channel_data('email', samples_per_channel)
     
     all_data = pd.concat([voice_data, chat_data, email_data])
     print(f"Total interactions to process: {len(all_data)}")
     
     print("\nProcessing interactions through the system...")
-    results = []
-    batch_size = 100  # Process in batches of 100
-    
-    # Process in batches
-    for i in range(0, len(all_data), batch_size):
-        batch = all_data.iloc[i:i+batch_size]
-        batch_results = []
-        
-        for _, interaction in batch.iterrows():
-            try:
-                result = await analysis.process_interaction(interaction.to_dict())
-                batch_results.append(result)
-                if len(results) % 100 == 0:  # Print progress every 100 interactions
-                    print(f"Processed {len(results)}/{len(all_data)} interactions...")
-            except Exception as e:
-                print(f"Error processing interaction: {e}")
-                continue
-        
-        results.extend(batch_results)
-        
-        # Add a small delay between batches to prevent overloading
-        await asyncio.sleep(0.1)
+    results = await analysis.process_interactions(
+        all_data.to_dict('records'),
+        max_in_flight=max_in_flight,
+        max_queue_length=max_queue_length
+    )
     
     print(f"\nSuccessfully processed {len(results)} interactions")
     
@@ -313,4 +307,11 @@ async def main():
     return all_data, results, metrics
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples-per-channel', type=int, default=10)
+    parser.add_argument('--max-in-flight', type=int, default=50,
+                        help="Interactions awaiting results at once")
+    parser.add_argument('--max-queue-length', type=int, default=1000,
+                        help="Pause submitting while this many tasks are queued")
+    args = parser.parse_args()
+    asyncio.run(main(args.samples_per_channel, args.max_in_flight, args.max_queue_length))
\ No newline at end of file
@@ -1,12 +1,15 @@
+import argparse
+import os
 import subprocess
 import sys
 import time
 from pathlib import Path
+from src.distributed.config import settings
 
 def check_redis():
     try:
         import redis
-        r = redis.Redis(host='localhost', port=6379)
+        r = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
         r.ping()
         print("✓ Redis is running")
         return True
@@ -15,31 +18,56 @@ def check_redis():
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the platform on this machine")
+    parser.add_argument('--backend', default=settings.QUEUE_BACKEND, choices=['lists', 'streams', 'memory'],
+                        help="queue backend; 'memory' needs no Redis and runs the workers in the API process")
+    parser.add_argument('--processes', action='store_true',
+                        help="with --backend memory, run each worker in its own process")
+    parser.add_argument('--log-dir', default='logs',
+                        help="directory for the API and supervisor (and its workers') output")
+    args = parser.parse_args()
+    env = {**os.environ, 'QUEUE_BACKEND': args.backend,
+           'LOCAL_WORKER_PROCESSES': str(args.processes).lower()}
+
     # Check if Redis is running
-    if not check_redis():
+    if args.backend != 'memory' and not check_redis():
         print("Please start Redis server first")
         sys.exit(1)
 
     print("\nStarting AI Customer Service Platform...")
     
+    # Children write to log files rather than pipes: nothing here reads
+    # their output, and workers log every batch, so a full pipe would block
+    # them mid-write
+    log_dir = Path(args.log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    
     # Start the FastAPI server
+    api_log = open(log_dir / 'api.log', 'ab')
     api_process = subprocess.Popen(
         [sys.executable, "-m", "uvicorn", "src.distributed.api:app", "--host", "0.0.0.0", "--port", "8000"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+        stdout=api_log,
+        stderr=subprocess.STDOUT,
+        env=env
     )
-    print("✓ API server started at http://localhost:8000")
+    print(f"✓ API server started at http://localhost:8000 (logging to {log_dir / 'api.log'})")
 
-    # Start worker processes
+    # Start the worker supervisor, which restarts crashed workers and scales
+    # them with queue depth (the API runs them itself with the memory backend)
     worker_processes = []
-    for i in range(3):  # Start 3 workers
-        worker = subprocess.Popen(
-            [sys.executable, "-m", "src.distributed.worker", str(i)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+    if args.backend != 'memory':
+        # Workers inherit the supervisor's output
+        supervisor_log = open(log_dir / 'supervisor.log', 'ab')
+        supervisor = subprocess.Popen(
+            [sys.executable, "-m", "src.distributed.supervisor"],
+            stdout=supervisor_log,
+            stderr=subprocess.STDOUT,
+            env=env
         )
-        worker_processes.append(worker)
-    print("✓ Worker processes started")
+        worker_processes.append(supervisor)
+        print(f"✓ Worker processes started (logging to {log_dir / 'supervisor.log'})")
+    else:
+        print("✓ Worker processes started")
 
     print("\nSystem is ready!")
     print("\nAvailable endpoints:")
@@ -56,4 +84,4 @@ def main():
             worker.terminate()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -9,11 +9,12 @@ setup(
         "numpy>=1.21.0",
         "pandas>=1.3.0",
         "scikit-learn>=0.24.2",
-        "torch>=1.9.0",
+        "torch>=2.1.0",
         "redis>=4.5.1",
-        "fastapi>=0.68.0",
+        "fastapi>=0.93.0",
         "uvicorn>=0.15.0",
         "pydantic>=1.9.0",
+        "pyyaml>=5.4.1",
     ],
     author="Bharath Janumpally",
     author_email="bharathreddy.janumpally@gmail.com",
@@ -0,0 +1,12 @@
+from typing import Dict, Any
+import os
+import yaml
+
+# The config directory sits next to src/ at the project root
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'config', 'app_confiig.yaml')
+
+def load_app_config() -> Dict[str, Any]:
+    """Load application configuration from config file"""
+    with open(CONFIG_PATH, 'r') as f:
+        return yaml.safe_load(f)
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 
 def generate_customer_interactions(n_samples=1000):
     """Generate synthetic customer interaction data"""
@@ -9,7 +9,7 @@ def generate_customer_interactions(n_samples=1000):
     intents = ['complaint', 'inquiry', 'request']
     
     data = {
-        'timestamp': [datetime.now() - timedelta(minutes=x) for x in range(n_samples)],
+        'timestamp': np.datetime64(datetime.now(), 'us') - np.arange(n_samples).astype('timedelta64[m]'),
         'channel': np.random.choice(channels, n_samples),
         'customer_id': np.random.randint(1000, 9999, n_samples),
         'message_length': np.random.normal(100, 30, n_samples),
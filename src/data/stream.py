@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import requests
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..distributed.backends import QueueBackend, get_backend
+
+# Common customer messages for each channel
+MESSAGE_TEMPLATES = {
+    'voice': [
+        "I need help with my account",
+        "There's a problem with my service",
+        "I'd like to upgrade my plan",
+        "I'm having technical difficulties",
+        "Can you explain my bill?"
+    ],
+    'chat': [
+        "How do I reset my password?",
+        "Where can I find my order status?",
+        "I need help with the website",
+        "Can you help with product selection?",
+        "I have a question about shipping"
+    ],
+    'email': [
+        "Following up on my previous request",
+        "Request for documentation",
+        "Feedback on recent service",
+        "Account modification request",
+        "General inquiry about services"
+    ]
+}
+
+PRIORITIES = np.array(['high', 'medium', 'low'])
+TYPES = np.array(['inquiry', 'complaint', 'support', 'feedback'])
+
+def interaction_batches(n_samples: Optional[int] = None, chunk_size: int = 10000,
+                        channels: Sequence[str] = ('voice', 'chat', 'email'),
+                        rate: float = 1 / 60, poisson: bool = False,
+                        start: Optional[np.datetime64] = None,
+                        seed: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream synthetic customer interactions as DataFrame chunks
+
+    Every column of a chunk is generated with one vectorized NumPy call, so
+    memory is bounded by `chunk_size` rows however many are requested, and
+    the stream is endless when `n_samples` is None. Events arrive `rate` per
+    second starting at `start` (default: now); with `poisson`, inter-arrival
+    times are exponential with that mean, otherwise evenly spaced.
+    Timestamps are datetime64[us] and increase across chunks.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(start if start is not None else pd.Timestamp.now(), 'us')
+    mean_gap_us = 1e6 / rate
+
+    # Flatten the templates so one integer pick selects a channel's message
+    channels = list(channels)
+    templates = np.array([message for channel in channels for message in MESSAGE_TEMPLATES[channel]])
+    offsets = np.cumsum([0] + [len(MESSAGE_TEMPLATES[channel]) for channel in channels])
+    counts = np.diff(offsets)
+
+    emitted = 0
+    clock_us = 0.0
+    while n_samples is None or emitted < n_samples:
+        size = chunk_size if n_samples is None else min(chunk_size, n_samples - emitted)
+
+        if poisson:
+            gaps = rng.exponential(mean_gap_us, size)
+        else:
+            gaps = np.full(size, mean_gap_us)
+        if emitted == 0:
+            gaps[0] = 0.0  # The stream opens at `start`
+        arrivals = clock_us + np.cumsum(gaps)
+        clock_us = arrivals[-1]
+
+        channel_idx = rng.integers(0, len(channels), size)
+        message_idx = offsets[channel_idx] + (rng.random(size) * counts[channel_idx]).astype(int)
+        customer_ids = np.char.add('CUST-', np.char.zfill(
+            np.arange(emitted, emitted + size).astype(str), 4))
+
+        yield pd.DataFrame({
+            'timestamp': start + arrivals.astype('timedelta64[us]'),
+            'channel': np.asarray(channels)[channel_idx],
+            'message': templates[message_idx],
+            'customer_id': customer_ids,
+            'priority': PRIORITIES[rng.integers(0, len(PRIORITIES), size)],
+            'type': TYPES[rng.integers(0, len(TYPES), size)],
+            'response_time': rng.exponential(2, size),
+            'satisfaction_score': rng.normal(4, 1, size).clip(1, 5),
+            'customer_history_length': rng.integers(0, 10, size),
+            'agent_availability': rng.uniform(0.5, 1.0, size)
+        }, index=pd.RangeIndex(emitted, emitted + size))
+        emitted += size
+
+def interaction_tasks(interaction: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """The sentiment and routing tasks for a single interaction, in the worker's task format"""
+    task_id = f"task_{uuid.uuid4().hex}_{interaction['customer_id']}"
+    sentiment_task = {
+        "id": f"{task_id}_sentiment",
+        "type": "sentiment_analysis",
+        "data": {"text": interaction['message'], "channel": interaction['channel']}
+    }
+    routing_task = {
+        "id": f"{task_id}_routing",
+        "type": "routing",
+        "data": {
+            "channel": interaction['channel'],
+            "priority": interaction['priority'],
+            "type": interaction['type'],
+            "customer_history_length": interaction['customer_history_length'],
+            "agent_availability": interaction['agent_availability']
+        }
+    }
+    return sentiment_task, routing_task
+
+def interactions_to_tasks(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Sentiment and routing tasks for each interaction in `frame`"""
+    return [task for interaction in frame.to_dict('records') for task in interaction_tasks(interaction)]
+
+def due_slices(batches: Iterator[pd.DataFrame], tick: float = 0.1,
+               speedup: float = 1.0) -> Iterator[Tuple[float, pd.DataFrame]]:
+    """
+    Split a stream into slices of events falling in the same `tick` of
+    (speedup-scaled) stream time, each with the number of seconds after
+    the first event at which it is due
+    """
+    first = None
+    for frame in batches:
+        if first is None:
+            first = frame['timestamp'].iloc[0]
+        due = ((frame['timestamp'] - first).to_numpy() / np.timedelta64(1, 's')) / speedup
+        ticks = np.floor(due / tick).astype(int)
+        bounds = np.flatnonzero(np.diff(ticks)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(frame)]):
+            yield due[hi - 1], frame.iloc[lo:hi]
+
+async def feed_queue(batches: Iterator[pd.DataFrame], backend: QueueBackend,
+                     speedup: float = 1.0) -> Dict[str, Any]:
+    """
+    Submit the stream to a queue backend in real time (scaled by `speedup`)
+    Reports how far behind schedule pushing fell, so a soak test can tell
+    the generator itself from a slow system
+    """
+    started = time.monotonic()
+    events, max_lag = 0, 0.0
+    for due, frame in due_slices(batches, speedup=speedup):
+        delay = started + due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        await backend.submit(interactions_to_tasks(frame))
+        events += len(frame)
+    elapsed = time.monotonic() - started
+    return {'events': events, 'seconds': elapsed, 'events_per_sec': events / elapsed,
+            'max_lag_seconds': max_lag}
+
+def feed_api(batches: Iterator[pd.DataFrame], base_url: str = 'http://localhost:8000',
+             speedup: float = 1.0) -> Dict[str, Any]:
+    """Submit the stream to the API's POST /tasks in real time (scaled by `speedup`)"""
+    started = time.monotonic()
+    events, max_lag, errors = 0, 0.0, 0
+    with requests.Session() as session:
+        for due, frame in due_slices(batches, speedup=speedup):
+            delay = started + due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            tasks = [{'type': task['type'], 'data': task['data']}
+                     for task in interactions_to_tasks(frame)]
+            response = session.post(f"{base_url}/tasks", json=tasks)
+            if response.status_code != 200:
+                errors += 1
+                print(f"Error submitting tasks: {response.status_code} {response.text}")
+            events += len(frame)
+    elapsed = time.monotonic() - started
+    return {'events': events, 'seconds': elapsed, 'events_per_sec': events / elapsed,
+            'max_lag_seconds': max_lag, 'errors': errors}
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test: stream synthetic interactions")
+    parser.add_argument('--rate', type=float, default=100.0, help="Events per second")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds of traffic")
+    parser.add_argument('--target', choices=['queue', 'api'], default='queue')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--uniform', action='store_true', help="Evenly spaced, not Poisson")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    batches = interaction_batches(int(args.rate * args.duration), chunk_size=10000,
+                                  rate=args.rate, poisson=not args.uniform, seed=args.seed)
+    if args.target == 'api':
+        report = feed_api(batches, args.url)
+    else:
+        report = asyncio.run(feed_queue(batches, get_backend()))
+    print(f"Sent {report['events']} interactions in {report['seconds']:.1f}s "
+          f"({report['events_per_sec']:.1f}/s, max lag {report['max_lag_seconds']:.3f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,32 @@
+import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .load_balancer import LoadBalancer
+from .local import LocalCluster
+from .metrics import MetricsReader
 from .config import settings
+from ..utils import instrumentation
 
-app = FastAPI()
 load_balancer = LoadBalancer(settings.WORKER_COUNT)
+metrics_reader = MetricsReader(load_balancer.queue_manager)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # With the in-memory backend, tasks never leave this process, so the
+    # workers have to run here too
+    cluster = None
+    if load_balancer.backend.name == 'memory':
+        cluster = LocalCluster(settings.WORKER_COUNT, processes=settings.LOCAL_WORKER_PROCESSES,
+                               backend=load_balancer.backend)
+        await cluster.start()
+    yield
+    if cluster is not None:
+        await cluster.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 class Task(BaseModel):
     type: str
@@ -14,49 +35,45 @@ class Task(BaseModel):
 @app.post("/task")
 async def create_task(task: Task):
     try:
-        load_balancer.distribute_task(task.dict())
-        return {"status": "Task accepted"}
+        task_id = f"task_{uuid.uuid4().hex}"
+        await load_balancer.distribute_task({"id": task_id, **task.dict()})
+        return {"status": "Task accepted", "task_id": task_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/tasks")
+async def create_tasks(tasks: List[Task]):
+    try:
+        task_ids = [f"task_{uuid.uuid4().hex}" for _ in tasks]
+        await load_balancer.distribute_tasks([
+            {"id": task_id, **task.dict()} for task_id, task in zip(task_ids, tasks)
+        ])
+        return {"status": "Tasks accepted", "task_ids": task_ids}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 async def health_check():
-    worker_status = load_balancer.health_check()
+    worker_status = await load_balancer.health_check()
     return {
         "status": "healthy" if all(worker_status) else "degraded",
         "worker_status": worker_status
     }
 
+@app.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """This API process's latency histograms in the Prometheus text format"""
+    return PlainTextResponse(instrumentation.render(), media_type=instrumentation.CONTENT_TYPE)
+
 @app.get("/metrics")
-async def get_metrics():
+async def get_metrics(window: Optional[int] = None):
+    """
+    Rolling-window throughput, latency percentiles and sentiment mix over
+    the last `window` seconds (default and maximum METRICS_WINDOW_SECONDS)
+    """
     try:
-        # Get metrics from Redis
-        queue_manager = QueueManager()
-        tasks_length = queue_manager.get_queue_length('tasks')
-        results_length = queue_manager.get_queue_length('results')
-        
-        # Calculate metrics
-        metrics = {
-            'total_interactions': tasks_length + results_length,
-            'active_workers': len([w for w in workers if w.running]),
-            'avg_response_time': 2.5,  # Example value
-            'satisfaction': 4.2,
-            'sentiments': {
-                'positive': 45,
-                'neutral': 30,
-                'negative': 25
-            },
-            'channels': {
-                'chat': 40,
-                'voice': 30,
-                'email': 30
-            },
-            'response_times': {
-                'chat': 2,
-                'voice': 1,
-                'email': 5
-            }
-        }
+        metrics = await metrics_reader.summary(window)
+        metrics['queue_lengths'] = await load_balancer.backend.queue_lengths()
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,358 @@
+import asyncio
+import time
+import weakref
+import redis.asyncio as aioredis
+from typing import Dict, Any, List, Optional, Tuple, Union
+from .codec import Codec, decode, get_codec
+from .config import settings
+from .queue_manager import (
+    ATTEMPTS_TTL, CLAIM, CONSUMERS, REAP, RELEASE, RESULT_CHANNEL, SHARED_QUEUE,
+    lease_key, processing_list, queue_ack, queue_results, result_key, stamp_enqueued
+)
+from ..utils.instrumentation import REDIS_ROUNDTRIP_SECONDS
+
+# redis.asyncio connections are bound to the event loop that opened them, so
+# the process keeps one shared pool (and client) per running loop. In the
+# usual single-loop process that is exactly one pool for the API and workers.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = \
+    weakref.WeakKeyDictionary()
+
+def get_redis_client() -> aioredis.Redis:
+    """Return the process-wide async Redis client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        pool = aioredis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=False  # Payloads may be binary; see QueueManager
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _clients[loop] = client
+    return client
+
+class ResultDispatcher:
+    """
+    Resolves await_result calls from a single pub/sub subscription, so any
+    number of in-flight waits share one connection instead of each holding
+    a blocking BLPOP
+    """
+
+    def __init__(self, client: aioredis.Redis):
+        self.client = client
+        self.waiters: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Subscribe to result notifications if not already listening"""
+        if self._listener is not None:
+            return
+        async with self._lock:
+            if self._listener is None:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(RESULT_CHANNEL)
+                self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                task_ids = [task_id for task_id in message['data'].decode('utf-8').split('\n')
+                            if task_id in self.waiters]
+                if task_ids:
+                    await self._deliver(task_ids)
+        except Exception as e:
+            print(f"Result listener stopped: {e}")
+        finally:
+            self._listener = None
+            # aclose() replaces reset() from redis-py 5
+            close = getattr(pubsub, 'aclose', None) or pubsub.reset
+            await close()
+
+    async def _deliver(self, task_ids: List[str]):
+        pipe = self.client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.lpop(result_key(task_id))
+        for task_id, payload in zip(task_ids, await pipe.execute()):
+            # No payload means another reader took it; keep waiting
+            if payload is None:
+                continue
+            waiter = self.waiters.pop(task_id, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(decode(payload))
+
+_dispatchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ResultDispatcher]" = \
+    weakref.WeakKeyDictionary()
+
+def get_result_dispatcher() -> ResultDispatcher:
+    """Return the result dispatcher for the running event loop"""
+    loop = asyncio.get_running_loop()
+    dispatcher = _dispatchers.get(loop)
+    if dispatcher is None:
+        dispatcher = ResultDispatcher(get_redis_client())
+        _dispatchers[loop] = dispatcher
+    return dispatcher
+
+class AsyncQueueManager:
+    """
+    Non-blocking counterpart of QueueManager on redis.asyncio
+    Every method is a coroutine with the same name, arguments and return
+    value as its QueueManager equivalent, and all instances in a process
+    share one connection pool.
+    """
+
+    def __init__(self, codec: Optional[Codec] = None):
+        self.codec = codec or get_codec()
+
+    @property
+    def redis_client(self) -> aioredis.Redis:
+        return get_redis_client()
+
+    async def ping(self) -> bool:
+        """Test the connection to Redis"""
+        try:
+            await self.redis_client.ping()
+            print("Successfully connected to Redis")
+            return True
+        except Exception as e:
+            print(f"Error connecting to Redis: {e}")
+            raise
+
+    async def push_task(self, queue_name: str, task: Dict[str, Any]) -> int:
+        """
+        Push a task to the specified queue
+        Returns the length of the queue after pushing
+        """
+        try:
+            start = time.perf_counter()
+            result = await self.redis_client.lpush(queue_name, self.codec.encode(stamp_enqueued(task)))
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'push_task')
+            print(f"Task pushed to queue {queue_name}: {task.get('id', 'unknown')}")
+            return result
+        except Exception as e:
+            print(f"Error pushing to queue: {e}")
+            raise
+
+    async def push_many(self, queue_name: str, tasks: List[Dict[str, Any]],
+                        chunk_size: int = 1000) -> int:
+        """
+        Push many tasks to the specified queue in a single round trip
+        Returns the length of the queue after pushing
+        """
+        if not tasks:
+            return await self.get_queue_length(queue_name)
+        try:
+            payloads = [self.codec.encode(stamp_enqueued(task)) for task in tasks]
+            pipe = self.redis_client.pipeline(transaction=False)
+            for start in range(0, len(payloads), chunk_size):
+                pipe.lpush(queue_name, *payloads[start:start + chunk_size])
+            start = time.perf_counter()
+            result = (await pipe.execute())[-1]
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'push_many')
+            print(f"{len(tasks)} tasks pushed to queue {queue_name}")
+            return result
+        except Exception as e:
+            print(f"Error pushing to queue: {e}")
+            raise
+
+    async def pop_task(self, queue_name: str, timeout: float = 1) -> Optional[Dict[str, Any]]:
+        """
+        Pop a task from the specified queue, waiting for up to `timeout` seconds
+        Returns None if no task is available
+        """
+        try:
+            task = await self.redis_client.brpop(queue_name, timeout=timeout)
+            if task:
+                print(f"Task popped from queue {queue_name}")
+                return decode(task[1])
+            return None
+        except Exception as e:
+            print(f"Error popping from queue: {e}")
+            return None
+
+    async def pop_many(self, queue_name: Union[str, List[str]], max_n: int,
+                       timeout: float = 1) -> List[Dict[str, Any]]:
+        """
+        Pop up to `max_n` tasks from the first non-empty of the given queues
+        Returns an empty list if nothing arrives within `timeout` seconds
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        try:
+            # Only the non-blocking pop is timed; BLMPOP mostly measures idle time
+            start = time.perf_counter()
+            reply = await self.redis_client.lmpop(len(queue_names), *queue_names,
+                                                  direction='RIGHT', count=max_n)
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'pop_many')
+            if reply is None and timeout > 0:
+                reply = await self.redis_client.blmpop(timeout, len(queue_names), *queue_names,
+                                                       direction='RIGHT', count=max_n)
+            return [decode(task) for task in reply[1]] if reply else []
+        except Exception as e:
+            print(f"Error popping from queue: {e}")
+            return []
+
+    async def claim_many(self, queue_name: Union[str, List[str]], consumer: str, max_n: int,
+                         timeout: float = 1, visibility_timeout: Optional[float] = None
+                         ) -> List[Dict[str, Any]]:
+        """
+        Claim up to `max_n` tasks for `consumer` from the first non-empty queue
+        Each task stays on the consumer's processing list until acked and
+        carries its raw payload as `receipt`; see QueueManager.claim_many
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        visibility_timeout = settings.VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+        keys = [processing_list(consumer), lease_key(consumer), CONSUMERS, *queue_names]
+        try:
+            claim = self.redis_client.register_script(CLAIM)
+            start = time.perf_counter()
+            payloads = await claim(keys=keys, args=[max_n, time.time() + visibility_timeout, consumer])
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'claim_many')
+            deadline = time.monotonic() + timeout
+            while not payloads and deadline > time.monotonic():
+                # Block on the first queue, re-checking the others between waits
+                wait = min(deadline - time.monotonic(), settings.CLAIM_POLL_MS / 1000)
+                payload = await self.redis_client.blmove(queue_names[0], keys[0], max(wait, 0.01),
+                                                         'RIGHT', 'LEFT')
+                if payload is not None:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.zadd(keys[1], {payload: time.time() + visibility_timeout})
+                    pipe.sadd(CONSUMERS, consumer)
+                    await pipe.execute()
+                    payloads = [payload]
+                elif len(queue_names) > 1:
+                    payloads = await claim(keys=keys, args=[max_n, time.time() + visibility_timeout, consumer])
+            return [{**decode(payload), 'receipt': payload} for payload in payloads]
+        except Exception as e:
+            print(f"Error claiming from queue: {e}")
+            return []
+
+    async def ack(self, consumer: str, tasks: List[Dict[str, Any]]) -> None:
+        """Mark claimed tasks as done so they are never redelivered"""
+        if not any('receipt' in task for task in tasks):
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            queue_ack(pipe, consumer, tasks)
+            start = time.perf_counter()
+            await pipe.execute()
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'ack')
+        except Exception as e:
+            print(f"Error acking tasks: {e}")
+            raise
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Give claimed tasks back for redelivery now, counting a failed attempt
+        Returns the number of tasks released
+        """
+        receipts = [task['receipt'] for task in tasks if 'receipt' in task]
+        if not receipts:
+            return 0
+        release = self.redis_client.register_script(RELEASE)
+        return await release(
+            keys=[processing_list(consumer), lease_key(consumer), SHARED_QUEUE, settings.DEAD_LETTER_QUEUE],
+            args=[settings.MAX_DELIVERY_ATTEMPTS, ATTEMPTS_TTL, *receipts]
+        )
+
+    async def reap(self, lease_seconds: Optional[float] = None) -> Dict[str, int]:
+        """
+        Redeliver every consumer's tasks whose visibility timeout has expired
+        Safe to run from any number of processes at once
+        """
+        lease_seconds = settings.VISIBILITY_TIMEOUT if lease_seconds is None else lease_seconds
+        reap = self.redis_client.register_script(REAP)
+        totals = {'requeued': 0, 'dead_lettered': 0}
+        now = time.time()
+        for consumer in await self.redis_client.smembers(CONSUMERS):
+            consumer = consumer.decode('utf-8')
+            requeued, dead = await reap(
+                keys=[processing_list(consumer), lease_key(consumer), SHARED_QUEUE,
+                      settings.DEAD_LETTER_QUEUE, CONSUMERS],
+                args=[now, settings.MAX_DELIVERY_ATTEMPTS, ATTEMPTS_TTL, now + lease_seconds, consumer]
+            )
+            totals['requeued'] += requeued
+            totals['dead_lettered'] += dead
+        if totals['requeued'] or totals['dead_lettered']:
+            print(f"Reaper requeued {totals['requeued']} expired tasks, "
+                  f"dead-lettered {totals['dead_lettered']}")
+        return totals
+
+    async def push_result(self, result: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Publish a task result under its own reply key, keeping a capped copy
+        on the `results` list for monitoring
+        """
+        await self.push_results([result], ttl)
+
+    async def push_results(self, results: List[Dict[str, Any]], ttl: Optional[int] = None,
+                           ack: Optional[Tuple[str, List[Dict[str, Any]]]] = None) -> None:
+        """
+        Publish a batch of task results in a single round trip
+        With `ack=(consumer, tasks)`, the claimed tasks are acked in the same
+        round trip, after their results are written
+        """
+        if not results:
+            return
+        ttl = settings.RESULT_TTL if ttl is None else ttl
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            queue_results(pipe, results, ttl, self.codec)
+            if ack is not None:
+                queue_ack(pipe, *ack)
+            start = time.perf_counter()
+            await pipe.execute()
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'push_results')
+        except Exception as e:
+            print(f"Error pushing results: {e}")
+            raise
+
+    async def await_result(self, task_id: str, timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """
+        Wait until the result for `task_id` is published
+        Returns None if it does not arrive within `timeout` seconds
+        """
+        dispatcher = get_result_dispatcher()
+        waiter = asyncio.get_running_loop().create_future()
+        try:
+            await dispatcher.start()
+            dispatcher.waiters[task_id] = waiter
+            # The result may have landed before we subscribed
+            payload = await self.redis_client.lpop(result_key(task_id))
+            if payload is not None:
+                return decode(payload)
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            print(f"Error waiting for result {task_id}: {e}")
+            return None
+        finally:
+            if dispatcher.waiters.get(task_id) is waiter:
+                del dispatcher.waiters[task_id]
+
+    async def get_queue_length(self, queue_name: str) -> int:
+        """Get the current length of the queue"""
+        try:
+            return await self.redis_client.llen(queue_name)
+        except Exception as e:
+            print(f"Error getting queue length: {e}")
+            return 0
+
+    async def increment_fields(self, key: str, counters: Dict[str, float], ttl: int) -> None:
+        """Add `counters` to the fields of a hash that expires `ttl` seconds from now"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for field, amount in counters.items():
+            if isinstance(amount, float):
+                pipe.hincrbyfloat(key, field, amount)
+            else:
+                pipe.hincrby(key, field, amount)
+        pipe.expire(key, ttl)
+        await pipe.execute()
+
+    async def get_fields(self, keys: List[str]) -> List[Dict[str, str]]:
+        """All fields of each hash in `keys`, in one round trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        return [{field.decode('utf-8'): value.decode('utf-8') for field, value in fields.items()}
+                for fields in await pipe.execute()]
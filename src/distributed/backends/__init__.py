@@ -0,0 +1,28 @@
+from typing import Optional
+from .base import QueueBackend
+from .lists import ListBackend, worker_queue
+from .memory import MemoryBackend
+from .streams import StreamBackend
+from ..async_queue_manager import AsyncQueueManager
+from ..config import settings
+from ..memory_queue_manager import MemoryQueueManager, get_memory_queue_manager
+
+def get_backend(name: Optional[str] = None, worker_count: Optional[int] = None) -> QueueBackend:
+    """The queue backend selected by QUEUE_BACKEND ('lists', 'streams' or 'memory')"""
+    name = name or settings.QUEUE_BACKEND
+    if name == ListBackend.name:
+        return ListBackend(worker_count or settings.WORKER_COUNT)
+    if name == StreamBackend.name:
+        return StreamBackend()
+    if name == MemoryBackend.name:
+        return MemoryBackend()
+    raise ValueError(f"Unknown queue backend: {name}")
+
+def get_queue_manager(name: Optional[str] = None):
+    """
+    The queue manager matching QUEUE_BACKEND: the process-wide in-memory
+    one for 'memory', otherwise a Redis-backed AsyncQueueManager
+    """
+    if (name or settings.QUEUE_BACKEND) == MemoryBackend.name:
+        return get_memory_queue_manager()
+    return AsyncQueueManager()
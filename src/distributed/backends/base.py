@@ -0,0 +1,53 @@
+from typing import Any, Dict, List
+
+class QueueBackend:
+    """
+    How tasks travel from the API to the workers
+
+    The API submits tasks; each worker, identified by a consumer name,
+    claims batches of them and completes them by publishing their results,
+    which also acknowledges them. Claimed tasks carry an opaque `receipt`
+    the backend uses to ack or release them. A claimed task that is never
+    completed is delivered again once `reap` finds it has been held longer
+    than VISIBILITY_TIMEOUT, and dead-lettered after MAX_DELIVERY_ATTEMPTS.
+    Results always go to the per-task reply keys, whatever the backend.
+    """
+
+    name = 'base'
+
+    async def submit(self, tasks: List[Dict[str, Any]]) -> List[int]:
+        """Enqueue tasks; returns how many went to each of the backend's partitions"""
+        raise NotImplementedError
+
+    async def claim(self, consumer: str, max_n: int, timeout: float = 1) -> List[Dict[str, Any]]:
+        """Up to `max_n` tasks for `consumer`, waiting up to `timeout` seconds for the first"""
+        raise NotImplementedError
+
+    async def complete(self, consumer: str, tasks: List[Dict[str, Any]],
+                       results: List[Dict[str, Any]]) -> None:
+        """Publish the results of claimed tasks and ack them in one round trip"""
+        raise NotImplementedError
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        """Hand claimed tasks back for redelivery now; returns how many were released"""
+        raise NotImplementedError
+
+    async def reap(self) -> Dict[str, int]:
+        """Redeliver tasks held past the visibility timeout"""
+        raise NotImplementedError
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        """Backlog waiting for workers, by queue (or consumer) name"""
+        raise NotImplementedError
+
+    async def set_workers(self, worker_ids: List[int]) -> int:
+        """
+        Tell the backend which workers are running, for backends that route
+        to per-worker queues. Returns the number of tasks moved off the
+        queues of workers that left
+        """
+        return 0
+
+    async def depth(self) -> int:
+        """Total backlog across queue_lengths, for backpressure and scaling"""
+        return sum((await self.queue_lengths()).values())
@@ -0,0 +1,161 @@
+import time
+from typing import Any, Dict, List, Optional
+from .base import QueueBackend
+from ..async_queue_manager import AsyncQueueManager
+from ..queue_manager import SHARED_QUEUE, stamp_enqueued
+from ...utils.instrumentation import REDIS_ROUNDTRIP_SECONDS
+
+# Worker ids the supervisor currently runs. While it is empty (no
+# supervisor), tasks go to the first `worker_count` worker queues
+ACTIVE_WORKERS = 'workers:active'
+
+# Shared by both scripts: the ids of the workers tasks are routed to
+_TARGETS = """
+local function targets(default_count)
+    local ids = redis.call('SMEMBERS', KEYS[1])
+    if #ids == 0 then
+        for i = 1, default_count do
+            ids[i] = i - 1
+        end
+    else
+        for i = 1, #ids do
+            ids[i] = tonumber(ids[i])
+        end
+        table.sort(ids)
+    end
+    return ids
+end
+"""
+
+# KEYS: active workers set. ARGV: default worker count, payloads. Assign
+# each payload to the currently shortest of the target workers' queues
+# (worker_<id>) and push it there. Running server-side makes the
+# least-loaded pick and the enqueue one atomic round trip, so concurrent
+# API calls cannot all pile onto the same queue. Returns {id, tasks
+# assigned} for each target worker.
+LEAST_LOADED_PUSH = _TARGETS + """
+local ids = targets(tonumber(ARGV[1]))
+local lengths = {}
+local assigned = {}
+for i = 1, #ids do
+    lengths[i] = redis.call('LLEN', 'worker_' .. ids[i])
+    assigned[i] = 0
+end
+for j = 2, #ARGV do
+    local target = 1
+    for i = 2, #ids do
+        if lengths[i] < lengths[target] then
+            target = i
+        end
+    end
+    redis.call('LPUSH', 'worker_' .. ids[target], ARGV[j])
+    lengths[target] = lengths[target] + 1
+    assigned[target] = assigned[target] + 1
+end
+local reply = {}
+for i = 1, #ids do
+    reply[#reply + 1] = ids[i]
+    reply[#reply + 1] = assigned[i]
+end
+return reply
+"""
+
+# KEYS: active workers set, shared queue. ARGV: default worker count, new
+# worker ids. Replaces the target workers and moves whatever is queued for
+# workers no longer targeted onto the consuming end of the shared queue,
+# oldest first, so no task waits on a queue nobody drains. Returns the
+# number of tasks moved
+SET_ACTIVE_WORKERS = _TARGETS + """
+local previous = targets(tonumber(ARGV[1]))
+local active = {}
+redis.call('DEL', KEYS[1])
+for i = 2, #ARGV do
+    redis.call('SADD', KEYS[1], ARGV[i])
+    active[tonumber(ARGV[i])] = true
+end
+local moved = 0
+for _, id in ipairs(previous) do
+    if not active[id] then
+        while redis.call('LMOVE', 'worker_' .. id, KEYS[2], 'LEFT', 'RIGHT') do
+            moved = moved + 1
+        end
+    end
+end
+return moved
+"""
+
+def worker_queue(worker_id: int) -> str:
+    """Name of the queue owned by a worker"""
+    return f'worker_{worker_id}'
+
+class ListBackend(QueueBackend):
+    """
+    One Redis list per worker plus the shared `tasks` list
+
+    Submissions go to the shortest queue of the workers in ACTIVE_WORKERS,
+    which the supervisor keeps in step with the pool (the first
+    `worker_count` workers when no supervisor runs). A worker claims from
+    its own queue first, then the shared one, then steals from its
+    siblings, through the processing lists and leases of
+    AsyncQueueManager.claim_many.
+    """
+
+    name = 'lists'
+
+    def __init__(self, worker_count: int, queue_manager: Optional[AsyncQueueManager] = None):
+        self.worker_count = worker_count
+        self.queue_manager = queue_manager or AsyncQueueManager()
+        self.worker_queues = [worker_queue(i) for i in range(worker_count)]
+
+    def queues_for(self, consumer: str) -> List[str]:
+        """Queues a consumer claims from, in priority order"""
+        if consumer not in self.worker_queues:
+            # e.g. a worker the supervisor started beyond worker_count
+            return [consumer, SHARED_QUEUE] + self.worker_queues
+        own = self.worker_queues.index(consumer)
+        siblings = [self.worker_queues[(own + i) % self.worker_count] for i in range(1, self.worker_count)]
+        return [consumer, SHARED_QUEUE] + siblings
+
+    async def submit(self, tasks: List[Dict[str, Any]]) -> List[int]:
+        """Enqueue tasks; returns how many went to each worker id's queue"""
+        if not tasks:
+            return [0] * self.worker_count
+        push = self.queue_manager.redis_client.register_script(LEAST_LOADED_PUSH)
+        payloads = [self.queue_manager.codec.encode(stamp_enqueued(task)) for task in tasks]
+        start = time.perf_counter()
+        reply = await push(keys=[ACTIVE_WORKERS], args=[self.worker_count, *payloads])
+        REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'distribute_tasks')
+        counts = dict(zip(reply[::2], reply[1::2]))
+        return [counts.get(worker_id, 0) for worker_id in range(max(self.worker_count, max(counts, default=-1) + 1))]
+
+    async def set_workers(self, worker_ids: List[int]) -> int:
+        """Route new tasks to these workers only, requeueing what the others held"""
+        update = self.queue_manager.redis_client.register_script(SET_ACTIVE_WORKERS)
+        moved = await update(keys=[ACTIVE_WORKERS, SHARED_QUEUE], args=[self.worker_count, *worker_ids])
+        if moved:
+            print(f"Moved {moved} tasks from retired worker queues to {SHARED_QUEUE}")
+        return moved
+
+    async def claim(self, consumer: str, max_n: int, timeout: float = 1) -> List[Dict[str, Any]]:
+        return await self.queue_manager.claim_many(self.queues_for(consumer), consumer, max_n, timeout)
+
+    async def complete(self, consumer: str, tasks: List[Dict[str, Any]],
+                       results: List[Dict[str, Any]]) -> None:
+        await self.queue_manager.push_results(results, ack=(consumer, tasks))
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        return await self.queue_manager.release(consumer, tasks)
+
+    async def reap(self) -> Dict[str, int]:
+        return await self.queue_manager.reap()
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        """Every worker queue (default or targeted), then the shared queue"""
+        active = sorted(map(int, await self.queue_manager.redis_client.smembers(ACTIVE_WORKERS)))
+        queue_names = self.worker_queues + [worker_queue(worker_id) for worker_id in active
+                                            if worker_id >= self.worker_count]
+        queue_names.append(SHARED_QUEUE)
+        pipe = self.queue_manager.redis_client.pipeline(transaction=False)
+        for queue_name in queue_names:
+            pipe.llen(queue_name)
+        return dict(zip(queue_names, await pipe.execute()))
@@ -0,0 +1,41 @@
+from typing import Any, Dict, List, Optional
+from .base import QueueBackend
+from ..memory_queue_manager import MemoryQueueManager, get_memory_queue_manager
+from ..queue_manager import SHARED_QUEUE
+
+class MemoryBackend(QueueBackend):
+    """
+    One in-process queue shared by every worker on the node
+
+    Backed by MemoryQueueManager, so the API and its workers must share a
+    process (or a parent process feeding a local pool; see LocalCluster).
+    Claims, acks and redelivery behave as with the Redis lists.
+    """
+
+    name = 'memory'
+
+    def __init__(self, queue_manager: Optional[MemoryQueueManager] = None):
+        self.queue_manager = queue_manager or get_memory_queue_manager()
+
+    async def submit(self, tasks: List[Dict[str, Any]]) -> List[int]:
+        await self.queue_manager.push_many(SHARED_QUEUE, tasks)
+        return [len(tasks)]
+
+    async def claim(self, consumer: str, max_n: int, timeout: float = 1) -> List[Dict[str, Any]]:
+        return await self.queue_manager.claim_many(SHARED_QUEUE, consumer, max_n, timeout)
+
+    async def complete(self, consumer: str, tasks: List[Dict[str, Any]],
+                       results: List[Dict[str, Any]]) -> None:
+        await self.queue_manager.push_results(results, ack=(consumer, tasks))
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        return await self.queue_manager.release(consumer, tasks)
+
+    async def reap(self) -> Dict[str, int]:
+        return await self.queue_manager.reap()
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        """Tasks waiting, then each consumer's unacked tasks"""
+        lengths = {SHARED_QUEUE: await self.queue_manager.get_queue_length(SHARED_QUEUE)}
+        lengths.update({consumer: len(held) for consumer, held in self.queue_manager.processing.items()})
+        return lengths
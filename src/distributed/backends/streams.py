@@ -0,0 +1,205 @@
+import time
+import redis.asyncio as aioredis
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .base import QueueBackend
+from ..async_queue_manager import AsyncQueueManager
+from ..codec import decode
+from ..config import settings
+from ..queue_manager import ATTEMPTS_TTL, queue_results, stamp_enqueued
+from ...utils.instrumentation import REDIS_ROUNDTRIP_SECONDS
+
+# KEYS: stream, dead-letter queue, attempts counter. ARGV: group, entry id,
+# task payload, max attempts, attempts ttl. Acks the entry and, only
+# if it was still pending, re-adds the task (1) or dead-letters it (2).
+# Attempts are counted per task id, as for the list backend, because the
+# re-added entry starts a fresh delivery count
+REQUEUE_ENTRY = """
+if redis.call('XACK', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+local attempts = redis.call('INCR', KEYS[3])
+if attempts >= tonumber(ARGV[4]) then
+    redis.call('LPUSH', KEYS[2], ARGV[3])
+    redis.call('DEL', KEYS[3])
+    return 2
+end
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+redis.call('XADD', KEYS[1], '*', 'task', ARGV[3])
+return 1
+"""
+
+def _entry_id(entry_id: Union[bytes, str]) -> Tuple[int, int]:
+    """A stream entry id as a sortable (milliseconds, sequence) pair"""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode('utf-8')
+    milliseconds, _, sequence = entry_id.partition('-')
+    return int(milliseconds), int(sequence or 0)
+
+class StreamBackend(QueueBackend):
+    """
+    One Redis stream read by a consumer group
+
+    Tasks are XADDed to a single stream, and every worker reads new
+    entries with XREADGROUP COUNT n, so any number of workers can join
+    without fixed per-worker queues and a batch read is a single command.
+    Redis tracks each consumer's unacked entries in the group's pending
+    list; XACK (sent with the results) completes them, and `reap` takes
+    over entries left pending past the visibility timeout with XAUTOCLAIM
+    and re-adds them to the stream. The stream itself keeps recent history,
+    so it can be replayed with XRANGE or read by another group. Once it
+    passes `maxlen` entries, `reap` trims the history every group has read
+    and acked; entries still unread or pending are never trimmed, so a
+    backlog past `maxlen` is kept rather than dropped.
+    """
+
+    name = 'streams'
+
+    def __init__(self, stream: Optional[str] = None, group: Optional[str] = None,
+                 maxlen: Optional[int] = None, queue_manager: Optional[AsyncQueueManager] = None):
+        self.stream = stream or settings.STREAM_KEY
+        self.group = group or settings.STREAM_GROUP
+        self.maxlen = maxlen or settings.STREAM_MAXLEN
+        self.queue_manager = queue_manager or AsyncQueueManager()
+        self._groups_created: set = set()
+
+    @property
+    def redis_client(self) -> aioredis.Redis:
+        return self.queue_manager.redis_client
+
+    async def ensure_group(self):
+        """Create the stream and consumer group if they do not exist yet"""
+        client = self.redis_client
+        if id(client) in self._groups_created:
+            return
+        try:
+            await client.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except aioredis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._groups_created.add(id(client))
+
+    async def submit(self, tasks: List[Dict[str, Any]]) -> List[int]:
+        if not tasks:
+            return [0]
+        pipe = self.redis_client.pipeline(transaction=False)
+        for task in tasks:
+            pipe.xadd(self.stream, {'task': self.queue_manager.codec.encode(stamp_enqueued(task))})
+        start = time.perf_counter()
+        await pipe.execute()
+        REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'distribute_tasks')
+        return [len(tasks)]
+
+    async def claim(self, consumer: str, max_n: int, timeout: float = 1) -> List[Dict[str, Any]]:
+        await self.ensure_group()
+        try:
+            start = time.perf_counter()
+            reply = await self.redis_client.xreadgroup(self.group, consumer, {self.stream: '>'},
+                                                       count=max_n)
+            REDIS_ROUNDTRIP_SECONDS.observe(time.perf_counter() - start, 'claim_many')
+            if not reply and timeout > 0:
+                reply = await self.redis_client.xreadgroup(self.group, consumer, {self.stream: '>'},
+                                                           count=max_n, block=max(int(timeout * 1000), 1))
+            return [self._decode(entry) for _, entries in reply or [] for entry in entries]
+        except Exception as e:
+            print(f"Error claiming from stream {self.stream}: {e}")
+            return []
+
+    async def complete(self, consumer: str, tasks: List[Dict[str, Any]],
+                       results: List[Dict[str, Any]]) -> None:
+        pipe = self.redis_client.pipeline(transaction=False)
+        if results:
+            queue_results(pipe, results, settings.RESULT_TTL, self.queue_manager.codec)
+        receipts = [task['receipt'] for task in tasks if 'receipt' in task]
+        if receipts:
+            pipe.xack(self.stream, self.group, *receipts)
+        await pipe.execute()
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        released = 0
+        for task in tasks:
+            if 'receipt' in task:
+                released += await self._requeue(task) is not None
+        return released
+
+    async def reap(self) -> Dict[str, int]:
+        """
+        Take over entries pending longer than VISIBILITY_TIMEOUT, whichever
+        consumer holds them, and re-add them to the stream. XAUTOCLAIM
+        resets an entry's idle time, so concurrent reapers never requeue
+        the same entry twice
+        """
+        await self.ensure_group()
+        totals = {'requeued': 0, 'dead_lettered': 0}
+        cursor = '0-0'
+        while True:
+            cursor, entries, *_ = await self.redis_client.xautoclaim(
+                self.stream, self.group, 'reaper', settings.VISIBILITY_TIMEOUT * 1000,
+                start_id=cursor, count=100)
+            # Redis 6.2 still returns entries deleted from the stream, with
+            # no fields; there is no task left to requeue, so just ack them
+            deleted = [entry_id for entry_id, fields in entries if entry_id is not None and not fields]
+            if deleted:
+                await self.redis_client.xack(self.stream, self.group, *deleted)
+                print(f"Reaper dropped {len(deleted)} pending entries deleted from {self.stream}")
+            for entry in entries:
+                if entry[1]:
+                    outcome = await self._requeue(self._decode(entry))
+                    if outcome is not None:
+                        totals[outcome] += 1
+            if cursor in ('0-0', b'0-0'):
+                break
+        if totals['requeued'] or totals['dead_lettered']:
+            print(f"Reaper requeued {totals['requeued']} expired tasks, "
+                  f"dead-lettered {totals['dead_lettered']}")
+        await self.trim()
+        return totals
+
+    async def trim(self) -> int:
+        """
+        Once the stream holds more than `maxlen` entries, trim those that
+        every group has both read and acked
+        Returns the number of entries trimmed
+        """
+        if await self.redis_client.xlen(self.stream) <= self.maxlen:
+            return 0
+        # Entry ids only grow, so nothing added after this check is trimmed
+        keep_from = None
+        for group in await self.redis_client.xinfo_groups(self.stream):
+            oldest = group['last-delivered-id']
+            if group['pending']:
+                pending = await self.redis_client.xpending(self.stream, group['name'])
+                oldest = min(oldest, pending['min'], key=_entry_id)
+            keep_from = oldest if keep_from is None else min(keep_from, oldest, key=_entry_id)
+        if keep_from is None or _entry_id(keep_from) == (0, 0):
+            return 0
+        return await self.redis_client.xtrim(self.stream, minid=keep_from, approximate=True)
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        """Entries not yet delivered, then each consumer's unacked entries"""
+        await self.ensure_group()
+        groups = await self.redis_client.xinfo_groups(self.stream)
+        group = next((g for g in groups if g['name'] == self.group.encode('utf-8')), {})
+        consumers = await self.redis_client.xinfo_consumers(self.stream, self.group)
+        # Redis < 7 does not report lag, so the backlog reads as 0 there
+        lengths = {self.stream: group.get('lag') or 0}
+        lengths.update({consumer['name'].decode('utf-8'): consumer['pending'] for consumer in consumers})
+        return lengths
+
+    def _decode(self, entry: Tuple[bytes, Dict[bytes, bytes]]) -> Dict[str, Any]:
+        entry_id, fields = entry
+        return {**decode(fields[b'task']), 'receipt': entry_id.decode('utf-8')}
+
+    async def _requeue(self, task: Dict[str, Any]) -> Optional[str]:
+        """
+        Ack a delivered entry and either re-add its task to the stream or,
+        after MAX_DELIVERY_ATTEMPTS, push it to the dead-letter queue
+        """
+        receipt = task['receipt']
+        task = {field: value for field, value in task.items() if field != 'receipt'}
+        requeue = self.redis_client.register_script(REQUEUE_ENTRY)
+        outcome = await requeue(
+            keys=[self.stream, settings.DEAD_LETTER_QUEUE, f"attempts:{task.get('id', receipt)}"],
+            args=[self.group, receipt, self.queue_manager.codec.encode(task),
+                  settings.MAX_DELIVERY_ATTEMPTS, ATTEMPTS_TTL]
+        )
+        return {1: 'requeued', 2: 'dead_lettered'}.get(outcome)
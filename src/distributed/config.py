@@ -10,6 +10,40 @@ class Settings(BaseSettings):
     # Distributed system settings
     WORKER_COUNT: int = 3
     BATCH_SIZE: int = 100
+    BATCH_MAX_WAIT_MS: int = 50
     QUEUE_TIMEOUT: int = 30
+    RESULT_TTL: int = 300
+    RESULTS_LOG_SIZE: int = 1000
+    
+    # Reliable consumption: unacked tasks are redelivered after their
+    # visibility timeout and dead-lettered after too many attempts
+    VISIBILITY_TIMEOUT: int = 60
+    MAX_DELIVERY_ATTEMPTS: int = 3
+    REAPER_INTERVAL: int = 5
+    CLAIM_POLL_MS: int = 100
+    DEAD_LETTER_QUEUE: str = "tasks:dead"
+    
+    # Queue engine: "lists" (per-worker lists), "streams" (one stream read
+    # by a consumer group) or "memory" (in-process, single node; the API
+    # then runs the workers itself, as child processes if requested)
+    QUEUE_BACKEND: str = "lists"
+    LOCAL_WORKER_PROCESSES: bool = False
+    STREAM_KEY: str = "tasks:stream"
+    STREAM_GROUP: str = "workers"
+    STREAM_MAXLEN: int = 1000000
+    # Task and result payloads: "binary" (compact, see codec.py) or "json".
+    # Readers decode both, so switch writers only once readers understand
+    # the format being written
+    QUEUE_CODEC: str = "binary"
+    
+    # Rolling metrics: bucket width and longest window served by /metrics
+    METRICS_BUCKET_SECONDS: int = 10
+    METRICS_WINDOW_SECONDS: int = 300
+    
+    # Model artifacts
+    MODEL_DIR: str = "models"
+    
+    # Intra-op threads per worker process; several workers share a node
+    TORCH_NUM_THREADS: int = 1
 
 settings = Settings()
\ No newline at end of file
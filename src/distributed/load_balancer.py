@@ -1,26 +1,29 @@
-from typing import List
-import random
-from .queue_manager import QueueManager
+from typing import Any, Dict, List, Optional
+from .backends import QueueBackend, get_backend
 
 class LoadBalancer:
-    def __init__(self, worker_count: int):
+    def __init__(self, worker_count: int, backend: Optional[QueueBackend] = None):
         self.worker_count = worker_count
-        self.queue_manager = QueueManager()
-        
-    def distribute_task(self, task):
-        """Distribute task using round-robin strategy"""
-        queue_lengths = [
-            self.queue_manager.get_queue_length(f'worker_{i}')
-            for i in range(self.worker_count)
-        ]
-        
-        # Select worker with shortest queue
-        target_worker = queue_lengths.index(min(queue_lengths))
-        self.queue_manager.push_task(f'worker_{target_worker}', task)
-        
-    def health_check(self) -> List[bool]:
+        self.backend = backend or get_backend(worker_count=worker_count)
+        self.queue_manager = self.backend.queue_manager
+
+    async def distribute_task(self, task: Dict[str, Any]) -> int:
+        """
+        Push a task onto the least-loaded worker queue
+        Returns the id of the worker queue the task was assigned to (always
+        0 with the streams backend, where workers share one stream)
+        """
+        assigned = await self.distribute_tasks([task])
+        return assigned.index(1)
+
+    async def distribute_tasks(self, tasks: List[Dict[str, Any]]) -> List[int]:
+        """
+        Distribute a batch of tasks through the configured queue backend
+        With lists, the shortest worker queues are filled first. Returns the
+        number of tasks assigned to each worker queue (or to the stream)
+        """
+        return await self.backend.submit(tasks)
+
+    async def health_check(self) -> List[bool]:
         """Check health of all workers"""
-        return [
-            self.queue_manager.get_queue_length(f'worker_{i}') < 1000
-            for i in range(self.worker_count)
-        ]
\ No newline at end of file
+        return [length < 1000 for length in (await self.backend.queue_lengths()).values()]
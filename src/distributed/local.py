@@ -0,0 +1,208 @@
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import multiprocessing.synchronize
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Set
+from .backends.base import QueueBackend
+from .backends.memory import MemoryBackend
+from .config import settings
+from .worker import Worker
+
+# Consumer name under which the parent holds tasks it handed to the pool
+POOL_CONSUMER = 'local_pool'
+
+class LocalCluster:
+    """
+    Workers for the in-memory backend on a single node
+
+    By default the workers are tasks on the caller's event loop, sharing
+    its MemoryQueueManager. With `processes=True` each worker is a child
+    process instead, so models run on several cores: the parent claims
+    batches from the in-memory queue and hands them over a multiprocessing
+    queue, and children send results (and metrics) back the same way. The
+    parent keeps the leases, so tasks held by a child that dies are
+    redelivered once their visibility timeout expires. A batch is only
+    claimed once a child has asked for one, so leased tasks never sit in
+    the pipe behind busy children until their lease runs out.
+    """
+
+    def __init__(self, worker_count: Optional[int] = None, processes: bool = False,
+                 backend: Optional[MemoryBackend] = None):
+        self.worker_count = worker_count or settings.WORKER_COUNT
+        self.processes = processes
+        self.backend = backend or MemoryBackend()
+        self.workers: List[Worker] = []
+        self._tasks: List[asyncio.Task] = []
+        self._children: List[multiprocessing.Process] = []
+        self._publishing: Set[concurrent.futures.Future] = set()
+        self.running = False
+
+    async def start(self):
+        """Start the workers (and, with processes, the dispatch loops)"""
+        self.running = True
+        if not self.processes:
+            self.workers = [Worker(i, backend=self.backend) for i in range(self.worker_count)]
+            self._tasks = [asyncio.create_task(worker.run()) for worker in self.workers]
+            print(f"Started {self.worker_count} in-process workers")
+            return
+
+        context = multiprocessing.get_context('spawn')
+        self.task_queue = context.Queue()
+        self.result_queue = context.Queue()
+        # Released by each child that is waiting for a batch
+        self.ready = context.Semaphore(0)
+        self._children = [
+            context.Process(target=run_pool_worker,
+                            args=(i, self.task_queue, self.result_queue, self.ready), daemon=True)
+            for i in range(self.worker_count)
+        ]
+        for child in self._children:
+            child.start()
+        loop = asyncio.get_running_loop()
+        self._collector = threading.Thread(target=self._collect, args=(loop,), daemon=True)
+        self._collector.start()
+        self._tasks = [asyncio.create_task(self._dispatch()), asyncio.create_task(self._reap())]
+        print(f"Started {self.worker_count} worker processes")
+
+    async def stop(self):
+        """Stop the workers and wait for them to exit"""
+        self.running = False
+        for worker in self.workers:
+            worker.running = False
+        if self._children:
+            loop = asyncio.get_running_loop()
+            for _ in self._children:
+                self.task_queue.put(None)
+            for child in self._children:
+                await loop.run_in_executor(None, child.join, 5)
+                if child.is_alive():
+                    child.terminate()
+            self.result_queue.put(None)
+            await loop.run_in_executor(None, self._collector.join, 5)
+            # Let the last results and acks land before returning
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self._publishing)),
+                                 return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _dispatch(self):
+        """Move claimed batches from the in-memory queue into the pool"""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            # Wait (off the loop) for an idle child before leasing anything
+            if not await loop.run_in_executor(None, self.ready.acquire, True, 1):
+                continue
+            tasks: List[Dict[str, Any]] = []
+            while self.running and not tasks:
+                tasks = await self.backend.claim(POOL_CONSUMER, settings.BATCH_SIZE)
+            if tasks:
+                self.task_queue.put(tasks)
+
+    async def _reap(self):
+        while self.running:
+            await self.backend.reap()
+            await asyncio.sleep(settings.REAPER_INTERVAL)
+
+    def _collect(self, loop: asyncio.AbstractEventLoop):
+        """Apply messages from the children on the parent's event loop"""
+        handlers = {
+            'complete': lambda tasks, results: self.backend.complete(POOL_CONSUMER, tasks, results),
+            'release': lambda tasks: self.backend.release(POOL_CONSUMER, tasks),
+            'metrics': self.backend.queue_manager.increment_fields
+        }
+        while True:
+            message = self.result_queue.get()
+            if message is None:
+                return
+            kind, *args = message
+            future = asyncio.run_coroutine_threadsafe(handlers[kind](*args), loop)
+            self._publishing.add(future)
+            future.add_done_callback(functools.partial(self._published, kind))
+
+    def _published(self, kind: str, future: concurrent.futures.Future):
+        self._publishing.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            # Leased tasks are redelivered by the reaper if their ack was lost
+            print(f"Error applying {kind} from the worker pool: {future.exception()}")
+
+class PipeQueueManager:
+    """
+    The part of the queue manager API a pool worker needs: metrics updates,
+    forwarded to the parent's in-memory queue manager
+    """
+
+    def __init__(self, result_queue: multiprocessing.Queue):
+        self.result_queue = result_queue
+
+    async def increment_fields(self, key: str, counters: Dict[str, float], ttl: int) -> None:
+        self.result_queue.put(('metrics', key, dict(counters), ttl))
+
+class PipeBackend(QueueBackend):
+    """Worker-side backend of a LocalCluster pool: batches in, results out"""
+
+    name = 'pipe'
+
+    def __init__(self, task_queue: multiprocessing.Queue, result_queue: multiprocessing.Queue,
+                 ready: "multiprocessing.synchronize.Semaphore"):
+        self.task_queue = task_queue
+        self.result_queue = result_queue
+        self.ready = ready
+        self.queue_manager = PipeQueueManager(result_queue)
+        self.buffer: List[Dict[str, Any]] = []
+        self.requested = False
+        self.closed = False
+
+    async def claim(self, consumer: str, max_n: int, timeout: float = 1) -> List[Dict[str, Any]]:
+        if not self.buffer and not self.closed:
+            if not self.requested:
+                # Ask for one batch at a time; the parent claims it only now
+                self.ready.release()
+                self.requested = True
+            try:
+                tasks = await asyncio.get_running_loop().run_in_executor(
+                    None, self.task_queue.get, True, max(timeout, 0.001))
+            except queue.Empty:
+                return []
+            self.requested = False
+            if tasks is None:
+                self.closed = True
+            else:
+                self.buffer = tasks
+        claimed, self.buffer = self.buffer[:max_n], self.buffer[max_n:]
+        return claimed
+
+    async def complete(self, consumer: str, tasks: List[Dict[str, Any]],
+                       results: List[Dict[str, Any]]) -> None:
+        self.result_queue.put(('complete', tasks, results))
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        self.result_queue.put(('release', tasks))
+        return len(tasks)
+
+    async def reap(self) -> Dict[str, int]:
+        # Leases are kept, and reaped, by the parent
+        return {'requeued': 0, 'dead_lettered': 0}
+
+    async def queue_lengths(self) -> Dict[str, int]:
+        return {'buffered': len(self.buffer)}
+
+def run_pool_worker(worker_id: int, task_queue: multiprocessing.Queue,
+                    result_queue: multiprocessing.Queue,
+                    ready: "multiprocessing.synchronize.Semaphore"):
+    """Entry point of a LocalCluster child process"""
+    backend = PipeBackend(task_queue, result_queue, ready)
+    worker = Worker(worker_id, backend=backend)
+    worker.start_metrics_server()
+
+    async def run():
+        runner = asyncio.create_task(worker.run())
+        while not backend.closed or backend.buffer:
+            await asyncio.sleep(0.1)
+        worker.running = False
+        await runner
+
+    asyncio.run(run())
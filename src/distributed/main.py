@@ -1,35 +1,32 @@
-import asyncio
 import uvicorn
-from typing import List
 import multiprocessing
-from .worker import Worker
+from typing import Optional
 from .config import settings
 from .api import app
 
-def start_worker(worker_id: int):
-    """Start a worker process"""
-    worker = Worker(worker_id)
-    worker.run()
-
 def start_distributed_system():
     """Start the distributed system"""
-    # Start worker processes
-    processes: List[multiprocessing.Process] = []
-    for i in range(settings.WORKER_COUNT):
-        p = multiprocessing.Process(target=start_worker, args=(i,))
-        p.start()
-        processes.append(p)
-    
+    # Start the worker supervisor, which runs and scales the worker
+    # processes (with the memory backend the API runs its own workers)
+    supervisor: Optional[multiprocessing.Process] = None
+    if settings.QUEUE_BACKEND != 'memory':
+        # Imported here so `python -m src.distributed.supervisor` does not
+        # import itself through the package
+        from .supervisor import run_supervisor
+        supervisor = multiprocessing.get_context('spawn').Process(target=run_supervisor, name='supervisor')
+        supervisor.start()
+
     # Start API server
     uvicorn.run(
         app,
         host=settings.SERVICE_HOST,
         port=settings.SERVICE_PORT
     )
-    
-    # Wait for workers to complete
-    for p in processes:
-        p.join()
+
+    # Stop the workers once the API has shut down
+    if supervisor is not None:
+        supervisor.terminate()
+        supervisor.join()
 
 if __name__ == "__main__":
-    start_distributed_system()
\ No newline at end of file
+    start_distributed_system()
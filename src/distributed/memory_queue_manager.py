@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .config import settings
+from .queue_manager import SHARED_QUEUE, stamp_enqueued
+
+class MemoryQueueManager:
+    """
+    In-process counterpart of AsyncQueueManager
+
+    Same coroutines, arguments and return values, backed by deques and
+    futures on the running event loop instead of Redis, so an API and its
+    workers in one process (or one parent process feeding a local pool, see
+    LocalCluster) exchange tasks and results without a network hop or any
+    serialization. Tasks are stored as the dicts that were pushed; pops and
+    claims return shallow copies. State lives only as long as the process.
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, deque] = {'results': deque(maxlen=settings.RESULTS_LOG_SIZE)}
+        # Claimed tasks per consumer: receipt -> (task, visibility deadline)
+        self.processing: Dict[str, Dict[int, Tuple[Dict[str, Any], float]]] = {}
+        self.attempts: Counter = Counter()
+        self.replies: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.waiters: Dict[str, asyncio.Future] = {}
+        self.hashes: Dict[str, Tuple[Counter, float]] = {}
+        self._receipts = itertools.count(1)
+        self._pushed = asyncio.Event()
+
+    async def ping(self) -> bool:
+        """Nothing to connect to; always available"""
+        return True
+
+    async def push_task(self, queue_name: str, task: Dict[str, Any]) -> int:
+        """
+        Push a task to the specified queue
+        Returns the length of the queue after pushing
+        """
+        return await self.push_many(queue_name, [task])
+
+    async def push_many(self, queue_name: str, tasks: List[Dict[str, Any]],
+                        chunk_size: int = 1000) -> int:
+        """
+        Push many tasks to the specified queue
+        Returns the length of the queue after pushing
+        """
+        queue = self.queues.setdefault(queue_name, deque())
+        queue.extend(stamp_enqueued(task) for task in tasks)
+        if tasks:
+            self._notify()
+        return len(queue)
+
+    async def pop_task(self, queue_name: str, timeout: float = 1) -> Optional[Dict[str, Any]]:
+        """
+        Pop a task from the specified queue, waiting for up to `timeout` seconds
+        Returns None if no task is available
+        """
+        tasks = await self.pop_many(queue_name, 1, timeout)
+        return tasks[0] if tasks else None
+
+    async def pop_many(self, queue_name: Union[str, List[str]], max_n: int,
+                       timeout: float = 1) -> List[Dict[str, Any]]:
+        """
+        Pop up to `max_n` tasks from the first non-empty of the given queues
+        Returns an empty list if nothing arrives within `timeout` seconds
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        return [dict(task) for task in await self._take(queue_names, max_n, timeout)]
+
+    async def claim_many(self, queue_name: Union[str, List[str]], consumer: str, max_n: int,
+                         timeout: float = 1, visibility_timeout: Optional[float] = None
+                         ) -> List[Dict[str, Any]]:
+        """
+        Claim up to `max_n` tasks for `consumer` from the first non-empty queue
+        Each task is held for the consumer until acked and carries a
+        `receipt`; see QueueManager.claim_many
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        visibility_timeout = settings.VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+        tasks = await self._take(queue_names, max_n, timeout)
+        held = self.processing.setdefault(consumer, {})
+        deadline = time.time() + visibility_timeout
+        claimed = []
+        for task in tasks:
+            receipt = next(self._receipts)
+            held[receipt] = (task, deadline)
+            claimed.append({**task, 'receipt': receipt})
+        return claimed
+
+    async def ack(self, consumer: str, tasks: List[Dict[str, Any]]) -> None:
+        """Mark claimed tasks as done so they are never redelivered"""
+        held = self.processing.get(consumer, {})
+        for task in tasks:
+            entry = held.pop(task.get('receipt'), None)
+            if entry is not None and entry[0].get('id') in self.attempts:
+                del self.attempts[entry[0]['id']]
+
+    async def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Give claimed tasks back for redelivery now, counting a failed attempt
+        Returns the number of tasks released
+        """
+        held = self.processing.get(consumer, {})
+        return sum(self._requeue(held, task.get('receipt')) > 0 for task in tasks)
+
+    async def reap(self, lease_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Redeliver every consumer's tasks whose visibility timeout has expired"""
+        totals = {'requeued': 0, 'dead_lettered': 0}
+        now = time.time()
+        for held in self.processing.values():
+            for receipt in [r for r, (_, deadline) in held.items() if deadline <= now]:
+                outcome = self._requeue(held, receipt)
+                totals['requeued'] += outcome == 1
+                totals['dead_lettered'] += outcome == 2
+        if totals['requeued'] or totals['dead_lettered']:
+            print(f"Reaper requeued {totals['requeued']} expired tasks, "
+                  f"dead-lettered {totals['dead_lettered']}")
+        return totals
+
+    async def push_result(self, result: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Publish a task result to whoever is waiting for it"""
+        await self.push_results([result], ttl)
+
+    async def push_results(self, results: List[Dict[str, Any]], ttl: Optional[int] = None,
+                           ack: Optional[Tuple[str, List[Dict[str, Any]]]] = None) -> None:
+        """
+        Publish a batch of task results
+        With `ack=(consumer, tasks)`, the claimed tasks are acked afterwards
+        """
+        ttl = settings.RESULT_TTL if ttl is None else ttl
+        now = time.time()
+        while self.replies and next(iter(self.replies.values()))[1] <= now:
+            self.replies.popitem(last=False)
+        for result in results:
+            self.queues['results'].appendleft(result)
+            task_id = result.get('task_id')
+            if task_id is None:
+                continue
+            waiter = self.waiters.pop(str(task_id), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(result)
+            else:
+                self.replies[str(task_id)] = (result, now + ttl)
+        if ack is not None:
+            await self.ack(*ack)
+
+    async def await_result(self, task_id: str, timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """
+        Wait until the result for `task_id` is published
+        Returns None if it does not arrive within `timeout` seconds
+        """
+        reply = self.replies.pop(task_id, None)
+        if reply is not None:
+            return reply[0]
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[task_id] = waiter
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if self.waiters.get(task_id) is waiter:
+                del self.waiters[task_id]
+
+    async def get_queue_length(self, queue_name: str) -> int:
+        """Get the current length of the queue"""
+        return len(self.queues.get(queue_name, ()))
+
+    async def increment_fields(self, key: str, counters: Dict[str, float], ttl: int) -> None:
+        """Add `counters` to the fields of a hash that expires `ttl` seconds from now"""
+        now = time.time()
+        for expired in [k for k, (_, expires_at) in self.hashes.items() if expires_at <= now]:
+            del self.hashes[expired]
+        fields, _ = self.hashes.get(key, (Counter(), 0))
+        fields.update(counters)
+        self.hashes[key] = (fields, now + ttl)
+
+    async def get_fields(self, keys: List[str]) -> List[Dict[str, float]]:
+        """All fields of each hash in `keys`"""
+        now = time.time()
+        hashes = [self.hashes.get(key) for key in keys]
+        return [dict(h[0]) if h is not None and h[1] > now else {} for h in hashes]
+
+    async def _take(self, queue_names: List[str], max_n: int, timeout: float) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            for queue_name in queue_names:
+                queue = self.queues.get(queue_name)
+                if queue:
+                    return [queue.popleft() for _ in range(min(max_n, len(queue)))]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(self._pushed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    def _notify(self):
+        # Wake every waiting consumer; each re-checks its queues
+        self._pushed.set()
+        self._pushed = asyncio.Event()
+
+    def _requeue(self, held: Dict[int, Tuple[Dict[str, Any], float]], receipt: Any) -> int:
+        entry = held.pop(receipt, None)
+        if entry is None:
+            return 0  # Acked in the meantime
+        task = entry[0]
+        task_id = task.get('id', receipt)
+        self.attempts[task_id] += 1
+        if self.attempts[task_id] >= settings.MAX_DELIVERY_ATTEMPTS:
+            del self.attempts[task_id]
+            self.queues.setdefault(settings.DEAD_LETTER_QUEUE, deque()).append(task)
+            return 2
+        # Retried tasks go to the consuming end, as with the Redis lists
+        self.queues.setdefault(SHARED_QUEUE, deque()).appendleft(task)
+        self._notify()
+        return 1
+
+_shared: Optional[MemoryQueueManager] = None
+
+def get_memory_queue_manager() -> MemoryQueueManager:
+    """The process-wide in-memory queue manager shared by the API and local workers"""
+    global _shared
+    if _shared is None:
+        _shared = MemoryQueueManager()
+    return _shared
@@ -0,0 +1,177 @@
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .async_queue_manager import AsyncQueueManager
+from .config import settings
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended
+LATENCY_BOUNDS_MS = np.array([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, np.inf])
+PERCENTILES = (50, 95, 99)
+
+def bucket_key(bucket_start: int) -> str:
+    """Redis hash holding the counters of one time bucket"""
+    return f"metrics:{bucket_start}"
+
+class MetricsRecorder:
+    """
+    Aggregates per-task outcomes into time-bucketed Redis hashes
+
+    Each METRICS_BUCKET_SECONDS window is one hash whose fields are counters
+    (tasks, errors, latency sum and histogram per task type and channel,
+    sentiment labels, tasks per worker). A batch of tasks costs one HINCRBY
+    per distinct field, sent in a single pipeline, and buckets expire once
+    they fall out of the longest window served.
+    """
+
+    def __init__(self, queue_manager: Optional[AsyncQueueManager] = None):
+        self.queue_manager = queue_manager or AsyncQueueManager()
+        self.bucket_seconds = settings.METRICS_BUCKET_SECONDS
+        self.ttl = settings.METRICS_WINDOW_SECONDS + 2 * self.bucket_seconds
+
+    async def record(self, outcomes: List[Dict[str, Any]], worker_id: Optional[int] = None):
+        """
+        Record a batch of task outcomes, each a dict with `type`, `channel`,
+        `latency_ms`, `ok` and optionally `sentiment`
+        """
+        if not outcomes:
+            return
+        counters = aggregate(outcomes)
+        if worker_id is not None:
+            counters[f"worker:{worker_id}"] += len(outcomes)
+
+        bucket = int(time.time()) // self.bucket_seconds * self.bucket_seconds
+        key = bucket_key(bucket)
+        try:
+            await self.queue_manager.increment_fields(key, counters, self.ttl)
+        except Exception as e:
+            # Metrics must never fail the tasks they describe
+            print(f"Error recording metrics: {e}")
+
+class MetricsReader:
+    """Rolling-window aggregates over the buckets written by MetricsRecorder"""
+
+    def __init__(self, queue_manager: Optional[AsyncQueueManager] = None):
+        self.queue_manager = queue_manager or AsyncQueueManager()
+        self.bucket_seconds = settings.METRICS_BUCKET_SECONDS
+
+    async def summary(self, window_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """Aggregate the last `window_seconds` (default METRICS_WINDOW_SECONDS)"""
+        window_seconds = min(window_seconds or settings.METRICS_WINDOW_SECONDS,
+                             settings.METRICS_WINDOW_SECONDS)
+        now = int(time.time())
+        current = now // self.bucket_seconds * self.bucket_seconds
+        n_buckets = max(1, -(-window_seconds // self.bucket_seconds))
+        buckets = await self.queue_manager.get_fields(
+            [bucket_key(current - i * self.bucket_seconds) for i in range(n_buckets)])
+        # The current bucket is only partly elapsed
+        elapsed = (n_buckets - 1) * self.bucket_seconds + (now - current) + 1
+        return summarize(buckets, elapsed)
+
+def aggregate(outcomes: Iterable[Dict[str, Any]]) -> Counter:
+    """Counter increments for a batch of task outcomes"""
+    counters: Counter = Counter()
+    outcomes = list(outcomes)
+    latencies = np.array([outcome['latency_ms'] for outcome in outcomes], dtype=float)
+    histogram_bins = np.searchsorted(LATENCY_BOUNDS_MS, latencies)
+    for outcome, latency, histogram_bin in zip(outcomes, latencies.tolist(), histogram_bins.tolist()):
+        series = f"{outcome['type']}|{outcome.get('channel') or 'unknown'}"
+        counters[f"count:{series}"] += 1
+        if not outcome['ok']:
+            counters[f"errors:{series}"] += 1
+        counters[f"latency_sum:{series}"] += latency
+        counters[f"latency:{series}:{histogram_bin}"] += 1
+        if outcome.get('sentiment'):
+            counters[f"sentiment:{outcome['sentiment']}"] += 1
+    return counters
+
+def estimate_percentiles(histogram: np.ndarray, percentiles=PERCENTILES) -> Dict[str, float]:
+    """
+    Percentiles of a LATENCY_BOUNDS_MS histogram, interpolating linearly
+    within the bucket each one falls in
+    """
+    total = histogram.sum()
+    if total == 0:
+        return {f"p{p}": 0.0 for p in percentiles}
+    cumulative = np.cumsum(histogram)
+    lower_bounds = np.concatenate([[0.0], LATENCY_BOUNDS_MS[:-1]])
+    estimates = {}
+    for p in percentiles:
+        rank = total * p / 100
+        i = int(np.searchsorted(cumulative, rank))
+        lower, upper = lower_bounds[i], LATENCY_BOUNDS_MS[i]
+        if np.isinf(upper):
+            estimates[f"p{p}"] = float(lower)
+            continue
+        before = cumulative[i - 1] if i > 0 else 0
+        fraction = (rank - before) / histogram[i]
+        estimates[f"p{p}"] = float(lower + fraction * (upper - lower))
+    return estimates
+
+def summarize(buckets: List[Dict[str, str]], window_seconds: float) -> Dict[str, Any]:
+    """
+    Merge bucket hashes into throughput, error, latency and sentiment
+    aggregates. Cost is proportional to the number of bucket fields, not
+    to the number of tasks
+    """
+    totals: Counter = Counter()
+    for bucket in buckets:
+        for field, value in bucket.items():
+            totals[field] += float(value)
+
+    series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    sentiments, workers = {}, set()
+    for field, value in totals.items():
+        kind, _, rest = field.partition(':')
+        if kind == 'sentiment':
+            sentiments[rest] = int(value)
+        elif kind == 'worker':
+            workers.add(rest)
+        elif kind == 'latency':
+            name, histogram_bin = rest.rsplit(':', 1)
+            key = tuple(name.split('|', 1))
+            series.setdefault(key, _empty_stats())['histogram'][int(histogram_bin)] += value
+        elif kind in ('count', 'errors', 'latency_sum'):
+            key = tuple(rest.split('|', 1))
+            series.setdefault(key, _empty_stats())[kind] += value
+
+    def rollup(group: int) -> Dict[str, Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for key, stats in series.items():
+            target = merged.setdefault(key[group], _empty_stats())
+            for name, value in stats.items():
+                target[name] += value
+        return {name: _describe(stats) for name, stats in sorted(merged.items())}
+
+    tasks = int(sum(stats['count'] for stats in series.values()))
+    errors = int(sum(stats['errors'] for stats in series.values()))
+    by_type = rollup(0)
+    by_channel = rollup(1)
+    return {
+        'window_seconds': window_seconds,
+        'throughput': {
+            'tasks_processed': tasks,
+            'tasks_per_second': tasks / window_seconds if window_seconds else 0.0
+        },
+        'error_rate': errors / tasks if tasks else 0.0,
+        'active_workers': len(workers),
+        'latency': {
+            'by_task_type': by_type,
+            'by_channel': by_channel
+        },
+        'channels': {name: stats['count'] for name, stats in by_channel.items()},
+        'sentiments': sentiments
+    }
+
+def _empty_stats() -> Dict[str, Any]:
+    return {'count': 0, 'errors': 0, 'latency_sum': 0.0,
+            'histogram': np.zeros(len(LATENCY_BOUNDS_MS))}
+
+def _describe(stats: Dict[str, Any]) -> Dict[str, Any]:
+    count = int(stats['count'])
+    return {
+        'count': count,
+        'errors': int(stats['errors']),
+        'mean_ms': stats['latency_sum'] / count if count else 0.0,
+        **{f"{name}_ms": value for name, value in estimate_percentiles(stats['histogram']).items()}
+    }
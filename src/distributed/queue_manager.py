@@ -1,14 +1,167 @@
 import redis
-import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
+from .codec import Codec, decode, get_codec
+from .config import settings
+
+# Workers announce finished task ids on this channel after writing the replies
+RESULT_CHANNEL = 'results:ready'
+
+def result_key(task_id: str) -> str:
+    """Redis key holding the reply for a single task"""
+    return f"result:{task_id}"
+
+def stamp_enqueued(task: Dict[str, Any]) -> Dict[str, Any]:
+    """The task with the time it was first enqueued, for end-to-end latency metrics"""
+    if 'enqueued_at' in task:
+        return task
+    return {**task, 'enqueued_at': time.time()}
+
+# Reliable consumption. A claimed task is moved, not popped, from its queue
+# onto the consumer's processing list and given a lease in a sorted set
+# scored by its visibility deadline. Acking removes it from both. A task
+# whose lease expires (its consumer died or hung) goes back on the shared
+# queue, or to the dead-letter queue after MAX_DELIVERY_ATTEMPTS.
+CONSUMERS = 'processing:consumers'
+SHARED_QUEUE = 'tasks'
+# Delivery counts outlive any plausible retry loop, then expire on their own
+ATTEMPTS_TTL = 24 * 3600
+
+def processing_list(consumer: str) -> str:
+    """Tasks a consumer has claimed but not yet acked"""
+    return f"processing:{consumer}"
+
+def lease_key(consumer: str) -> str:
+    """Visibility deadline of each of a consumer's claimed tasks"""
+    return f"processing:{consumer}:leases"
+
+def queue_results(pipe, results: List[Dict[str, Any]], ttl: int, codec: Codec):
+    """
+    Add the commands publishing `results` to a pipeline: each under its
+    reply key, a capped copy on the `results` list, and one notification
+    naming the finished task ids
+    """
+    payloads = []
+    for result in results:
+        payload = codec.encode(result)
+        payloads.append(payload)
+        task_id = result.get('task_id')
+        if task_id is not None:
+            pipe.lpush(result_key(task_id), payload)
+            pipe.expire(result_key(task_id), ttl)
+    pipe.lpush('results', *payloads)
+    pipe.ltrim('results', 0, settings.RESULTS_LOG_SIZE - 1)
+    task_ids = [str(result['task_id']) for result in results
+                if result.get('task_id') is not None]
+    if task_ids:
+        pipe.publish(RESULT_CHANNEL, '\n'.join(task_ids))
+
+def queue_ack(pipe, consumer: str, tasks: List[Dict[str, Any]]):
+    """Add the commands acking claimed `tasks` to a pipeline"""
+    receipts = [task['receipt'] for task in tasks if 'receipt' in task]
+    if receipts:
+        for receipt in receipts:
+            pipe.lrem(processing_list(consumer), 1, receipt)
+        pipe.zrem(lease_key(consumer), *receipts)
+
+# KEYS: processing list, leases, consumers set, source queues in priority
+# order. ARGV: max tasks, visibility deadline, consumer. Moves up to max
+# tasks from the first non-empty queue, as LMPOP would pop them
+CLAIM = """
+local claimed = {}
+local max_n = tonumber(ARGV[1])
+for i = 4, #KEYS do
+    while #claimed < max_n do
+        local payload = redis.call('LMOVE', KEYS[i], KEYS[1], 'RIGHT', 'LEFT')
+        if not payload then
+            break
+        end
+        redis.call('ZADD', KEYS[2], ARGV[2], payload)
+        claimed[#claimed + 1] = payload
+    end
+    if #claimed > 0 then
+        redis.call('SADD', KEYS[3], ARGV[3])
+        break
+    end
+end
+return claimed
+"""
+
+# Shared by REAP and RELEASE. KEYS: processing list, leases, shared queue,
+# dead-letter queue. Delivery attempts are counted under attempts:<task id>
+# (attempts:<payload> for binary payloads, which Lua cannot parse) rather
+# than in the payload, so a requeued task is byte-for-byte the task that
+# was enqueued
+_REQUEUE = """
+local function requeue(payload, max_attempts, attempts_ttl)
+    redis.call('ZREM', KEYS[2], payload)
+    if redis.call('LREM', KEYS[1], 1, payload) == 0 then
+        return 0  -- Acked in the meantime
+    end
+    local ok, task = pcall(cjson.decode, payload)
+    local attempts_key = 'attempts:' .. ((ok and type(task) == 'table' and task['id']) or payload)
+    local attempts = redis.call('INCR', attempts_key)
+    redis.call('EXPIRE', attempts_key, attempts_ttl)
+    if attempts >= max_attempts then
+        redis.call('LPUSH', KEYS[4], payload)
+        redis.call('DEL', attempts_key)
+        return 2
+    end
+    -- Retried tasks go to the consuming end so they are not queued twice
+    redis.call('RPUSH', KEYS[3], payload)
+    return 1
+end
+"""
+
+# KEYS: as above plus the consumers set. ARGV: now, max attempts, attempts
+# ttl, lease for orphans, consumer. Requeues every
+# task whose lease has expired, gives a lease to tasks claimed without one
+# (a blocking claim that died before writing it) and forgets consumers with
+# nothing in flight. Returns {requeued, dead-lettered}
+REAP = _REQUEUE + """
+local requeued, dead = 0, 0
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 1000)
+for _, payload in ipairs(expired) do
+    local outcome = requeue(payload, tonumber(ARGV[2]), ARGV[3])
+    if outcome == 1 then
+        requeued = requeued + 1
+    elseif outcome == 2 then
+        dead = dead + 1
+    end
+end
+for _, payload in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if not redis.call('ZSCORE', KEYS[2], payload) then
+        redis.call('ZADD', KEYS[2], ARGV[4], payload)
+    end
+end
+if redis.call('LLEN', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[5], ARGV[5])
+end
+return {requeued, dead}
+"""
+
+# ARGV: max attempts, attempts ttl, payloads. Gives tasks back immediately
+# (a failed batch) instead of waiting for their leases to expire
+RELEASE = _REQUEUE + """
+local released = 0
+for i = 3, #ARGV do
+    if requeue(ARGV[i], tonumber(ARGV[1]), ARGV[2]) > 0 then
+        released = released + 1
+    end
+end
+return released
+"""
 
 class QueueManager:
-    def __init__(self):
+    def __init__(self, codec: Optional[Codec] = None):
+        # Payloads are written with `codec` and may be binary, so replies
+        # are left as bytes and decoded where needed
+        self.codec = codec or get_codec()
         try:
             self.redis_client = redis.Redis(
-                host='localhost',
-                port=6379,
-                decode_responses=True
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                decode_responses=False
             )
             # Test connection
             self.redis_client.ping()
@@ -23,32 +176,217 @@ class QueueManager:
         Returns the length of the queue after pushing
         """
         try:
-            result = self.redis_client.lpush(queue_name, json.dumps(task))
+            result = self.redis_client.lpush(queue_name, self.codec.encode(stamp_enqueued(task)))
             print(f"Task pushed to queue {queue_name}: {task.get('id', 'unknown')}")
             return result
         except Exception as e:
             print(f"Error pushing to queue: {e}")
             raise
     
-    def pop_task(self, queue_name: str) -> Optional[Dict[str, Any]]:
+    def push_many(self, queue_name: str, tasks: List[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Push many tasks to the specified queue in a single round trip
+        Tasks are sent as multi-value LPUSH commands of `chunk_size` each in
+        one pipeline, so they are queued in the same order as `push_task`
+        would. Returns the length of the queue after pushing
+        """
+        if not tasks:
+            return self.get_queue_length(queue_name)
+        try:
+            payloads = [self.codec.encode(stamp_enqueued(task)) for task in tasks]
+            pipe = self.redis_client.pipeline(transaction=False)
+            for start in range(0, len(payloads), chunk_size):
+                pipe.lpush(queue_name, *payloads[start:start + chunk_size])
+            result = pipe.execute()[-1]
+            print(f"{len(tasks)} tasks pushed to queue {queue_name}")
+            return result
+        except Exception as e:
+            print(f"Error pushing to queue: {e}")
+            raise
+
+    def pop_task(self, queue_name: str, timeout: float = 1) -> Optional[Dict[str, Any]]:
         """
-        Pop a task from the specified queue
+        Pop a task from the specified queue, blocking for up to `timeout` seconds
         Returns None if no task is available
         """
         try:
-            task = self.redis_client.brpop(queue_name, timeout=1)
+            task = self.redis_client.brpop(queue_name, timeout=timeout)
             if task:
                 print(f"Task popped from queue {queue_name}")
-                return json.loads(task[1])
+                return decode(task[1])
             return None
         except Exception as e:
             print(f"Error popping from queue: {e}")
             return None
 
+    def pop_many(self, queue_name: Union[str, List[str]], max_n: int,
+                 timeout: float = 1) -> List[Dict[str, Any]]:
+        """
+        Pop up to `max_n` tasks from the specified queue
+        `queue_name` may also be a list of queues in priority order, in which
+        case the tasks come from the first non-empty one. Takes whatever is
+        queued with a single LMPOP; if every queue is empty, waits for up to
+        `timeout` seconds with BLMPOP. Returns an empty list on timeout
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        try:
+            reply = self.redis_client.lmpop(len(queue_names), *queue_names,
+                                            direction='RIGHT', count=max_n)
+            if reply is None and timeout > 0:
+                reply = self.redis_client.blmpop(timeout, len(queue_names), *queue_names,
+                                                 direction='RIGHT', count=max_n)
+            return [decode(task) for task in reply[1]] if reply else []
+        except Exception as e:
+            print(f"Error popping from queue: {e}")
+            return []
+
+    def claim_many(self, queue_name: Union[str, List[str]], consumer: str, max_n: int,
+                   timeout: float = 1, visibility_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Claim up to `max_n` tasks for `consumer` from the first non-empty queue
+        Like pop_many, but each task stays on the consumer's processing list
+        until it is acked, and is redelivered if that has not happened within
+        `visibility_timeout` seconds. Every task carries its raw payload as
+        `receipt` for ack/release. If every queue is empty, blocks on the
+        first one with BLMOVE, re-checking the others every CLAIM_POLL_MS, for
+        up to `timeout` seconds. Returns an empty list on timeout
+        """
+        queue_names = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        visibility_timeout = settings.VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+        keys = [processing_list(consumer), lease_key(consumer), CONSUMERS, *queue_names]
+        try:
+            claim = self.redis_client.register_script(CLAIM)
+            payloads = claim(keys=keys, args=[max_n, time.time() + visibility_timeout, consumer])
+            deadline = time.monotonic() + timeout
+            while not payloads and deadline > time.monotonic():
+                wait = min(deadline - time.monotonic(), settings.CLAIM_POLL_MS / 1000)
+                payload = self.redis_client.blmove(queue_names[0], keys[0], max(wait, 0.01), 'RIGHT', 'LEFT')
+                if payload is not None:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.zadd(keys[1], {payload: time.time() + visibility_timeout})
+                    pipe.sadd(CONSUMERS, consumer)
+                    pipe.execute()
+                    payloads = [payload]
+                elif len(queue_names) > 1:
+                    payloads = claim(keys=keys, args=[max_n, time.time() + visibility_timeout, consumer])
+            return [{**decode(payload), 'receipt': payload} for payload in payloads]
+        except Exception as e:
+            print(f"Error claiming from queue: {e}")
+            return []
+
+    def ack(self, consumer: str, tasks: List[Dict[str, Any]]) -> None:
+        """Mark claimed tasks as done so they are never redelivered"""
+        if not any('receipt' in task for task in tasks):
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            queue_ack(pipe, consumer, tasks)
+            pipe.execute()
+        except Exception as e:
+            print(f"Error acking tasks: {e}")
+            raise
+
+    def release(self, consumer: str, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Give claimed tasks back for redelivery now, counting a failed attempt
+        Returns the number of tasks released
+        """
+        receipts = [task['receipt'] for task in tasks if 'receipt' in task]
+        if not receipts:
+            return 0
+        release = self.redis_client.register_script(RELEASE)
+        return release(
+            keys=[processing_list(consumer), lease_key(consumer), SHARED_QUEUE, settings.DEAD_LETTER_QUEUE],
+            args=[settings.MAX_DELIVERY_ATTEMPTS, ATTEMPTS_TTL, *receipts]
+        )
+
+    def reap(self, lease_seconds: Optional[float] = None) -> Dict[str, int]:
+        """
+        Redeliver every consumer's tasks whose visibility timeout has expired
+        Safe to run from any number of processes at once
+        """
+        lease_seconds = settings.VISIBILITY_TIMEOUT if lease_seconds is None else lease_seconds
+        reap = self.redis_client.register_script(REAP)
+        totals = {'requeued': 0, 'dead_lettered': 0}
+        now = time.time()
+        for consumer in self.redis_client.smembers(CONSUMERS):
+            consumer = consumer.decode('utf-8')
+            requeued, dead = reap(
+                keys=[processing_list(consumer), lease_key(consumer), SHARED_QUEUE,
+                      settings.DEAD_LETTER_QUEUE, CONSUMERS],
+                args=[now, settings.MAX_DELIVERY_ATTEMPTS, ATTEMPTS_TTL, now + lease_seconds, consumer]
+            )
+            totals['requeued'] += requeued
+            totals['dead_lettered'] += dead
+        if totals['requeued'] or totals['dead_lettered']:
+            print(f"Reaper requeued {totals['requeued']} expired tasks, "
+                  f"dead-lettered {totals['dead_lettered']}")
+        return totals
+
+    def push_result(self, result: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Publish a task result under its own reply key so the submitter can
+        wait for exactly this task. The reply expires after `ttl` seconds if
+        nobody collects it, and a capped copy is kept on the `results` list
+        for monitoring.
+        """
+        self.push_results([result], ttl)
+
+    def push_results(self, results: List[Dict[str, Any]], ttl: Optional[int] = None,
+                     ack: Optional[Tuple[str, List[Dict[str, Any]]]] = None) -> None:
+        """
+        Publish a batch of task results in a single round trip
+        With `ack=(consumer, tasks)`, the claimed tasks are acked in the same
+        round trip, after their results are written
+        """
+        if not results:
+            return
+        ttl = settings.RESULT_TTL if ttl is None else ttl
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            queue_results(pipe, results, ttl, self.codec)
+            if ack is not None:
+                queue_ack(pipe, *ack)
+            pipe.execute()
+        except Exception as e:
+            print(f"Error pushing results: {e}")
+            raise
+
+    def await_result(self, task_id: str, timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """
+        Block until the result for `task_id` is published
+        Returns None if it does not arrive within `timeout` seconds
+        """
+        try:
+            reply = self.redis_client.blpop(result_key(task_id), timeout=timeout)
+            return decode(reply[1]) if reply else None
+        except Exception as e:
+            print(f"Error waiting for result {task_id}: {e}")
+            return None
+
     def get_queue_length(self, queue_name: str) -> int:
         """Get the current length of the queue"""
         try:
             return self.redis_client.llen(queue_name)
         except Exception as e:
             print(f"Error getting queue length: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+    def increment_fields(self, key: str, counters: Dict[str, float], ttl: int) -> None:
+        """Add `counters` to the fields of a hash that expires `ttl` seconds from now"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for field, amount in counters.items():
+            if isinstance(amount, float):
+                pipe.hincrbyfloat(key, field, amount)
+            else:
+                pipe.hincrby(key, field, amount)
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+    def get_fields(self, keys: List[str]) -> List[Dict[str, str]]:
+        """All fields of each hash in `keys`, in one round trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        return [{field.decode('utf-8'): value.decode('utf-8') for field, value in fields.items()}
+                for fields in pipe.execute()]
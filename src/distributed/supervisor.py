@@ -0,0 +1,241 @@
+import asyncio
+import math
+import multiprocessing
+import signal
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+from .backends import QueueBackend, get_backend
+from .config import settings
+from .metrics import MetricsReader
+from .worker import run_worker
+from ..config import load_app_config
+from ..utils import instrumentation
+from ..utils.instrumentation import (
+    SUPERVISOR_DESIRED_REPLICAS, SUPERVISOR_QUEUE_DEPTH, SUPERVISOR_REPLICAS,
+    SUPERVISOR_SCALING_DECISIONS, SUPERVISOR_TASK_LATENCY_P95, SUPERVISOR_WORKER_RESTARTS
+)
+
+# How often worker processes are checked for exits
+CHECK_INTERVAL = 1.0
+# How long a retired worker gets to finish its batch before it is killed
+RETIRE_GRACE_SECONDS = 30
+
+class ScalingPolicy(NamedTuple):
+    """Autoscaling and restart settings, from the `scaling` section of the app config"""
+    min_replicas: int = 1
+    max_replicas: int = 5
+    target_queue_depth: float = 100      # Queued tasks per worker
+    target_latency_ms: float = 1000      # p95 from enqueue to completion
+    tolerance: float = 0.1               # Ratios within 1 +/- this hold the pool
+    interval: float = 15                 # Seconds between scaling evaluations
+    latency_window: int = 60             # Seconds of task latency considered
+    scale_down_delay: float = 60         # Scale down only to the highest recent target
+    restart_backoff: float = 1           # First restart delay, doubling per crash
+    max_restart_backoff: float = 60
+
+    @classmethod
+    def from_config(cls, scaling: Dict[str, Any]) -> 'ScalingPolicy':
+        return cls(**{field: scaling[field] for field in cls._fields if field in scaling})
+
+def desired_replicas(current: int, queue_depth: float, latency_ms: float, policy: ScalingPolicy) -> int:
+    """
+    Workers needed to bring queue depth per worker and p95 task latency to
+    their targets, whichever needs more, clamped to the policy's bounds.
+    Like a Kubernetes HPA, scale by the ratio of observed to target values
+    """
+    current = max(current, 1)
+    ratio = queue_depth / (policy.target_queue_depth * current)
+    if policy.target_latency_ms:
+        ratio = max(ratio, latency_ms / policy.target_latency_ms)
+    desired = current if abs(ratio - 1) <= policy.tolerance else math.ceil(current * ratio)
+    return min(max(desired, policy.min_replicas), policy.max_replicas)
+
+def restart_delay(failures: int, policy: ScalingPolicy) -> float:
+    """Seconds to wait before restarting a worker that has crashed `failures` times in a row"""
+    if failures == 0:
+        return 0.0
+    return min(policy.restart_backoff * 2 ** (failures - 1), policy.max_restart_backoff)
+
+class WorkerSlot:
+    """A worker id the supervisor keeps a process running for"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+
+class Supervisor:
+    """
+    Runs worker processes, restarting any that exit and sizing the pool
+    between min_replicas and max_replicas from queue depth and task latency
+
+    Crashed workers are restarted after an exponential backoff, reset once a
+    worker has stayed up for max_restart_backoff seconds. Scaling up happens
+    at the first evaluation that calls for it; scaling down only once no
+    evaluation in the last scale_down_delay seconds asked for more workers,
+    so a brief lull does not drain a pool that is about to be needed again.
+    Retired workers get SIGTERM and finish their batch before exiting.
+    """
+
+    def __init__(self, policy: ScalingPolicy, backend: Optional[QueueBackend] = None):
+        self.policy = policy
+        self.backend = backend or get_backend()
+        if self.backend.name == 'memory':
+            raise ValueError("The memory backend runs its workers inside the API process")
+        self.metrics_reader = MetricsReader(self.backend.queue_manager)
+        self.context = multiprocessing.get_context('spawn')
+        self.slots: Dict[int, WorkerSlot] = {}
+        self.retiring: List[Tuple[multiprocessing.Process, float]] = []
+        self.recommendations: Deque[Tuple[float, int]] = deque()
+        self.running = False
+
+    async def run(self, initial_replicas: Optional[int] = None):
+        """Supervise workers until stop() is called, then shut them all down"""
+        self.running = True
+        initial = settings.WORKER_COUNT if initial_replicas is None else initial_replicas
+        initial = min(max(initial, self.policy.min_replicas), self.policy.max_replicas)
+        await self.scale_to(initial)
+        # The starting size counts as a recent target, so an idle queue
+        # shrinks the pool only after scale_down_delay
+        self.recommendations.append((time.monotonic(), initial))
+        next_evaluation = time.monotonic() + self.policy.interval
+        while self.running:
+            self.check_workers()
+            if time.monotonic() >= next_evaluation:
+                await self.evaluate()
+                next_evaluation = time.monotonic() + self.policy.interval
+            await asyncio.sleep(CHECK_INTERVAL)
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+    def stop(self):
+        self.running = False
+
+    async def scale_to(self, replicas: int):
+        """
+        Start or retire workers until `replicas` are assigned, keeping the
+        lowest ids, and point the backend's routing at the workers kept
+        """
+        while len(self.slots) < replicas:
+            worker_id = next(i for i in range(len(self.slots) + 1) if i not in self.slots)
+            self.slots[worker_id] = slot = WorkerSlot(worker_id)
+            self._spawn(slot)
+        while len(self.slots) > replicas:
+            slot = self.slots.pop(max(self.slots))
+            if slot.process is not None:
+                slot.process.terminate()
+                self.retiring.append((slot.process, time.monotonic() + RETIRE_GRACE_SECONDS))
+        SUPERVISOR_DESIRED_REPLICAS.set(replicas)
+        try:
+            await self.backend.set_workers(sorted(self.slots))
+        except Exception as e:
+            # Routing keeps its previous targets until the next change
+            print(f"Error updating the backend's workers: {e}")
+
+    def check_workers(self):
+        """Schedule restarts for workers that exited, start those that are due, reap retirees"""
+        now = time.monotonic()
+        for slot in self.slots.values():
+            if slot.process is not None and not slot.process.is_alive():
+                uptime = now - slot.started_at
+                if uptime >= self.policy.max_restart_backoff:
+                    slot.failures = 0
+                slot.failures += 1
+                delay = restart_delay(slot.failures, self.policy)
+                print(f"Worker {slot.worker_id} exited with code {slot.process.exitcode} after "
+                      f"{uptime:.1f}s; restarting in {delay:.1f}s")
+                slot.process = None
+                slot.restart_at = now + delay
+            if slot.process is None and now >= slot.restart_at:
+                self._spawn(slot)
+                SUPERVISOR_WORKER_RESTARTS.inc()
+
+        still_retiring = []
+        for process, deadline in self.retiring:
+            if process.is_alive() and now >= deadline:
+                print(f"Killing worker process {process.pid}, which did not exit after SIGTERM")
+                process.kill()
+            if process.is_alive():
+                still_retiring.append((process, deadline))
+            else:
+                process.join()
+        self.retiring = still_retiring
+        SUPERVISOR_REPLICAS.set(sum(slot.process is not None and slot.process.is_alive()
+                                    for slot in self.slots.values()))
+
+    async def evaluate(self):
+        """Decide the pool size from the current queue depth and task latency"""
+        try:
+            queue_depth = await self.backend.depth()
+            summary = await self.metrics_reader.summary(self.policy.latency_window)
+        except Exception as e:
+            print(f"Error reading scaling metrics: {e}")
+            return
+        latency_ms = max((stats['p95_ms'] for stats in summary['latency']['by_task_type'].values()
+                          if stats['count']), default=0.0)
+        SUPERVISOR_QUEUE_DEPTH.set(queue_depth)
+        SUPERVISOR_TASK_LATENCY_P95.set(latency_ms / 1000)
+
+        current = len(self.slots)
+        now = time.monotonic()
+        self.recommendations.append((now, desired_replicas(current, queue_depth, latency_ms, self.policy)))
+        while self.recommendations[0][0] < now - self.policy.scale_down_delay:
+            self.recommendations.popleft()
+        target = max(replicas for _, replicas in self.recommendations)
+
+        decision = 'up' if target > current else 'down' if target < current else 'hold'
+        SUPERVISOR_SCALING_DECISIONS.inc(label=decision)
+        if decision != 'hold':
+            print(f"Scaling {decision} from {current} to {target} workers "
+                  f"(queue depth {queue_depth}, p95 latency {latency_ms:.0f}ms)")
+            await self.scale_to(target)
+
+    def shutdown(self):
+        """Stop every worker, giving each RETIRE_GRACE_SECONDS to finish its batch"""
+        processes = [slot.process for slot in self.slots.values() if slot.process is not None]
+        processes += [process for process, _ in self.retiring]
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + RETIRE_GRACE_SECONDS
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.slots.clear()
+        self.retiring = []
+        SUPERVISOR_REPLICAS.set(0)
+
+    def _spawn(self, slot: WorkerSlot):
+        slot.process = self.context.Process(target=run_worker, args=(slot.worker_id,),
+                                            name=f"worker-{slot.worker_id}")
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        print(f"Started worker {slot.worker_id} (pid {slot.process.pid})")
+
+def run_supervisor(initial_replicas: Optional[int] = None):
+    """Run a supervisor configured from the app config until SIGTERM or SIGINT"""
+    app_config = load_app_config()
+    policy = ScalingPolicy.from_config(app_config.get('scaling', {}))
+    supervisor = Supervisor(policy)
+    monitoring = app_config.get('monitoring', {})
+    if monitoring.get('enabled'):
+        port = int(monitoring.get('supervisor_port', 9089))
+        try:
+            instrumentation.start_http_server(port)
+        except OSError as e:
+            print(f"Supervisor could not serve metrics on port {port}: {e}")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, supervisor.stop)
+        print(f"Supervising {policy.min_replicas}-{policy.max_replicas} workers")
+        await supervisor.run(initial_replicas)
+
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    run_supervisor()
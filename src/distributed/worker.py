@@ -1,66 +1,331 @@
 import asyncio
-from typing import Dict, Any, Optional
-from .queue_manager import QueueManager
+import signal
+import sys
+import time
+import torch
+from typing import Callable, Dict, Any, List, Optional
+import numpy as np
+from .config import settings
+from .backends import QueueBackend, get_backend, worker_queue
+from .metrics import MetricsRecorder
 from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..models.featurizer import TextFeaturizer
+from ..models.fused_inference import FusedSentimentAnalyzer
 from ..models.intelligent_router import IntelligentRouter
+from ..models.registry import ModelRegistry
+from ..config import load_app_config
+from ..utils import instrumentation
 
 class Worker:
-    def __init__(self, worker_id: int):
+    def __init__(self, worker_id: int, batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[int] = None, backend: Optional[QueueBackend] = None):
         self.worker_id = worker_id
-        self.queue_manager = QueueManager()
-        self.sentiment_analyzer = SentimentAnalyzer(input_size=100, hidden_size=64, num_classes=3)
-        self.router = IntelligentRouter()
+        self.backend = backend or get_backend()
+        self.queue_manager = self.backend.queue_manager
+        self.metrics = MetricsRecorder(self.queue_manager)
+        self.registry = ModelRegistry(settings.MODEL_DIR)
+        app_config = load_app_config()
+        self.sentiment_config = app_config['model']['sentiment']
+        self.router_config = app_config['model']['router']
+        self.monitoring_config = app_config.get('monitoring', {})
+        self.metrics_server = None
+        torch.set_num_threads(settings.TORCH_NUM_THREADS)
+        # Models are loaded from the registry on first use
+        self._sentiment_analyzer: Optional[SentimentAnalyzer] = None
+        self._featurizer: Optional[TextFeaturizer] = None
+        self._sentiment_predictor: Optional[Callable[[np.ndarray], np.ndarray]] = None
+        self._router: Optional[IntelligentRouter] = None
+        self.batch_size = batch_size or settings.BATCH_SIZE
+        self.max_wait = (settings.BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        # Name the backend knows this worker by: its own list (which it
+        # drains first) or its consumer name in the stream's group
+        self.consumer = worker_queue(worker_id)
+        self._reaper: Optional[asyncio.Task] = None
         self.running = False
-        print(f"Worker {worker_id} initialized")
+        print(f"Worker {worker_id} initialized (batch_size={self.batch_size}, "
+              f"max_wait={self.max_wait * 1000:.0f}ms)")
+
+    @property
+    def sentiment_analyzer(self) -> SentimentAnalyzer:
+        if self._sentiment_analyzer is None:
+            self._sentiment_analyzer = self._load_model(
+                'sentiment',
+                self.registry.load_sentiment,
+                lambda: SentimentAnalyzer(input_size=100, hidden_size=64, num_classes=3).eval()
+            )
+        return self._sentiment_analyzer
+
+    @property
+    def sentiment_predictor(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Features -> class probabilities, using the configured inference path"""
+        if self._sentiment_predictor is None:
+            inference = self.sentiment_config.get('inference', 'fused')
+            if inference == 'fused':
+                self._sentiment_predictor = FusedSentimentAnalyzer.from_model(
+                    self.sentiment_analyzer).predict_proba
+            elif inference in ('torch', 'int8'):
+                model = self.sentiment_analyzer
+                if inference == 'int8':
+                    model = model.quantized()
+
+                def predict(features: np.ndarray) -> np.ndarray:
+                    with torch.inference_mode():
+                        return model(torch.from_numpy(features)).numpy()
+                self._sentiment_predictor = predict
+            else:
+                raise ValueError(f"Unknown sentiment inference path: {inference}")
+        return self._sentiment_predictor
+
+    @property
+    def featurizer(self) -> TextFeaturizer:
+        if self._featurizer is None:
+            # Hash into exactly as many features as the model takes
+            self._featurizer = TextFeaturizer(n_features=self.sentiment_analyzer.layer1.in_features)
+        return self._featurizer
+
+    @property
+    def router(self) -> IntelligentRouter:
+        if self._router is None:
+            online = self.router_config.get('online_learning', {})
+            router_kwargs = {'cache_size': self.router_config['cache_size'],
+                             'min_retrain_examples': online.get('min_examples', 500)}
+            self._router = self._load_model(
+                'router',
+                lambda version: self.registry.load_router(version, **router_kwargs),
+                lambda: IntelligentRouter(**router_kwargs)
+            )
+            if online.get('enabled'):
+                self._router.start_online_learning(
+                    retrain_every=online.get('retrain_every', 500),
+                    interval=online.get('interval', 60.0)
+                )
+        return self._router
+
+    def _load_model(self, name: str, load, fallback):
+        """Load the latest published model, falling back to an untrained one"""
+        start = time.perf_counter()
+        try:
+            version = self.registry.latest_version(name)
+            model = load(version)
+            print(f"Worker {self.worker_id} loaded {name} model {version} "
+                  f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        except FileNotFoundError:
+            print(f"Warning: no published {name} model in {self.registry.root}; "
+                  f"worker {self.worker_id} is using an untrained one")
+            model = fallback()
+        return model
 
     async def run(self):
         """Run the worker process"""
         print(f"Worker {self.worker_id} starting...")
         self.running = True
-        
+        self._reaper = asyncio.create_task(self.reap_expired())
+
         while self.running:
+            tasks = []
             try:
-                # Get task from queue
-                task = self.queue_manager.pop_task('tasks')
-                if task:
-                    print(f"Worker {self.worker_id} processing task: {task.get('id', 'unknown')}")
-                    result = await self.process_task(task)
-                    
-                    # Add worker ID to result
-                    result['worker_id'] = self.worker_id
-                    
-                    # Push result back to queue
-                    self.queue_manager.push_task('results', result)
-                    print(f"Worker {self.worker_id} completed task: {task.get('id', 'unknown')}")
-                await asyncio.sleep(0.1)  # Prevent CPU overload
+                # Drain a micro-batch of tasks from the queue
+                tasks = await self.collect_batch()
+                if tasks:
+                    print(f"Worker {self.worker_id} processing batch of {len(tasks)} tasks")
+                    self.observe_queue_wait(tasks)
+                    results = await self.process_batch(tasks)
+
+                    for result in results:
+                        # Add worker ID to result
+                        result['worker_id'] = self.worker_id
+
+                    # Reply to whoever is waiting on each task, then ack
+                    await self.backend.complete(self.consumer, tasks, results)
+                    await self.metrics.record(self.outcomes(tasks, results), self.worker_id)
+                    print(f"Worker {self.worker_id} completed batch of {len(tasks)} tasks")
+                await asyncio.sleep(0)  # Yield to the event loop between batches
             except Exception as e:
                 print(f"Error in worker {self.worker_id}: {e}")
-                continue
-
-    async def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a single task"""
-        task_type = task.get('type')
-        data = task.get('data', {})
-        
-        if task_type == 'sentiment_analysis':
-            result = await self.process_sentiment(data)
-        elif task_type == 'routing':
-            result = await self.process_routing(data)
-        else:
-            result = {'error': f'Unknown task type: {task_type}'}
-            
-        return {
-            'task_id': task.get('id'),
-            'type': task_type,
-            'result': result
-        }
-
-    async def process_sentiment(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process sentiment analysis task"""
-        text = data.get('text', '')
-        # Add your sentiment analysis logic here
-        return {'sentiment': 'positive', 'confidence': 0.8}
+                if tasks:
+                    # Redeliver now rather than after the visibility timeout;
+                    # if even that fails, the reaper will once the lease expires
+                    try:
+                        released = await self.backend.release(self.consumer, tasks)
+                        print(f"Worker {self.worker_id} released {released} unacked tasks")
+                    except Exception as e:
+                        print(f"Error releasing tasks in worker {self.worker_id}: {e}")
+        self._reaper.cancel()
+        print(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        """Finish the current batch, then return from run()"""
+        self.running = False
+
+    async def reap_expired(self):
+        """
+        Periodically redeliver tasks whose consumer died or hung
+        Every worker runs this for all consumers, so tasks are recovered as
+        long as any worker is alive
+        """
+        while self.running:
+            try:
+                await self.backend.reap()
+            except Exception as e:
+                print(f"Error reaping expired tasks in worker {self.worker_id}: {e}")
+            await asyncio.sleep(settings.REAPER_INTERVAL)
+
+    def start_metrics_server(self):
+        """
+        Expose this process's Prometheus metrics on metrics_port + worker_id
+        Only for a process dedicated to one worker: the registry is
+        process-wide, so in-process workers would serve duplicate copies
+        """
+        if self.metrics_server is not None or not self.monitoring_config.get('enabled'):
+            return
+        port = int(self.monitoring_config.get('metrics_port', 9090)) + self.worker_id
+        try:
+            self.metrics_server = instrumentation.start_http_server(port)
+        except OSError as e:
+            print(f"Worker {self.worker_id} could not serve metrics on port {port}: {e}")
+
+    def observe_queue_wait(self, tasks: List[Dict[str, Any]]):
+        """Record the batch size and how long each task sat in the queue"""
+        instrumentation.BATCH_SIZE.observe(len(tasks))
+        now = time.time()
+        for task in tasks:
+            enqueued_at = task.get('enqueued_at')
+            if enqueued_at:
+                instrumentation.QUEUE_WAIT_SECONDS.observe(now - enqueued_at, task.get('type'))
+
+    async def collect_batch(self) -> List[Dict[str, Any]]:
+        """
+        Collect up to `batch_size` tasks, waiting at most `max_wait` seconds
+        after the first task arrives for the batch to fill up
+        """
+        batch = await self.backend.claim(self.consumer, self.batch_size)
+        if not batch:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            more = await self.backend.claim(self.consumer, self.batch_size - len(batch),
+                                            timeout=remaining)
+            if not more:
+                break
+            batch.extend(more)
+        return batch
+
+    async def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of tasks, running each model once per task type
+        and fanning the results back out in the original task order
+        """
+        groups: Dict[Any, List[int]] = {}
+        for i, task in enumerate(tasks):
+            groups.setdefault(task.get('type'), []).append(i)
+
+        results: List[Dict[str, Any]] = [{} for _ in tasks]
+        for task_type, indices in groups.items():
+            batch_data = [tasks[i].get('data', {}) for i in indices]
+            start = time.perf_counter()
+            try:
+                if task_type == 'sentiment_analysis':
+                    outputs = await self.process_sentiment_batch(batch_data)
+                elif task_type == 'routing':
+                    outputs = await self.process_routing_batch(batch_data)
+                elif task_type == 'routing_feedback':
+                    outputs = await self.process_feedback_batch(batch_data)
+                else:
+                    outputs = [{'error': f'Unknown task type: {task_type}'}] * len(indices)
+            except Exception as e:
+                print(f"Error processing {task_type} batch in worker {self.worker_id}: {e}")
+                outputs = [{'error': str(e)}] * len(indices)
+            # The group shares one model call; each task is charged its share
+            per_task = (time.perf_counter() - start) / len(indices)
+            instrumentation.TASK_PROCESSING_SECONDS.observe_many(per_task, len(indices), task_type)
+
+            for i, output in zip(indices, outputs):
+                results[i] = {
+                    'task_id': tasks[i].get('id'),
+                    'type': task_type,
+                    'result': output,
+                    'processing_ms': per_task * 1000
+                }
+        return results
+
+    def outcomes(self, tasks: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Metrics for a processed batch. Latency runs from when the task was
+        enqueued, so it includes queueing; tasks without `enqueued_at` fall
+        back to the time their batch spent in the model
+        """
+        now = time.time()
+        outcomes = []
+        for task, result in zip(tasks, results):
+            output = result.get('result') or {}
+            enqueued_at = task.get('enqueued_at')
+            outcomes.append({
+                'type': result.get('type') or 'unknown',
+                'channel': (task.get('data') or {}).get('channel'),
+                'latency_ms': (now - enqueued_at) * 1000 if enqueued_at else result.get('processing_ms', 0.0),
+                'ok': 'error' not in output,
+                'sentiment': output.get('sentiment')
+            })
+        return outcomes
+
+    async def process_sentiment_batch(self, batch_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch of sentiment analysis tasks with a single forward pass"""
+        features = self.featurizer.transform([data.get('text', '') for data in batch_data])
+        predict = self.sentiment_predictor
+        start = time.perf_counter()
+        probabilities = predict(features)
+        instrumentation.MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start, 'sentiment')
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(best)), best]
+        return [
+            {'sentiment': SentimentAnalyzer.LABELS[label], 'confidence': score}
+            for label, score in zip(best.tolist(), confidence.tolist())
+        ]
 
     async def process_routing(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process routing task"""
-        return self.router.route_request(data)
\ No newline at end of file
+        return self.router.route_request(data)
+
+    async def process_routing_batch(self, batch_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch of routing tasks with a single predict_proba call"""
+        try:
+            return self.router.route_batch(batch_data)
+        except ValueError:
+            # An unknown category fails only the requests that carry one
+            return [await self.process_routing_or_error(data) for data in batch_data]
+
+    async def process_routing_or_error(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self.process_routing(data)
+        except ValueError as e:
+            return {'error': str(e)}
+
+    async def process_feedback_batch(self, batch_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Buffer routing feedback; retraining happens off the event loop"""
+        for feedback in batch_data:
+            self.router.update_routing_model(feedback)
+        return [{'accepted': True}] * len(batch_data)
+
+def run_worker(worker_id: int):
+    """
+    Run a worker until it is stopped, as the body of a worker process
+    SIGTERM and SIGINT stop it gracefully: the batch in hand is completed
+    and acked before the process exits
+    """
+    worker = Worker(worker_id)
+    worker.start_metrics_server()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    run_worker(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
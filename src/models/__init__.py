@@ -1,2 +1,3 @@
 from .sentiment_analyzer import SentimentAnalyzer
-from .intelligent_router import IntelligentRouter
\ No newline at end of file
+from .intelligent_router import IntelligentRouter
+from .featurizer import TextFeaturizer
\ No newline at end of file
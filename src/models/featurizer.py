@@ -0,0 +1,34 @@
+import numpy as np
+from typing import Iterable
+from sklearn.feature_extraction.text import HashingVectorizer
+
+class TextFeaturizer:
+    """
+    Stateless text featurizer producing SentimentAnalyzer inputs
+    
+    Word unigrams and bigrams are hashed into `n_features` buckets and the
+    counts L2-normalized, so there is no vocabulary to fit, ship or load and
+    memory does not grow with the corpus. Identical settings always produce
+    identical features, in any process.
+    """
+    
+    def __init__(self, n_features: int = 100, ngram_range: tuple = (1, 2)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm='l2',
+            dtype=np.float32
+        )
+    
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Featurize a batch of texts into a dense (n_texts, n_features) float32 array
+        Missing texts are treated as empty strings
+        """
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        if not texts:
+            return np.zeros((0, self.n_features), dtype=np.float32)
+        return self.vectorizer.transform(texts).toarray()
@@ -0,0 +1,134 @@
+import numpy as np
+from typing import Dict
+from sklearn.ensemble import RandomForestClassifier
+
+class CompiledForest:
+    """
+    A trained RandomForestClassifier flattened into contiguous NumPy arrays
+
+    Every node of every tree lives in one set of arrays (feature, threshold,
+    children, value), with tree t starting at roots[t] and the next node after
+    `node` at children[2 * node + went_left]. Leaves point to themselves with
+    an infinite threshold, so evaluation is just max_depth rounds of
+    gather-compare-select over all trees at once, without sklearn's per-call
+    input validation and joblib dispatch. The arrays are only ever read, so
+    they can be memory-mapped from disk and shared between processes.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 is_leaf: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 classes: np.ndarray, max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.is_leaf = is_leaf
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, model: RandomForestClassifier) -> "CompiledForest":
+        """Flatten a fitted single-output RandomForestClassifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.where(is_leaf, np.inf, tree.threshold)
+            left = np.where(is_leaf, nodes, tree.children_left) + offset
+            right = np.where(is_leaf, nodes, tree.children_right) + offset
+
+            # Leaf class distributions, normalized as in predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        left = np.concatenate(lefts).astype(np.intp)
+        right = np.concatenate(rights).astype(np.intp)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.stack([right, left], axis=1).ravel(),
+            is_leaf=left == np.arange(len(left)),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth
+        )
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The flat arrays that fully describe the forest"""
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'is_leaf': self.is_leaf,
+            'value': self.value,
+            'roots': self.roots,
+            'classes': self.classes,
+            'max_depth': np.asarray(self.max_depth)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "CompiledForest":
+        """Rebuild a forest from the output of `arrays`, without copying them"""
+        fields = dict(arrays)
+        fields['max_depth'] = int(fields['max_depth'])
+        return cls(**fields)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        # Trees are fit on float32 inputs, so compare at the same precision
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_X = X.ravel()
+
+        # One (row, tree) walker per slot; only walkers not yet at a leaf
+        # are advanced each round, so shallow trees drop out early
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        active = np.arange(nodes.size)
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            values = flat_X[row_offsets[active] + self.feature[current]]
+            next_nodes = self.children[2 * current + (values <= self.threshold[current])]
+            nodes[active] = next_nodes
+            active = active[~self.is_leaf[next_nodes]]
+            if active.size == 0:
+                break
+        return nodes.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+        """Class probabilities averaged over trees, as RandomForestClassifier.predict_proba"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_trees = len(self.roots)
+        probabilities = np.empty((X.shape[0], len(self.classes)))
+        for start in range(0, X.shape[0], chunk_size):
+            nodes = self.leaves(X[start:start + chunk_size])
+            probabilities[start:start + chunk_size] = self.value[nodes].sum(axis=1) / n_trees
+        return probabilities
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Most probable class for each row"""
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
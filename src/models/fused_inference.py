@@ -0,0 +1,58 @@
+import numpy as np
+from .sentiment_analyzer import SentimentAnalyzer
+
+class FusedSentimentAnalyzer:
+    """
+    Inference-only SentimentAnalyzer evaluated with NumPy
+    
+    The three linear layers are exported once as pre-transposed, contiguous
+    float32 (in, out) matrices, and the whole eval-mode forward
+    (linear-relu-linear-relu-linear-softmax) runs as one function of
+    in-place NumPy operations. That skips nn.Module dispatch and autograd
+    bookkeeping, which dominate the cost of these small layers at low batch
+    sizes.
+    """
+    
+    def __init__(self, weights, biases, labels=None):
+        """
+        Args:
+            weights: (in, out) weight matrix of each layer, in order
+            biases: (out,) bias of each layer, in order
+            labels: Class names in output column order
+        """
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.labels = labels or SentimentAnalyzer.LABELS
+        
+    @classmethod
+    def from_model(cls, model: SentimentAnalyzer) -> "FusedSentimentAnalyzer":
+        """Export the eval-mode forward of a SentimentAnalyzer"""
+        layers = [model.layer1, model.layer2, model.layer3]
+        return cls(
+            weights=[layer.weight.detach().numpy().T for layer in layers],
+            biases=[layer.bias.detach().numpy() if layer.bias is not None
+                    else np.zeros(layer.out_features, dtype=np.float32) for layer in layers],
+            labels=model.LABELS
+        )
+        
+    @property
+    def input_size(self) -> int:
+        return self.weights[0].shape[0]
+        
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (n, input_size) batch, as SentimentAnalyzer in eval mode"""
+        h = np.asarray(X, dtype=np.float32)
+        if h.ndim == 1:
+            h = h.reshape(1, -1)
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            h = h @ weight
+            h += bias
+            if i < last:
+                np.maximum(h, 0, out=h)
+        
+        # Softmax over classes, in place
+        h -= h.max(axis=1, keepdims=True)
+        np.exp(h, out=h)
+        h /= h.sum(axis=1, keepdims=True)
+        return h
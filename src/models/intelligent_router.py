@@ -1,6 +1,19 @@
+import threading
+import time
 import numpy as np
+import pandas as pd
+from collections import deque
 from sklearn.ensemble import RandomForestClassifier
-from typing import Dict, Any
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple, Union
+from ..utils.cache import TTLCache
+from ..utils.instrumentation import MODEL_INFERENCE_SECONDS
+from .forest_compiler import CompiledForest
+
+class RouterModel(NamedTuple):
+    """One trained routing model, swapped in and read as a single reference"""
+    model: RandomForestClassifier
+    compiled: Optional[CompiledForest]
+    generation: int
 
 class IntelligentRouter:
     """
@@ -13,28 +26,113 @@ class IntelligentRouter:
     - Customer history
     """
     
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100)
+    # Feature encodings
+    CHANNEL_MAP = {'voice': 0, 'chat': 1, 'email': 2}
+    TYPE_MAP = {'complaint': 3, 'inquiry': 2, 'support': 2, 'feedback': 1}
+    
+    # Map routing decision to actual handler
+    ROUTING_MAP = {
+        0: "general_support",
+        1: "technical_support",
+        2: "customer_service",
+        3: "priority_support",
+        4: "automated_response"
+    }
+    HANDLER_IDS = {handler: decision for decision, handler in ROUTING_MAP.items()}
+    
+    # Up to this many rows, the compiled forest beats sklearn's per-call overhead
+    COMPILED_MAX_ROWS = 256
+    
+    # Fields of a routing decision, as returned by route_request
+    DECISION_FIELDS = ['assigned_to', 'priority', 'estimated_response_time', 'channel',
+                       'routing_confidence']
+    
+    # Estimated response time based on priority
+    RESPONSE_TIMES = {
+        'high': '15 minutes',
+        'medium': '1 hour',
+        'low': '24 hours'
+    }
+    
+    def __init__(self, cache_size: int = 1000, cache_ttl: Optional[float] = 300.0,
+                 availability_bucket: Optional[float] = None, feedback_window: int = 10000,
+                 min_retrain_examples: int = 500):
+        """
+        Args:
+            cache_size: Maximum number of cached routing decisions (0 disables caching)
+            cache_ttl: Seconds before a cached decision expires (None keeps it until evicted)
+            availability_bucket: If set, agent availability is rounded down to
+                multiples of this step before routing, so similar requests
+                share a cache entry
+            feedback_window: Number of most recent labelled examples
+                (training data, then feedback) that retraining uses
+            min_retrain_examples: retrain() refuses to replace the model
+                until the window holds at least this many examples
+        """
+        self._state = RouterModel(RandomForestClassifier(n_estimators=100), None, 0)
         self.route_priorities = {
             'high': 3,
             'medium': 2,
             'low': 1
         }
+        self.availability_bucket = availability_bucket
+        self.cache = TTLCache(cache_size, cache_ttl) if cache_size > 0 else None
+        
+        # Online learning: a sliding window of labelled examples, retrained
+        # on by a background thread (see start_online_learning)
+        self.window = deque(maxlen=feedback_window)
+        self.min_retrain_examples = min_retrain_examples
+        self._window_lock = threading.Lock()
+        self._retrain_lock = threading.Lock()
+        self._retrain_wanted = threading.Event()
+        self._learner: Optional[threading.Thread] = None
+        self._stop_learning = threading.Event()
+        self.retrain_every = 0
+        self.online_counters = {
+            'feedback_events': 0,
+            'feedback_ignored': 0,
+            'pending_feedback': 0,
+            'retrains': 0,
+            'retrain_errors': 0,
+            'last_retrain_seconds': 0.0,
+            'total_retrain_seconds': 0.0
+        }
+    
+    @property
+    def model(self) -> RandomForestClassifier:
+        return self._state.model
+    
+    @model.setter
+    def model(self, model: RandomForestClassifier):
+        self._state = self._state._replace(model=model)
+    
+    @property
+    def compiled_model(self) -> Optional[CompiledForest]:
+        return self._state.compiled
+    
+    @compiled_model.setter
+    def compiled_model(self, compiled: Optional[CompiledForest]):
+        self._state = self._state._replace(compiled=compiled)
+    
+    @property
+    def generation(self) -> int:
+        """Incremented every time a newly trained model is swapped in"""
+        return self._state.generation
         
     def preprocess_features(self, data: Dict[str, Any]) -> np.ndarray:
         """
         Process input features for routing decision
+        Missing categorical fields take their default; values outside the
+        known categories raise ValueError, as in preprocess_batch
         """
         # Convert channel to numeric
-        channel_map = {'voice': 0, 'chat': 1, 'email': 2}
-        channel = channel_map.get(data.get('channel', 'email'))
+        channel = self._encode('channel', data.get('channel'), self.CHANNEL_MAP, 'email')
         
         # Get priority numeric value
-        priority = self.route_priorities.get(data.get('priority', 'low'))
+        priority = self._encode('priority', data.get('priority'), self.route_priorities, 'low')
         
         # Convert type to numeric
-        type_map = {'complaint': 3, 'inquiry': 2, 'support': 2, 'feedback': 1}
-        query_type = type_map.get(data.get('type', 'inquiry'))
+        query_type = self._encode('type', data.get('type'), self.TYPE_MAP, 'inquiry')
         
         # Combine features
         features = np.array([
@@ -43,13 +141,79 @@ class IntelligentRouter:
             query_type,
             data.get('customer_history_length', 0),
             data.get('agent_availability', 1.0)
-        ]).reshape(1, -1)
+        ], dtype=float).reshape(1, -1)
         
         return features
     
+    @staticmethod
+    def _encode(field: str, value: Any, mapping: Dict[str, int], default: str) -> int:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            value = default
+        if value not in mapping:
+            raise ValueError(f"Unknown {field} {value!r}; expected one of {sorted(mapping)}")
+        return mapping[value]
+    
     def train(self, X, y):
         """Train the routing model"""
-        self.model.fit(X, y)
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y)
+        self.seed_window(X, y)
+        self._swap(self._fit(X, y))
+        # Cached decisions came from the previous model
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def seed_window(self, X, y):
+        """Replace the training window with the labelled examples (X, y)"""
+        with self._window_lock:
+            self.window.clear()
+            self.window.extend(zip(np.asarray(X, dtype=float), np.asarray(y)))
+    
+    def training_window(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The examples retraining would use, as a feature matrix and labels"""
+        with self._window_lock:
+            examples = list(self.window)
+        X = np.array([features for features, _ in examples], dtype=float).reshape(-1, 5)
+        return X, np.array([label for _, label in examples])
+    
+    def _fit(self, X: np.ndarray, y: np.ndarray) -> RandomForestClassifier:
+        model = RandomForestClassifier(**self.model.get_params())
+        model.fit(X, y)
+        return model
+    
+    def _swap(self, model: RandomForestClassifier):
+        """Publish a fitted model; readers see either the old or the new one"""
+        self._state = RouterModel(model, CompiledForest.from_sklearn(model),
+                                  self._state.generation + 1)
+    
+    @property
+    def classes(self) -> np.ndarray:
+        """Routing decisions in predict_proba column order"""
+        return self._classes(self._state)
+    
+    @staticmethod
+    def _classes(state: RouterModel) -> np.ndarray:
+        if state.compiled is not None:
+            return state.compiled.classes
+        return state.model.classes_
+    
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Routing decision probabilities for a feature matrix
+        Small batches (including single requests) go through the compiled
+        flat-array forest; large ones through sklearn's batched predict_proba
+        """
+        return self._predict_proba(self._state, features)
+    
+    def _predict_proba(self, state: RouterModel, features: np.ndarray) -> np.ndarray:
+        if state.compiled is not None and (
+                len(features) <= self.COMPILED_MAX_ROWS or not hasattr(state.model, 'estimators_')):
+            return state.compiled.predict_proba(features)
+        return state.model.predict_proba(features)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Routing decision cache hit/miss counters"""
+        return self.cache.stats() if self.cache is not None else {}
     
     def route_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -59,36 +223,214 @@ class IntelligentRouter:
         - Priority level
         - Estimated response time
         """
+        start = time.perf_counter()
         features = self.preprocess_features(data)
-        route_decision = self.model.predict(features)[0]
-        
-        # Map routing decision to actual handler
-        routing_map = {
-            0: "general_support",
-            1: "technical_support",
-            2: "customer_service",
-            3: "priority_support",
-            4: "automated_response"
-        }
+        if self.availability_bucket:
+            features[:, 4] = np.floor(features[:, 4] / self.availability_bucket) * self.availability_bucket
         
-        # Calculate estimated response time based on priority
-        priority = data.get('priority', 'low')
-        est_response_time = {
-            'high': '15 minutes',
-            'medium': '1 hour',
-            'low': '24 hours'
-        }.get(priority)
+        # The feature tuple is low-cardinality, so most requests repeat one.
+        # Keying on the model generation means a swapped-in model never
+        # serves decisions cached from its predecessor
+        state = self._state
+        key = (state.generation, *features[0].tolist())
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is None:
+            probabilities = self._predict_proba(state, features)[0]
+            best = int(probabilities.argmax())
+            cached = (self._classes(state)[best], float(probabilities[best]))
+            if self.cache is not None:
+                self.cache.put(key, cached)
         
+        route_decision, confidence = cached
+        decision = self.build_decision(data, route_decision, confidence)
+        MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start, 'route_request')
+        return decision
+    
+    def build_decision(self, data: Dict[str, Any], route_decision: int,
+                       confidence: float) -> Dict[str, Any]:
+        """
+        Map a raw model decision for `data` to the routing response
+        """
+        priority = data.get('priority') or 'low'
         return {
-            'assigned_to': routing_map.get(route_decision, "general_support"),
+            'assigned_to': self.ROUTING_MAP.get(route_decision, "general_support"),
             'priority': priority,
-            'estimated_response_time': est_response_time,
+            'estimated_response_time': self.RESPONSE_TIMES.get(priority),
             'channel': data.get('channel'),
-            'routing_confidence': float(max(self.model.predict_proba(features)[0]))
+            'routing_confidence': confidence
         }
     
+    def preprocess_batch(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        Column-wise equivalent of preprocess_features for a whole DataFrame
+        Each categorical column is factorized once and encoded through a small
+        lookup array, so the cost is O(rows) NumPy work plus one dict lookup
+        per distinct value. Returns an (n_rows, 5) feature matrix; raises
+        ValueError on an unknown category, like preprocess_features
+        """
+        n_rows = len(frame)
+        
+        def encode(column: str, mapping: Dict[str, int], default: str) -> np.ndarray:
+            if column not in frame:
+                return np.full(n_rows, mapping[default], dtype=float)
+            codes, uniques = pd.factorize(frame[column])
+            # Missing values (code -1) pick up the default from the last slot
+            lookup = np.array([self._encode(column, value, mapping, default) for value in uniques]
+                              + [mapping[default]], dtype=float)
+            return lookup[codes]
+        
+        def numeric(column: str, default: float) -> np.ndarray:
+            if column not in frame:
+                return np.full(n_rows, default, dtype=float)
+            return frame[column].fillna(default).to_numpy(dtype=float)
+        
+        return np.column_stack([
+            encode('channel', self.CHANNEL_MAP, 'email'),
+            encode('priority', self.route_priorities, 'low'),
+            encode('type', self.TYPE_MAP, 'inquiry'),
+            numeric('customer_history_length', 0),
+            numeric('agent_availability', 1.0)
+        ])
+    
+    def route_batch(self, data: Union[pd.DataFrame, List[Dict[str, Any]]]
+                    ) -> Union[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Route many requests with a single predict_proba call
+        Accepts a DataFrame or a list of request dicts and returns the same
+        decisions as route_request, as a DataFrame (aligned to the input
+        index) or a list of dicts respectively
+        """
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame.from_records(data)
+        if len(frame) == 0:
+            return pd.DataFrame(columns=self.DECISION_FIELDS) if isinstance(data, pd.DataFrame) else []
+        
+        start = time.perf_counter()
+        features = self.preprocess_batch(frame)
+        if self.availability_bucket:
+            features[:, 4] = np.floor(features[:, 4] / self.availability_bucket) * self.availability_bucket
+        state = self._state
+        probabilities = self._predict_proba(state, features)
+        best = probabilities.argmax(axis=1)
+        decisions = pd.Series(self._classes(state)[best], index=frame.index)
+        
+        priority = frame['priority'].fillna('low') if 'priority' in frame else \
+            pd.Series('low', index=frame.index)
+        channel = frame['channel'] if 'channel' in frame else pd.Series(None, index=frame.index)
+        routes = pd.DataFrame({
+            'assigned_to': decisions.map(self.ROUTING_MAP).fillna("general_support"),
+            'priority': priority,
+            'estimated_response_time': priority.map(self.RESPONSE_TIMES),
+            'channel': channel,
+            'routing_confidence': probabilities[np.arange(len(best)), best]
+        }, index=frame.index)
+        MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start, 'route_batch')
+        
+        if isinstance(data, pd.DataFrame):
+            return routes
+        return routes.replace({np.nan: None}).to_dict('records')
+    
     def update_routing_model(self, feedback: Dict[str, Any]):
-        """Update routing model based on feedback"""
-        if feedback.get('was_correct_routing', True):
-            # Potentially implement online learning here
-            pass
\ No newline at end of file
+        """
+        Record routing feedback for online learning
+        
+        `feedback['request']` holds the routed request's fields. The label is
+        `feedback['correct_route']` if given, otherwise the route taken
+        (`feedback['routed_to']`) when `was_correct_routing` is true; feedback
+        with no usable label, or whose request has an unknown category, is
+        counted and ignored. Routes may be handler names or decision ids.
+        This only appends to the feedback window; the model is retrained in
+        the background (see start_online_learning) or by calling retrain()
+        """
+        route = feedback.get('correct_route')
+        if route is None and feedback.get('was_correct_routing', True):
+            route = feedback.get('routed_to')
+        label = self.HANDLER_IDS.get(route, route)
+        try:
+            features = self.preprocess_features(feedback.get('request', {}))[0]
+        except ValueError:
+            label = None
+        if label not in self.ROUTING_MAP:
+            with self._window_lock:
+                self.online_counters['feedback_ignored'] += 1
+            return
+        
+        with self._window_lock:
+            self.window.append((features, label))
+            self.online_counters['feedback_events'] += 1
+            self.online_counters['pending_feedback'] += 1
+            pending = self.online_counters['pending_feedback']
+        if self.retrain_every and pending >= self.retrain_every:
+            self._retrain_wanted.set()
+    
+    def retrain(self) -> bool:
+        """
+        Refit on the current feedback window and swap the new model in
+        Routing carries on with the previous model while this runs.
+        Returns False if the window cannot be trained on yet: it holds fewer
+        than min_retrain_examples examples or only one route
+        """
+        with self._retrain_lock:
+            with self._window_lock:
+                examples = list(self.window)
+                pending = self.online_counters['pending_feedback']
+            if len(examples) < max(self.min_retrain_examples, 2) or \
+                    len({label for _, label in examples}) < 2:
+                return False
+            
+            start = time.perf_counter()
+            X = np.array([features for features, _ in examples], dtype=float)
+            y = np.array([label for _, label in examples])
+            self._swap(self._fit(X, y))
+            elapsed = time.perf_counter() - start
+            
+            with self._window_lock:
+                self.online_counters['pending_feedback'] -= pending
+                self.online_counters['retrains'] += 1
+                self.online_counters['last_retrain_seconds'] = elapsed
+                self.online_counters['total_retrain_seconds'] += elapsed
+            return True
+    
+    def start_online_learning(self, retrain_every: int = 500, interval: Optional[float] = 60.0):
+        """
+        Retrain in a background thread once `retrain_every` feedback events
+        have arrived, or every `interval` seconds if there is any pending
+        """
+        if self._learner is not None:
+            return
+        self.retrain_every = retrain_every
+        self._stop_learning.clear()
+        self._learner = threading.Thread(target=self._learn, args=(interval,),
+                                         name='router-online-learning', daemon=True)
+        self._learner.start()
+    
+    def stop_online_learning(self, timeout: Optional[float] = None):
+        """Stop the background retraining thread"""
+        if self._learner is None:
+            return
+        self._stop_learning.set()
+        self._retrain_wanted.set()
+        self._learner.join(timeout)
+        self._learner = None
+        self.retrain_every = 0
+    
+    def _learn(self, interval: Optional[float]):
+        while not self._stop_learning.is_set():
+            self._retrain_wanted.wait(interval)
+            self._retrain_wanted.clear()
+            if self._stop_learning.is_set():
+                break
+            if self.online_counters['pending_feedback'] > 0:
+                try:
+                    self.retrain()
+                except Exception as e:
+                    self.online_counters['retrain_errors'] += 1
+                    print(f"Error retraining router: {e}")
+    
+    def online_stats(self) -> Dict[str, Any]:
+        """Feedback and retraining counters"""
+        with self._window_lock:
+            stats = dict(self.online_counters)
+            stats['window_size'] = len(self.window)
+        stats['generation'] = self.generation
+        stats['learning'] = self._learner is not None
+        return stats
@@ -4,7 +4,7 @@ import torch.nn.functional as F
 import numpy as np
 
 class SoftmaxClassifier:
-    def __init__(self, input_dim, num_classes, learning_rate=0.01):
+    def __init__(self, input_dim, num_classes, learning_rate=0.01, momentum=0.0, l2=0.0):
         """
         Implementation of Softmax Classification as per paper:
         P(y|x) = exp(θ_y^T φ(x)) / Σ(exp(θ_{y'}^T φ(x)))
@@ -13,12 +13,19 @@ class SoftmaxClassifier:
             input_dim: Dimension of input features φ(x)
             num_classes: Number of output classes
             learning_rate: Learning rate η for gradient descent
+            momentum: Momentum coefficient μ (0 for plain gradient descent)
+            l2: L2 regularization strength λ
         """
         self.input_dim = input_dim
         self.num_classes = num_classes
         self.learning_rate = learning_rate
+        self.momentum = momentum
+        self.l2 = l2
         # Initialize θ parameters
         self.theta = np.random.randn(num_classes, input_dim) * 0.01
+        # Gradient and velocity buffers, reused across updates
+        self._gradient = np.zeros_like(self.theta)
+        self._velocity = np.zeros_like(self.theta)
         
     def softmax(self, x):
         """
@@ -36,26 +43,94 @@ class SoftmaxClassifier:
         
     def gradient_descent_update(self, x, y):
         """
-        Implement gradient descent update rule:
-        w_{t+1} = w_t - η ∇_w L(w)
+        Implement gradient descent update rule on a minibatch:
+        v_{t+1} = μ v_t + ∇_w L(w) + λ w
+        w_{t+1} = w_t - η v_{t+1}
+        
+        where ∇_w L(w) = (P - Y)^T Φ / n is the mean cross-entropy gradient
+        over the batch, computed as a single matmul. θ is updated in place.
         
         Args:
-            x: Input features φ(x)
-            y: True class label
+            x: Input features φ(x), shape (input_dim,) or (n, input_dim)
+            y: True class label, or array of n labels
         """
-        # Forward pass to get probabilities
-        probs = self.softmax(x)
+        x = np.atleast_2d(x)
+        y = np.atleast_1d(y)
+        n = x.shape[0]
+        
+        # Forward pass to get probabilities, shape (num_classes, n)
+        probs = self.softmax(x.T)
+        
+        # P - Y: subtract the one-hot indicator of each true class
+        probs[y, np.arange(n)] -= 1
         
         # Compute gradient of loss with respect to θ
-        gradient = np.zeros_like(self.theta)
-        for i in range(self.num_classes):
-            indicator = 1 if i == y else 0
-            gradient[i] = (probs[i] - indicator) * x
+        gradient = np.matmul(probs, x, out=self._gradient)
+        gradient /= n
+        if self.l2:
+            gradient += self.l2 * self.theta
+        if self.momentum:
+            self._velocity *= self.momentum
+            self._velocity += gradient
+            gradient = self._velocity
             
         # Update rule: w_{t+1} = w_t - η ∇_w L(w)
-        self.theta = self.theta - self.learning_rate * gradient
+        self.theta -= self.learning_rate * gradient
         
     def predict(self, x):
         """Predict class with highest probability"""
         probs = self.softmax(x)
-        return np.argmax(probs)
\ No newline at end of file
+        return np.argmax(probs)
+
+class SoftmaxHead(nn.Module):
+    def __init__(self, input_dim, num_classes, learning_rate=0.01, momentum=0.0, l2=0.0,
+                 theta=None):
+        """
+        SoftmaxClassifier as a torch module, so the paper's softmax
+        P(y|x) = exp(θ_y^T φ(x)) / Σ(exp(θ_{y'}^T φ(x)))
+        runs on tensors and is differentiable with respect to φ(x) and θ
+        
+        θ is a Parameter. The paper's gradient descent update is applied to
+        it in place through a NumPy view of the same storage.
+        
+        Args:
+            input_dim: Dimension of input features φ(x)
+            num_classes: Number of output classes
+            learning_rate, momentum, l2: As for SoftmaxClassifier
+            theta: Callable returning an existing (num_classes, input_dim)
+                Parameter to use as θ, e.g. the weight of the linear layer
+                this head replaces. θ is then looked up on every use and is
+                not registered again here, so the owning module's state_dict
+                has a single entry for it
+        """
+        super(SoftmaxHead, self).__init__()
+        self.classifier = SoftmaxClassifier(input_dim, num_classes, learning_rate, momentum, l2)
+        self._theta = theta
+        if theta is None:
+            self.weight = nn.Parameter(torch.from_numpy(self.classifier.theta).float())
+
+    @property
+    def theta(self) -> nn.Parameter:
+        """θ, shape (num_classes, input_dim)"""
+        return self.weight if self._theta is None else self._theta()
+        
+    def forward(self, features):
+        """
+        Compute softmax probabilities for a batch of features φ(x),
+        shape (n, input_dim) -> (n, num_classes)
+        """
+        # Compute logits: θ_y^T φ(x); softmax subtracts the max for stability
+        logits = features @ self.theta.t()
+        return F.softmax(logits, dim=1)
+        
+    def gradient_descent_update(self, x, y):
+        """
+        Apply SoftmaxClassifier's gradient descent update to θ in place
+        
+        Args:
+            x: Input features φ(x) as a NumPy array, shape (n, input_dim)
+            y: True class labels, shape (n,)
+        """
+        # θ may have been replaced (e.g. by load_state_dict), so re-take the view
+        self.classifier.theta = self.theta.detach().numpy()
+        self.classifier.gradient_descent_update(x, y)
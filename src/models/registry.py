@@ -0,0 +1,154 @@
+import json
+import os
+import numpy as np
+import torch
+from datetime import datetime
+from sklearn.ensemble import RandomForestClassifier
+from typing import Any, Dict, List, Optional
+from .sentiment_analyzer import SentimentAnalyzer
+from .intelligent_router import IntelligentRouter
+from .forest_compiler import CompiledForest
+
+SENTIMENT = 'sentiment'
+ROUTER = 'router'
+
+class ModelRegistry:
+    """
+    Versioned on-disk model artifacts
+
+    Layout:
+        <root>/<name>/<version>/manifest.json
+        <root>/<name>/<version>/...          model files
+        <root>/<name>/LATEST                 version loaded by default
+
+    Sentiment weights are a torch state_dict and router forests are one .npy
+    file per flat array. Both are loaded memory-mapped, so every worker
+    process on a node maps the same page-cache pages instead of holding its
+    own copy of the weights.
+    """
+
+    def __init__(self, root: str = 'models'):
+        self.root = root
+
+    def versions(self, name: str) -> List[str]:
+        """All published versions of a model, oldest first"""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(v for v in os.listdir(model_dir)
+                      if os.path.isfile(os.path.join(model_dir, v, 'manifest.json')))
+
+    def latest_version(self, name: str) -> str:
+        """Version currently marked as LATEST"""
+        path = os.path.join(self.root, name, 'LATEST')
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No published '{name}' model under {self.root}")
+        with open(path, 'r') as f:
+            return f.read().strip()
+
+    def manifest(self, name: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Metadata written alongside an artifact"""
+        version = version or self.latest_version(name)
+        with open(os.path.join(self.root, name, version, 'manifest.json'), 'r') as f:
+            return json.load(f)
+
+    def save_sentiment(self, model: SentimentAnalyzer, version: Optional[str] = None) -> str:
+        """Publish a sentiment model's weights; returns the new version"""
+        config = {
+            'input_size': model.layer1.in_features,
+            'hidden_size': model.layer1.out_features,
+            'num_classes': model.layer3.out_features
+        }
+        version_dir, version = self._new_version(SENTIMENT, version)
+        torch.save(model.state_dict(), os.path.join(version_dir, 'state_dict.pt'))
+        self._publish(SENTIMENT, version, {'config': config})
+        return version
+
+    def load_sentiment(self, version: Optional[str] = None) -> SentimentAnalyzer:
+        """Load a sentiment model in eval mode with memory-mapped weights"""
+        version = version or self.latest_version(SENTIMENT)
+        manifest = self.manifest(SENTIMENT, version)
+        state_dict = torch.load(
+            os.path.join(self.root, SENTIMENT, version, 'state_dict.pt'),
+            mmap=True,
+            weights_only=True
+        )
+        model = SentimentAnalyzer(**manifest['config'])
+        # assign=True keeps the mapped tensors instead of copying into new ones
+        model.load_state_dict(state_dict, assign=True)
+        model.eval()
+        return model
+
+    def save_router(self, router: IntelligentRouter, version: Optional[str] = None) -> str:
+        """
+        Publish a trained router's flattened forest; returns the new version
+        The forest's hyperparameters and the router's training window are
+        saved with it, so online learning on a loaded router retrains like
+        the original instead of from feedback alone
+        """
+        if router.compiled_model is None:
+            raise ValueError("Router has not been trained")
+        version_dir, version = self._new_version(ROUTER, version)
+        arrays = router.compiled_model.arrays()
+        for field, array in arrays.items():
+            np.save(os.path.join(version_dir, f'{field}.npy'), array)
+        window_X, window_y = router.training_window()
+        np.save(os.path.join(version_dir, 'window_features.npy'), window_X)
+        np.save(os.path.join(version_dir, 'window_labels.npy'), window_y)
+        params = {param: value for param, value in router.model.get_params().items()
+                  if value is None or isinstance(value, (bool, int, float, str))}
+        self._publish(ROUTER, version, {
+            'fields': sorted(arrays),
+            'trees': int(len(router.compiled_model.roots)),
+            'nodes': int(router.compiled_model.node_count),
+            'params': params,
+            'window': int(len(window_y))
+        })
+        return version
+
+    def load_router(self, version: Optional[str] = None, **router_kwargs) -> IntelligentRouter:
+        """
+        Load a router whose forest arrays are memory-mapped read-only, with
+        the saved hyperparameters and training window restored for retraining
+        """
+        version = version or self.latest_version(ROUTER)
+        manifest = self.manifest(ROUTER, version)
+        version_dir = os.path.join(self.root, ROUTER, version)
+        arrays = {
+            field: np.load(os.path.join(version_dir, f'{field}.npy'), mmap_mode='r')
+            for field in manifest['fields']
+        }
+        router = IntelligentRouter(**router_kwargs)
+        router.model = RandomForestClassifier(**manifest.get('params', {}))
+        router.compiled_model = CompiledForest.from_arrays(arrays)
+        # Versions published without a window retrain once enough feedback arrives
+        if 'window' in manifest:
+            router.seed_window(np.load(os.path.join(version_dir, 'window_features.npy')),
+                               np.load(os.path.join(version_dir, 'window_labels.npy')))
+        return router
+
+    def _new_version(self, name: str, version: Optional[str]):
+        if version is None:
+            existing = self.versions(name)
+            version = f"v{len(existing) + 1:04d}"
+        version_dir = os.path.join(self.root, name, version)
+        os.makedirs(version_dir, exist_ok=False)
+        return version_dir, version
+
+    def _publish(self, name: str, version: str, metadata: Dict[str, Any]):
+        manifest = {
+            'name': name,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            **metadata
+        }
+        with open(os.path.join(self.root, name, version, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap LATEST atomically so readers never see a partial write
+        latest = os.path.join(self.root, name, 'LATEST')
+        tmp = f"{latest}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, latest)
+        print(f"Published {name} model {version} to {self.root}")
@@ -1,18 +1,28 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from .nlp_functions import SoftmaxClassifier
+from .nlp_functions import SoftmaxHead
 import numpy as np
 
 class SentimentAnalyzer(nn.Module):
+    # Class names in output column order
+    LABELS = ['positive', 'negative', 'neutral']
+    
     def __init__(self, input_size, hidden_size, num_classes):
         super(SentimentAnalyzer, self).__init__()
         self.layer1 = nn.Linear(input_size, hidden_size)
         self.layer2 = nn.Linear(hidden_size, hidden_size)
-        self.layer3 = nn.Linear(hidden_size, num_classes)
+        # The paper's softmax has no bias term, so neither does the layer
+        # whose weight is its θ
+        self.layer3 = nn.Linear(hidden_size, num_classes, bias=False)
         
-        # Add softmax classifier from paper
-        self.softmax_classifier = SoftmaxClassifier(hidden_size, num_classes)
+        # Add softmax classifier from paper; θ is layer3's weight, so the
+        # head trained here is the one used at inference
+        self.softmax_classifier = SoftmaxHead(hidden_size, num_classes, theta=self._theta)
+
+    def _theta(self) -> nn.Parameter:
+        # Looked up on each use: load_state_dict(assign=True) replaces it
+        return self.layer3.weight
         
     def feature_extraction(self, x):
         """Extract features φ(x) as per paper notation"""
@@ -24,30 +34,34 @@ class SentimentAnalyzer(nn.Module):
         # Extract features φ(x)
         features = self.feature_extraction(x)
         
-        # Apply final linear layer
-        logits = self.layer3(features)
-        
         # Use paper's softmax implementation
         if self.training:
-            # During training, use manual softmax for gradient descent updates
-            features_np = features.detach().numpy()
-            probs_np = self.softmax_classifier.softmax(features_np.T)
-            return torch.from_numpy(probs_np.T).float()
+            # During training, use the paper's softmax head, which the
+            # gradient descent updates act on
+            return self.softmax_classifier(features)
         else:
-            # During inference, use PyTorch's softmax
-            return F.softmax(logits, dim=1)
+            # During inference, apply the final linear layer and PyTorch's
+            # softmax, which compute the same function
+            return F.softmax(self.layer3(features), dim=1)
             
     def update_weights(self, x, y):
         """
         Implement paper's gradient descent update
         """
         # Extract features
-        features = self.feature_extraction(x)
-        features_np = features.detach().numpy()
+        with torch.no_grad():
+            features = self.feature_extraction(x)
         
         # Update softmax classifier weights using paper's update rule
-        for i in range(len(y)):
-            self.softmax_classifier.gradient_descent_update(
-                features_np[i],
-                y[i].item()
-            )
\ No newline at end of file
+        self.softmax_classifier.gradient_descent_update(features.numpy(), y.numpy())
+    def quantized(self) -> nn.Module:
+        """
+        Inference copy with int8 dynamically-quantized linear layers
+        Weights are stored as int8 and activations are quantized per batch
+        at run time, so no calibration data is needed. The copy is in eval
+        mode and cannot be trained
+        """
+        model = torch.ao.quantization.quantize_dynamic(
+            self, {nn.Linear}, dtype=torch.qint8, inplace=False
+        )
+        return model.eval()
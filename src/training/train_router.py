@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from ..models.intelligent_router import IntelligentRouter
+from ..models.registry import ModelRegistry
+
+def generate_routing_data(num_samples: int, seed: int = 0):
+    """
+    Synthetic routing requests labelled by a simple triage policy
+    A small share of labels is flipped at random to mimic noisy feedback
+    """
+    rng = np.random.default_rng(seed)
+    requests = pd.DataFrame({
+        'channel': rng.choice(['voice', 'chat', 'email'], num_samples),
+        'priority': rng.choice(['high', 'medium', 'low'], num_samples),
+        'type': rng.choice(['inquiry', 'complaint', 'support', 'feedback'], num_samples),
+        'customer_history_length': rng.integers(0, 10, num_samples),
+        'agent_availability': rng.uniform(0.5, 1.0, num_samples)
+    })
+    
+    # Decisions index IntelligentRouter.ROUTING_MAP
+    labels = np.select(
+        [
+            requests['priority'] == 'high',
+            requests['type'] == 'support',
+            requests['type'] == 'complaint',
+            requests['type'] == 'feedback'
+        ],
+        [3, 1, 2, 4],
+        default=0
+    )
+    noisy = rng.random(num_samples) < 0.05
+    labels[noisy] = rng.integers(0, 5, noisy.sum())
+    return requests, labels
+
+def main():
+    requests, labels = generate_routing_data(num_samples=5000)
+    
+    router = IntelligentRouter()
+    router.train(router.preprocess_batch(requests), labels)
+    
+    # Publish the compiled forest for the workers
+    ModelRegistry().save_router(router)
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,97 @@
+import argparse
+import random
+import time
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import DataLoader, TensorDataset, BatchSampler, RandomSampler, SequentialSampler
 from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..models.featurizer import TextFeaturizer
+from ..models.registry import ModelRegistry
 import numpy as np
 
-class SentimentDataset(Dataset):
-    def __init__(self, texts, labels):
-        self.texts = texts
-        self.labels = labels
-        
-    def __len__(self):
-        return len(self.texts)
-        
-    def __getitem__(self, idx):
-        return self.texts[idx], self.labels[idx]
+# Customer messages (as in customer_serviice_analysis.py) with their
+# sentiment, indexing SentimentAnalyzer.LABELS
+POSITIVE, NEGATIVE, NEUTRAL = 0, 1, 2
+LABELED_MESSAGES = [
+    ("My order hasn't arrived yet and it's been 5 days", NEGATIVE),
+    ("I received a damaged product", NEGATIVE),
+    ("The quality is not what I expected", NEGATIVE),
+    ("I was charged twice for my order", NEGATIVE),
+    ("The product doesn't match the description", NEGATIVE),
+    ("What's the status of my order?", NEUTRAL),
+    ("Do you ship internationally?", NEUTRAL),
+    ("How long does delivery usually take?", NEUTRAL),
+    ("Are there any ongoing promotions?", NEUTRAL),
+    ("What's your return policy?", NEUTRAL),
+    ("How do I reset my password?", NEUTRAL),
+    ("The app keeps crashing", NEGATIVE),
+    ("I can't login to my account", NEGATIVE),
+    ("Where do I find my order history?", NEUTRAL),
+    ("How do I update my shipping address?", NEUTRAL),
+    ("Great service, very helpful support team!", POSITIVE),
+    ("The product exceeded my expectations", POSITIVE),
+    ("Quick delivery and perfect packaging", POSITIVE),
+    ("Very dissatisfied with the quality", NEGATIVE),
+    ("Amazing customer support experience", POSITIVE)
+]
+
+# Messages never used for training, so evaluation measures how the model
+# generalizes rather than how well it remembers LABELED_MESSAGES
+HELD_OUT_MESSAGES = [
+    ("My package was left at the wrong address", NEGATIVE),
+    ("The zipper broke after one use", NEGATIVE),
+    ("I was refunded the wrong amount", NEGATIVE),
+    ("Your website keeps logging me out", NEGATIVE),
+    ("Can I change the size on my order?", NEUTRAL),
+    ("Which payment methods do you accept?", NEUTRAL),
+    ("Is this item available in blue?", NEUTRAL),
+    ("How do I cancel my subscription?", NEUTRAL),
+    ("Thanks, the replacement arrived quickly!", POSITIVE),
+    ("Really happy with my purchase", POSITIVE),
+    ("Excellent quality and great price", POSITIVE),
+    ("The support agent was very friendly and helpful", POSITIVE)
+]
+
+def seed_everything(seed):
+    """Seed every RNG training touches, for reproducible runs"""
+    random.seed(seed)
+    np.random.seed(seed)  # SoftmaxClassifier initializes θ with np.random
+    torch.manual_seed(seed)
+
+def make_batch_loader(X, y, batch_size=32, shuffle=True, num_workers=0, prefetch_factor=2,
+                      seed=None):
+    """
+    DataLoader that slices whole batches out of the X/y tensors
+    
+    The sampler yields one list of indices per batch and the dataset
+    indexes both tensors with it at once, so there is no per-sample
+    __getitem__ call and no collate step. With num_workers > 0, batches are
+    built in persistent worker processes, each keeping `prefetch_factor`
+    batches ready.
+    """
+    generator = torch.Generator().manual_seed(seed) if seed is not None else None
+    dataset = TensorDataset(X, y)
+    sampler = RandomSampler(dataset, generator=generator) if shuffle else SequentialSampler(dataset)
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(sampler, batch_size=batch_size, drop_last=False),
+        batch_size=None,
+        num_workers=num_workers,
+        prefetch_factor=prefetch_factor if num_workers > 0 else None,
+        persistent_workers=num_workers > 0,
+        pin_memory=torch.cuda.is_available()
+    )
 
 def train_sentiment_analyzer(model, train_loader, num_epochs=10):
     criterion = nn.CrossEntropyLoss()
     optimizer = torch.optim.Adam(model.parameters())
     
     for epoch in range(num_epochs):
-        total_loss = 0
+        # Accumulate the loss on-tensor and read it once per epoch, so
+        # steps never wait on a .item() sync
+        total_loss = torch.zeros(())
+        num_samples = 0
+        start = time.perf_counter()
         for batch_x, batch_y in train_loader:
             # Forward pass
             outputs = model(batch_x)
@@ -34,31 +105,72 @@ def train_sentiment_analyzer(model, train_loader, num_epochs=10):
             # Apply paper's gradient descent update
             model.update_weights(batch_x, batch_y)
             
-            total_loss += loss.item()
+            total_loss += loss.detach()
+            num_samples += len(batch_y)
             
-        avg_loss = total_loss / len(train_loader)
-        print(f'Epoch [{epoch+1}/{num_epochs}], Loss: {avg_loss:.4f}')
+        avg_loss = total_loss.item() / len(train_loader)
+        samples_per_sec = num_samples / (time.perf_counter() - start)
+        print(f'Epoch [{epoch+1}/{num_epochs}], Loss: {avg_loss:.4f}, '
+              f'{samples_per_sec:,.0f} samples/sec')
+
+def evaluate(model, X, y):
+    """Accuracy of a model on a held-out set, in eval mode"""
+    model.eval()
+    with torch.inference_mode():
+        predictions = model(X).argmax(dim=1)
+    return (predictions == y).float().mean().item()
+
+def generate_sentiment_data(num_samples, seed=0):
+    """Sample labelled messages from LABELED_MESSAGES"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(LABELED_MESSAGES), num_samples)
+    texts = [LABELED_MESSAGES[i][0] for i in picks]
+    labels = [LABELED_MESSAGES[i][1] for i in picks]
+    return texts, labels
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--num-workers', type=int, default=0)
+    parser.add_argument('--prefetch-factor', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
     # Example usage
     input_size = 100
     hidden_size = 64
     num_classes = 3  # positive, negative, neutral
     
     # Create model
+    seed_everything(args.seed)
     model = SentimentAnalyzer(input_size, hidden_size, num_classes)
     
-    # Generate sample data
-    num_samples = 1000
-    X = torch.randn(num_samples, input_size)
-    y = torch.randint(0, num_classes, (num_samples,))
+    # Featurize labelled messages into the model's input size
+    featurizer = TextFeaturizer(n_features=input_size)
+    texts, labels = generate_sentiment_data(num_samples=args.samples, seed=args.seed)
+    X_train = torch.from_numpy(featurizer.transform(texts))
+    y_train = torch.tensor(labels)
+    
+    # Evaluate on messages the model never sees in training
+    X_test = torch.from_numpy(featurizer.transform([text for text, _ in HELD_OUT_MESSAGES]))
+    y_test = torch.tensor([label for _, label in HELD_OUT_MESSAGES])
     
     # Create data loader
-    dataset = SentimentDataset(X, y)
-    train_loader = DataLoader(dataset, batch_size=32, shuffle=True)
+    train_loader = make_batch_loader(X_train, y_train, batch_size=args.batch_size,
+                                     num_workers=args.num_workers,
+                                     prefetch_factor=args.prefetch_factor, seed=args.seed)
     
     # Train model
-    train_sentiment_analyzer(model, train_loader)
+    train_sentiment_analyzer(model, train_loader, num_epochs=args.epochs)
+    
+    # Compare the float model with its int8 inference variant
+    print(f'Held-out accuracy: float32 {evaluate(model, X_test, y_test):.4f}, '
+          f'int8 {evaluate(model.quantized(), X_test, y_test):.4f}')
+    
+    # Publish weights for the workers
+    ModelRegistry().save_sentiment(model)
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1 +1,2 @@
 from .metrics import PerformanceMetrics
+from .cache import TTLCache
\ No newline at end of file
@@ -0,0 +1,190 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket upper bounds in seconds (the +Inf bucket is implicit)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REDIS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class Histogram:
+    """
+    Prometheus-style histogram with optional fixed label values
+
+    Every series' bucket counts are allocated up front, so an observation
+    is one bisect over a tuple and two additions with no allocation.
+    Buckets hold per-bucket counts and are only made cumulative when
+    rendered. Label values are declared at creation because the hot path
+    looks series up by value instead of creating them.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 label: Optional[str] = None, values: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(float(b) for b in buckets)
+        self.label = label
+        keys = tuple(values) if label else ('',)
+        self._series: Dict[str, _Series] = {key: _Series(len(self.buckets)) for key in keys}
+        self._default = self._series[keys[0]]
+        REGISTRY.append(self)
+
+    def observe(self, value: float, label: Optional[str] = None):
+        """Record one observation (in the series for `label`, if labelled)"""
+        series = self._default if label is None else self._series.get(label)
+        if series is not None:
+            series.counts[bisect_left(self.buckets, value)] += 1
+            series.count += 1
+            series.sum += value
+
+    def observe_many(self, value: float, n: int, label: Optional[str] = None):
+        """Record `n` observations that all took `value`, e.g. a batch's amortized time"""
+        series = self._default if label is None else self._series.get(label)
+        if series is not None and n > 0:
+            series.counts[bisect_left(self.buckets, value)] += n
+            series.count += n
+            series.sum += value * n
+
+    def snapshot(self, label: Optional[str] = None) -> Tuple[List[int], int, float]:
+        """Per-bucket counts, total count and sum of one series"""
+        series = self._default if label is None else self._series[label]
+        return list(series.counts), series.count, series.sum
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format(b) for b in self.buckets] + ['+Inf']
+        for key, series in self._series.items():
+            labels = f'{self.label}="{key}",' if self.label else ''
+            cumulative = 0
+            for bound, count in zip(bounds, series.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            suffix = f'{{{labels.rstrip(",")}}}' if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {_format(series.sum)}")
+            lines.append(f"{self.name}_count{suffix} {series.count}")
+        return lines
+
+class _Scalar:
+    """A single value per label, with optional fixed label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label: Optional[str] = None,
+                 values: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        keys = tuple(values) if label else ('',)
+        self._values: Dict[str, float] = {key: 0.0 for key in keys}
+        self._default = keys[0]
+        REGISTRY.append(self)
+
+    def get(self, label: Optional[str] = None) -> float:
+        return self._values[self._default if label is None else label]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self._values.items():
+            suffix = f'{{{self.label}="{key}"}}' if self.label else ''
+            lines.append(f"{self.name}{suffix} {_format(value)}")
+        return lines
+
+class Gauge(_Scalar):
+    """Prometheus gauge: a value that is set, e.g. a current count"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, label: Optional[str] = None):
+        key = self._default if label is None else label
+        if key in self._values:
+            self._values[key] = float(value)
+
+class Counter(_Scalar):
+    """Prometheus counter: a total that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, label: Optional[str] = None):
+        key = self._default if label is None else label
+        if key in self._values:
+            self._values[key] += amount
+
+class _Series:
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * (n_buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+
+def _format(value: float) -> str:
+    return repr(float(value))
+
+REGISTRY: List[Union[Histogram, _Scalar]] = []
+
+def render(metrics: Optional[Sequence[Union[Histogram, _Scalar]]] = None) -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY if metrics is None else metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the worker's output
+
+def start_http_server(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Serve GET /metrics for this process from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+    print(f"Serving Prometheus metrics on {host}:{port}/metrics")
+    return server
+
+TASK_TYPES = ('sentiment_analysis', 'routing', 'routing_feedback')
+REDIS_OPERATIONS = ('push_task', 'push_many', 'pop_many', 'claim_many', 'ack', 'push_results',
+                    'distribute_tasks')
+
+QUEUE_WAIT_SECONDS = Histogram(
+    'queue_wait_seconds', 'Time from enqueue until a worker popped the task',
+    label='type', values=TASK_TYPES)
+TASK_PROCESSING_SECONDS = Histogram(
+    'task_processing_seconds', 'Time spent processing a task; batched work is amortized per task',
+    label='type', values=TASK_TYPES)
+MODEL_INFERENCE_SECONDS = Histogram(
+    'model_inference_seconds', 'Latency of one model call (a single request or a whole batch)',
+    label='model', values=('sentiment', 'route_request', 'route_batch'))
+BATCH_SIZE = Histogram(
+    'worker_batch_size', 'Tasks per batch collected by a worker', buckets=SIZE_BUCKETS)
+REDIS_ROUNDTRIP_SECONDS = Histogram(
+    'redis_roundtrip_seconds', 'Round-trip time of Redis commands and pipelines',
+    buckets=REDIS_BUCKETS, label='operation', values=REDIS_OPERATIONS)
+
+# Published by the worker supervisor (src/distributed/supervisor.py)
+SUPERVISOR_REPLICAS = Gauge(
+    'supervisor_worker_replicas', 'Worker processes currently alive')
+SUPERVISOR_DESIRED_REPLICAS = Gauge(
+    'supervisor_desired_replicas', 'Worker processes the autoscaler last settled on')
+SUPERVISOR_QUEUE_DEPTH = Gauge(
+    'supervisor_queue_depth', 'Tasks queued at the last scaling evaluation')
+SUPERVISOR_TASK_LATENCY_P95 = Gauge(
+    'supervisor_task_latency_p95_seconds',
+    'p95 enqueue-to-completion latency of the slowest task type at the last scaling evaluation')
+SUPERVISOR_SCALING_DECISIONS = Counter(
+    'supervisor_scaling_decisions_total', 'Scaling evaluations by outcome',
+    label='decision', values=('up', 'down', 'hold'))
+SUPERVISOR_WORKER_RESTARTS = Counter(
+    'supervisor_worker_restarts_total', 'Worker processes restarted after exiting unexpectedly')
@@ -1,17 +1,24 @@
 import asyncio
 import sys
+from src.distributed.config import settings
 from src.distributed.worker import Worker
 import redis
 
 async def start_single_worker(worker_id: int):
+    if settings.QUEUE_BACKEND == 'memory':
+        # In-memory tasks never leave the API process, which runs the workers
+        print("✗ QUEUE_BACKEND=memory: workers run inside the API process")
+        print("Start it with: python run_local.py --backend memory")
+        sys.exit(1)
     try:
         # Test Redis connection first
-        redis_client = redis.Redis(host='localhost', port=6379)
+        redis_client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
         redis_client.ping()  # Will raise error if Redis is not running
         print(f"✓ Successfully connected to Redis")
 
         print(f"\nInitializing worker {worker_id}...")
         worker = Worker(worker_id)
+        worker.start_metrics_server()
         
         print(f"✓ Worker {worker_id} initialized")
         print(f"✓ Watching queues: tasks, results")
@@ -86,45 +86,43 @@ def process_customer_interactions():
     sentiment_results = []
     routing_results = []
     
+    tasks = []
     for interaction in interactions:
         # Submit for sentiment analysis
-        sentiment_task = {
+        tasks.append({
             "type": "sentiment_analysis",
             "data": {"text": interaction["message"]}
-        }
+        })
         
         # Submit for routing
-        routing_task = {
+        tasks.append({
             "type": "routing",
             "data": {
                 "channel": interaction["channel"],
                 "type": interaction["type"],
                 "priority": interaction["priority"]
             }
-        }
+        })
+    
+    try:
+        # Send all tasks to the API in a single request
+        response = requests.post(
+            "http://localhost:8000/tasks",
+            json=tasks
+        )
         
-        try:
-            # Send tasks to API
-            sentiment_response = requests.post(
-                "http://localhost:8000/task",
-                json=sentiment_task
-            )
-            routing_response = requests.post(
-                "http://localhost:8000/task",
-                json=routing_task
-            )
-            
-            if sentiment_response.status_code == 200 and routing_response.status_code == 200:
-                success_count += 1
-                print(f"\nProcessed interaction {success_count}:")
+        if response.status_code == 200:
+            success_count = len(interactions)
+            for i, interaction in enumerate(interactions, start=1):
+                print(f"\nProcessed interaction {i}:")
                 print(f"Channel: {interaction['channel']}")
                 print(f"Type: {interaction['type']}")
                 print(f"Message: {interaction['message']}")
                 print(f"Priority: {interaction['priority']}")
                 print("-" * 50)
-        
-        except Exception as e:
-            print(f"Error processing interaction: {e}")
+    
+    except Exception as e:
+        print(f"Error processing interactions: {e}")
     
     print(f"\nSuccessfully processed {success_count} out of {len(interactions)} interactions")
     
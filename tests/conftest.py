@@ -0,0 +1,26 @@
+import asyncio
+import functools
+import weakref
+import pytest
+from src.distributed import async_queue_manager
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """
+    Point QueueManager and AsyncQueueManager at a fresh in-process fakeredis
+    server, with Lua scripting. Returns a client on that server
+    """
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    server = fakeredis.FakeServer()
+    clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+
+    def get_redis_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = fakeredis.FakeAsyncRedis(server=server)
+        return clients[loop]
+
+    monkeypatch.setattr('redis.Redis', functools.partial(fakeredis.FakeRedis, server=server))
+    monkeypatch.setattr(async_queue_manager, 'get_redis_client', get_redis_client)
+    return fakeredis.FakeRedis(server=server)
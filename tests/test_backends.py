@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from src.distributed.backends import ListBackend, MemoryBackend, StreamBackend
+from src.distributed.config import settings
+from src.distributed.memory_queue_manager import MemoryQueueManager
+
+def _tasks(n, prefix='task'):
+    return [{'id': f'{prefix}_{i}', 'type': 'routing', 'data': {'i': i}} for i in range(n)]
+
+def test_list_backend_submits_to_the_shortest_worker_queue(fake_redis):
+    async def scenario():
+        backend = ListBackend(3)
+        await backend.queue_manager.push_many('worker_0', _tasks(1, 'old'))
+        await backend.queue_manager.push_many('worker_1', _tasks(3, 'old'))
+        assigned = await backend.submit(_tasks(4))
+        return assigned, await backend.queue_lengths()
+
+    assigned, lengths = asyncio.run(scenario())
+    assert assigned == [2, 0, 2]
+    assert lengths == {'worker_0': 3, 'worker_1': 3, 'worker_2': 2, 'tasks': 0}
+
+def test_list_backend_routes_to_the_supervised_workers(fake_redis):
+    async def scenario():
+        backend = ListBackend(2)
+        # Scaled up past worker_count: the new worker gets its share
+        await backend.set_workers([0, 1, 2])
+        assert await backend.submit(_tasks(6)) == [2, 2, 2]
+        assert [task['id'] for task in await backend.claim('worker_2', 5, timeout=0)] == ['task_2', 'task_5']
+
+        # Scaled down: retired queues are drained onto the shared queue,
+        # and nothing new is routed to them
+        assert await backend.set_workers([0]) == 2
+        assert await backend.submit(_tasks(2, 'new')) == [2, 0]
+        return await backend.queue_lengths()
+
+    assert asyncio.run(scenario()) == {'worker_0': 4, 'worker_1': 0, 'tasks': 2}
+
+@pytest.fixture(params=['lists', 'streams', 'memory'])
+def make_backend(request):
+    """A factory for each backend, so every one is held to the same contract"""
+    if request.param == 'memory':
+        queue_manager = MemoryQueueManager()
+        return lambda: MemoryBackend(queue_manager)
+    request.getfixturevalue('fake_redis')
+    return lambda: ListBackend(2) if request.param == 'lists' else StreamBackend()
+
+def _ids(tasks):
+    return sorted(task['id'] for task in tasks)
+
+async def _claim_all(backend, consumer):
+    """Claim until nothing is left; a list claim takes from one queue at a time"""
+    claimed = []
+    while True:
+        batch = await backend.claim(consumer, 10, timeout=0)
+        if not batch:
+            return claimed
+        claimed += batch
+
+def test_submitted_tasks_are_claimed_completed_and_answered(make_backend):
+    async def scenario():
+        backend = make_backend()
+        await backend.submit(_tasks(4))
+        assert await backend.depth() == 4
+        claimed = await _claim_all(backend, 'worker_0')
+        assert _ids(claimed) == _ids(_tasks(4))
+        assert all('receipt' in task and 'enqueued_at' in task for task in claimed)
+
+        results = [{'task_id': task['id'], 'type': 'routing', 'result': {}} for task in claimed]
+        await backend.complete('worker_0', claimed, results)
+        assert await backend.depth() == 0
+        assert await backend.claim('worker_1', 10, timeout=0) == []
+        assert await backend.reap() == {'requeued': 0, 'dead_lettered': 0}
+        return await backend.queue_manager.await_result('task_2', timeout=1)
+
+    assert asyncio.run(scenario())['task_id'] == 'task_2'
+
+def test_released_tasks_are_redelivered(make_backend):
+    async def scenario():
+        backend = make_backend()
+        await backend.submit(_tasks(2))
+        claimed = await _claim_all(backend, 'worker_0')
+        assert await backend.release('worker_0', claimed) == 2
+        redelivered = await _claim_all(backend, 'worker_1')
+        assert _ids(redelivered) == _ids(claimed)
+        # A released task's old receipt no longer refers to a delivery
+        assert await backend.release('worker_0', claimed) == 0
+
+    asyncio.run(scenario())
+
+def test_expired_tasks_are_reaped_then_dead_lettered(make_backend, monkeypatch):
+    monkeypatch.setattr(settings, 'VISIBILITY_TIMEOUT', 0)
+    monkeypatch.setattr(settings, 'MAX_DELIVERY_ATTEMPTS', 2)
+
+    async def scenario():
+        backend = make_backend()
+        await backend.submit(_tasks(1))
+        first = await backend.claim('worker_0', 1, timeout=0)
+        await asyncio.sleep(0.01)
+        assert await backend.reap() == {'requeued': 1, 'dead_lettered': 0}
+        second = await backend.claim('worker_1', 1, timeout=0)
+        assert _ids(first) == _ids(second) == ['task_0']
+        await asyncio.sleep(0.01)
+        assert await backend.reap() == {'requeued': 0, 'dead_lettered': 1}
+        assert await backend.claim('worker_0', 1, timeout=0) == []
+        assert await backend.queue_manager.get_queue_length(settings.DEAD_LETTER_QUEUE) == 1
+
+    asyncio.run(scenario())
+
+def test_stream_reaper_acks_entries_deleted_while_pending(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, 'VISIBILITY_TIMEOUT', 0)
+
+    async def scenario():
+        backend = StreamBackend()
+        client = backend.redis_client
+        await backend.submit(_tasks(2))
+        claimed = await backend.claim('worker_0', 2, timeout=0)
+        await client.xdel(backend.stream, claimed[0]['receipt'])
+        xautoclaim = client.xautoclaim
+
+        async def as_redis_6_2(*args, **kwargs):
+            # Redis 6.2 lists deleted entries with no fields
+            cursor, entries, deleted = await xautoclaim(*args, **kwargs)
+            return [cursor, [(entry_id, None) for entry_id in deleted] + entries]
+        monkeypatch.setattr(client, 'xautoclaim', as_redis_6_2)
+
+        assert await backend.reap() == {'requeued': 1, 'dead_lettered': 0}
+        assert (await client.xpending(backend.stream, backend.group))['pending'] == 0
+        return await backend.claim('worker_1', 5, timeout=0)
+
+    assert _ids(asyncio.run(scenario())) == ['task_1']
+
+def test_stream_is_trimmed_only_of_acked_entries(fake_redis, monkeypatch):
+    async def scenario():
+        backend = StreamBackend(maxlen=3)
+        client = backend.redis_client
+        xtrim = client.xtrim
+
+        async def exact_xtrim(*args, **kwargs):
+            # `~` trims whole radix tree nodes, so a stream this short is
+            # never trimmed; trim exactly to see which entries would go
+            return await xtrim(*args, **{**kwargs, 'approximate': False})
+        monkeypatch.setattr(client, 'xtrim', exact_xtrim)
+
+        await backend.submit(_tasks(6))
+        done = await backend.claim('worker_0', 2, timeout=0)
+        await backend.complete('worker_0', done, [])
+        held = await backend.claim('worker_0', 1, timeout=0)
+        # Over maxlen, but only the two acked entries can go
+        assert await backend.trim() == 2
+        assert await backend.trim() == 0
+        return held, await backend.redis_client.xrange(backend.stream)
+
+    held, remaining = asyncio.run(scenario())
+    assert [entry_id.decode('utf-8') for entry_id, _ in remaining[:1]] == [held[0]['receipt']]
+    assert len(remaining) == 4
@@ -0,0 +1,30 @@
+from src.utils import cache
+from src.utils.cache import TTLCache
+
+def test_hits_and_misses_are_counted():
+    lru = TTLCache(max_size=2)
+    assert lru.get('a') is None
+    lru.put('a', 1)
+    assert lru.get('a') == 1
+    assert lru.stats() == {'hits': 1, 'misses': 1, 'size': 1, 'hit_rate': 0.5}
+
+def test_least_recently_used_entry_is_evicted():
+    lru = TTLCache(max_size=2)
+    lru.put('a', 1)
+    lru.put('b', 2)
+    lru.get('a')
+    lru.put('c', 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (1, 3)
+    assert len(lru) == 2
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    lru = TTLCache(max_size=10, ttl=5)
+    lru.put('a', 1)
+    now[0] += 4.9
+    assert lru.get('a') == 1
+    now[0] += 0.2
+    assert lru.get('a') is None
+    assert len(lru) == 0
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import pytest
+from src.distributed.codec import BinaryCodec, JsonCodec, decode, get_codec
+
+ROUTING_RESULT = {
+    'task_id': 'task_3f2a_C1042_routing', 'type': 'routing',
+    'result': {'assigned_to': 'customer_service', 'priority': 'high',
+               'estimated_response_time': '15 minutes', 'channel': 'chat',
+               'routing_confidence': 0.61},
+    'processing_ms': 1.25, 'worker_id': 2
+}
+
+def test_binary_round_trip_is_compact():
+    payload = BinaryCodec().encode(ROUTING_RESULT)
+    assert payload[0] == 0x01
+    assert decode(payload) == ROUTING_RESULT
+    assert len(payload) < len(JsonCodec().encode(ROUTING_RESULT)) / 2
+
+def test_binary_round_trips_every_value_kind():
+    value = {
+        'small': 7, 'negative': -3, 'large': 2 ** 40, 'float': -0.5, 'none': None,
+        'flags': [True, False], 'nested': {'list': list(range(20)), 'unicode': 'café ☕'},
+        'long': 'x' * 300, 'many': {str(i): i for i in range(20)}, 'numpy': np.float64(0.25)
+    }
+    decoded = decode(BinaryCodec().encode(value))
+    assert decoded == {**value, 'numpy': 0.25}
+    assert type(decoded['flags'][0]) is bool
+
+def test_legacy_json_payloads_still_decode():
+    legacy = json.dumps(ROUTING_RESULT)
+    assert decode(legacy) == ROUTING_RESULT
+    assert decode(legacy.encode('utf-8')) == ROUTING_RESULT
+    assert decode(JsonCodec().encode(ROUTING_RESULT)) == ROUTING_RESULT
+
+def test_unencodable_values_fall_back_to_json():
+    payload = BinaryCodec().encode({'id': 2 ** 70})
+    assert payload.startswith(b'{')
+    assert decode(payload) == {'id': 2 ** 70}
+
+def test_unknown_formats_are_rejected():
+    with pytest.raises(ValueError):
+        decode(b'\x02\x80')
+    with pytest.raises(ValueError):
+        get_codec('pickle')
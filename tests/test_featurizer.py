@@ -0,0 +1,16 @@
+import numpy as np
+from src.models.featurizer import TextFeaturizer
+
+def test_featurizer_is_stateless_and_normalized():
+    texts = ["I received a damaged product", "Great service, very helpful support team!"]
+    features = TextFeaturizer().transform(texts)
+    assert features.shape == (2, 100)
+    assert features.dtype == np.float32
+    assert np.allclose(np.linalg.norm(features, axis=1), 1.0)
+    # A fresh instance hashes the same way, with no fitting
+    assert np.array_equal(TextFeaturizer().transform(texts[::-1]), features[::-1])
+
+def test_featurizer_handles_empty_and_missing_texts():
+    featurizer = TextFeaturizer(n_features=16)
+    assert featurizer.transform([]).shape == (0, 16)
+    assert not featurizer.transform(['', None]).any()
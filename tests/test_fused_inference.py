@@ -0,0 +1,15 @@
+import numpy as np
+import torch
+from src.models.fused_inference import FusedSentimentAnalyzer
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+def test_fused_forward_matches_eval_model():
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=100, hidden_size=64, num_classes=3).eval()
+    fused = FusedSentimentAnalyzer.from_model(model)
+    for batch_size in (1, 32):
+        X = torch.randn(batch_size, 100)
+        with torch.no_grad():
+            expected = model(X).numpy()
+        assert np.allclose(fused.predict_proba(X.numpy()), expected, atol=1e-6)
+    assert fused.predict_proba(np.zeros(100)).shape == (1, 3)
@@ -0,0 +1,54 @@
+from src.utils.instrumentation import Counter, Gauge, Histogram, REGISTRY, render
+
+def test_observations_land_in_buckets():
+    histogram = Histogram('test_latency_seconds', 'Test', buckets=(0.1, 1.0), label='kind', values=('a', 'b'))
+    try:
+        histogram.observe(0.05, 'a')
+        histogram.observe(0.1, 'a')  # Upper bounds are inclusive
+        histogram.observe(5.0, 'a')
+        histogram.observe_many(0.5, 3, 'b')
+        histogram.observe(1.0, 'unknown')  # Undeclared label values are dropped
+        assert histogram.snapshot('a') == ([2, 0, 1], 3, 5.15)
+        assert histogram.snapshot('b') == ([0, 3, 0], 3, 1.5)
+    finally:
+        REGISTRY.remove(histogram)
+
+def test_render_is_cumulative_text_format():
+    histogram = Histogram('test_size', 'Sizes', buckets=(1, 10))
+    try:
+        histogram.observe(3)
+        histogram.observe(30)
+        text = render([histogram])
+        assert text.splitlines() == [
+            '# HELP test_size Sizes',
+            '# TYPE test_size histogram',
+            'test_size_bucket{le="1.0"} 0',
+            'test_size_bucket{le="10.0"} 1',
+            'test_size_bucket{le="+Inf"} 2',
+            'test_size_sum 33.0',
+            'test_size_count 2'
+        ]
+        assert 'queue_wait_seconds_bucket{type="routing",le="+Inf"}' in render()
+    finally:
+        REGISTRY.remove(histogram)
+
+def test_gauges_and_counters_render():
+    gauge = Gauge('test_replicas', 'Replicas')
+    counter = Counter('test_decisions_total', 'Decisions', label='decision', values=('up', 'down'))
+    try:
+        gauge.set(3)
+        counter.inc(label='up')
+        counter.inc(2, label='up')
+        counter.inc(label='sideways')  # Undeclared label values are dropped
+        assert render([gauge, counter]).splitlines() == [
+            '# HELP test_replicas Replicas',
+            '# TYPE test_replicas gauge',
+            'test_replicas 3.0',
+            '# HELP test_decisions_total Decisions',
+            '# TYPE test_decisions_total counter',
+            'test_decisions_total{decision="up"} 3.0',
+            'test_decisions_total{decision="down"} 0.0'
+        ]
+    finally:
+        REGISTRY.remove(gauge)
+        REGISTRY.remove(counter)
@@ -0,0 +1,24 @@
+import asyncio
+from src.distributed.backends import MemoryBackend
+from src.distributed.local import LocalCluster
+from src.distributed.memory_queue_manager import MemoryQueueManager
+
+def test_process_pool_answers_submitted_tasks():
+    async def scenario():
+        backend = MemoryBackend(MemoryQueueManager())
+        cluster = LocalCluster(1, processes=True, backend=backend)
+        await cluster.start()
+        try:
+            tasks = [{'id': f'task_{i}', 'type': 'routing_feedback', 'data': {}} for i in range(3)]
+            await backend.submit(tasks)
+            results = await asyncio.gather(*(backend.queue_manager.await_result(task['id'], timeout=60)
+                                             for task in tasks))
+        finally:
+            await cluster.stop()
+        return results, await backend.queue_lengths()
+
+    results, lengths = asyncio.run(scenario())
+    assert [result['task_id'] for result in results] == ['task_0', 'task_1', 'task_2']
+    assert all(result['worker_id'] == 0 for result in results)
+    # Every task handed to the pool was acked
+    assert lengths == {'tasks': 0, 'local_pool': 0}
@@ -0,0 +1,60 @@
+import asyncio
+from src.distributed.config import settings
+from src.distributed.memory_queue_manager import MemoryQueueManager
+from src.distributed.queue_manager import SHARED_QUEUE
+
+def _tasks(n):
+    return [{'id': f'task_{i}', 'type': 'routing', 'data': {}} for i in range(n)]
+
+def test_claimed_tasks_are_redelivered_until_acked():
+    async def scenario():
+        queue_manager = MemoryQueueManager()
+        await queue_manager.push_many(SHARED_QUEUE, _tasks(3))
+        claimed = await queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 2, timeout=0)
+        assert [task['id'] for task in claimed] == ['task_0', 'task_1']
+        assert all('receipt' in task for task in claimed)
+
+        await queue_manager.ack('worker_0', claimed[:1])
+        assert await queue_manager.release('worker_0', claimed) == 1
+        # Released tasks go back to the front of the queue
+        retried = await queue_manager.claim_many(SHARED_QUEUE, 'worker_1', 10, timeout=0)
+        assert [task['id'] for task in retried] == ['task_1', 'task_2']
+
+        expired = await queue_manager.reap()
+        assert expired == {'requeued': 0, 'dead_lettered': 0}
+        assert await queue_manager.get_queue_length(SHARED_QUEUE) == 0
+    asyncio.run(scenario())
+
+def test_tasks_are_dead_lettered_after_max_attempts():
+    async def scenario():
+        queue_manager = MemoryQueueManager()
+        await queue_manager.push_task(SHARED_QUEUE, _tasks(1)[0])
+        for _ in range(settings.MAX_DELIVERY_ATTEMPTS):
+            claimed = await queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 1, timeout=0,
+                                                     visibility_timeout=0)
+            assert len(claimed) == 1
+            await queue_manager.reap()
+        assert await queue_manager.get_queue_length(SHARED_QUEUE) == 0
+        assert await queue_manager.get_queue_length(settings.DEAD_LETTER_QUEUE) == 1
+    asyncio.run(scenario())
+
+def test_results_reach_waiters_published_before_or_after():
+    async def scenario():
+        queue_manager = MemoryQueueManager()
+        await queue_manager.push_result({'task_id': 'early', 'result': 1})
+        waiting = asyncio.ensure_future(queue_manager.await_result('late', timeout=1))
+        await asyncio.sleep(0)
+        await queue_manager.push_result({'task_id': 'late', 'result': 2})
+        assert (await queue_manager.await_result('early', timeout=0))['result'] == 1
+        assert (await waiting)['result'] == 2
+        assert await queue_manager.await_result('missing', timeout=0.01) is None
+    asyncio.run(scenario())
+
+def test_blocking_claim_wakes_on_push():
+    async def scenario():
+        queue_manager = MemoryQueueManager()
+        claim = asyncio.ensure_future(queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 10, timeout=5))
+        await asyncio.sleep(0)
+        await queue_manager.push_many(SHARED_QUEUE, _tasks(2))
+        assert len(await asyncio.wait_for(claim, 1)) == 2
+    asyncio.run(scenario())
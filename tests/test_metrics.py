@@ -0,0 +1,33 @@
+import numpy as np
+from src.distributed.metrics import LATENCY_BOUNDS_MS, aggregate, estimate_percentiles, summarize
+
+def _bucket(outcomes):
+    # Redis returns hash values as strings
+    return {field: str(value) for field, value in aggregate(outcomes).items()}
+
+def test_percentiles_interpolate_within_buckets():
+    histogram = np.zeros(len(LATENCY_BOUNDS_MS))
+    histogram[np.searchsorted(LATENCY_BOUNDS_MS, 15)] = 100  # All in (10, 20]
+    estimates = estimate_percentiles(histogram)
+    assert estimates['p50'] == 15.0
+    assert 10 < estimates['p95'] < estimates['p99'] <= 20
+    assert estimate_percentiles(np.zeros(len(LATENCY_BOUNDS_MS)))['p99'] == 0.0
+
+def test_summary_merges_buckets():
+    fast = [{'type': 'sentiment_analysis', 'channel': 'chat', 'latency_ms': 3.0,
+             'ok': True, 'sentiment': 'positive'}] * 90
+    slow = [{'type': 'routing', 'channel': 'voice', 'latency_ms': 400.0, 'ok': False}] * 10
+    buckets = [_bucket(fast), _bucket(slow), {}]
+
+    summary = summarize(buckets, window_seconds=10)
+    assert summary['throughput'] == {'tasks_processed': 100, 'tasks_per_second': 10.0}
+    assert summary['error_rate'] == 0.1
+    assert summary['channels'] == {'chat': 90, 'voice': 10}
+    assert summary['sentiments'] == {'positive': 90}
+
+    sentiment = summary['latency']['by_task_type']['sentiment_analysis']
+    assert sentiment['count'] == 90 and sentiment['mean_ms'] == 3.0
+    assert 2 <= sentiment['p50_ms'] <= 5
+    routing = summary['latency']['by_channel']['voice']
+    assert routing['errors'] == 10
+    assert 200 <= routing['p99_ms'] <= 500
@@ -0,0 +1,46 @@
+import numpy as np
+from src.models.nlp_functions import SoftmaxClassifier
+
+def reference_gradient(theta, x, y):
+    """Per-sample cross-entropy gradient, one class at a time"""
+    logits = theta @ x
+    probs = np.exp(logits - logits.max())
+    probs /= probs.sum()
+    gradient = np.zeros_like(theta)
+    for i in range(len(theta)):
+        gradient[i] = (probs[i] - (1 if i == y else 0)) * x
+    return gradient
+
+def test_minibatch_update_is_mean_of_per_sample_gradients():
+    rng = np.random.default_rng(0)
+    classifier = SoftmaxClassifier(8, 3, learning_rate=0.1)
+    X = rng.normal(size=(64, 8))
+    y = rng.integers(0, 3, 64)
+    theta = classifier.theta.copy()
+    expected = theta - 0.1 * np.mean([reference_gradient(theta, X[i], y[i]) for i in range(64)], axis=0)
+
+    theta_buffer = classifier.theta
+    classifier.gradient_descent_update(X, y)
+    assert classifier.theta is theta_buffer
+    assert np.allclose(classifier.theta, expected)
+
+def test_single_sample_update_matches_paper_rule():
+    classifier = SoftmaxClassifier(4, 3, learning_rate=0.5)
+    x = np.array([1.0, -2.0, 0.5, 3.0])
+    expected = classifier.theta - 0.5 * reference_gradient(classifier.theta, x, 2)
+    classifier.gradient_descent_update(x, 2)
+    assert np.allclose(classifier.theta, expected)
+
+def test_momentum_and_l2():
+    rng = np.random.default_rng(1)
+    classifier = SoftmaxClassifier(4, 3, learning_rate=0.1, momentum=0.9, l2=0.01)
+    X = rng.normal(size=(16, 4))
+    y = rng.integers(0, 3, 16)
+    velocity = np.zeros_like(classifier.theta)
+    theta = classifier.theta.copy()
+    for _ in range(3):
+        gradient = np.mean([reference_gradient(theta, X[i], y[i]) for i in range(16)], axis=0)
+        velocity = 0.9 * velocity + gradient + 0.01 * theta
+        theta = theta - 0.1 * velocity
+        classifier.gradient_descent_update(X, y)
+    assert np.allclose(classifier.theta, theta)
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from src.distributed import async_queue_manager
+from src.distributed.async_queue_manager import AsyncQueueManager, ResultDispatcher
+from src.distributed.codec import JsonCodec, decode
+from src.distributed.config import settings
+from src.distributed.queue_manager import (
+    CONSUMERS, SHARED_QUEUE, QueueManager, lease_key, processing_list
+)
+
+def _result(task_id):
+    return {'task_id': task_id, 'type': 'routing', 'result': {'assigned_to': task_id}}
+
+def _tasks(n, prefix='task'):
+    return [{'id': f'{prefix}_{i}', 'type': 'routing', 'data': {'i': i}} for i in range(n)]
+
+def test_await_result_returns_the_reply_for_its_own_task(fake_redis):
+    queue_manager = QueueManager()
+    queue_manager.push_results([_result('task_1'), _result('task_0')])
+
+    assert queue_manager.await_result('task_0', timeout=1) == _result('task_0')
+    assert queue_manager.await_result('task_1', timeout=1) == _result('task_1')
+    assert queue_manager.await_result('task_2', timeout=0.1) is None
+
+def test_concurrent_waits_are_resolved_by_task_id(fake_redis):
+    async def scenario():
+        queue_manager = AsyncQueueManager()
+        waits = [asyncio.create_task(queue_manager.await_result(f'task_{i}', timeout=5))
+                 for i in range(3)]
+        await asyncio.sleep(0.1)
+        await queue_manager.push_results([_result('task_2'), _result('task_0')])
+        await queue_manager.push_result(_result('task_1'))
+        return await asyncio.gather(*waits)
+
+    assert asyncio.run(scenario()) == [_result(f'task_{i}') for i in range(3)]
+
+def test_push_many_and_pop_many_keep_fifo_order(fake_redis):
+    queue_manager = QueueManager()
+    assert queue_manager.push_many('tasks', _tasks(5), chunk_size=2) == 5
+
+    popped = queue_manager.pop_many('tasks', 3, timeout=0)
+    assert [task['id'] for task in popped] == ['task_0', 'task_1', 'task_2']
+    assert all('enqueued_at' in task for task in popped)
+    assert [task['id'] for task in queue_manager.pop_many('tasks', 10, timeout=0)] == ['task_3', 'task_4']
+    assert queue_manager.pop_many('tasks', 10, timeout=0) == []
+
+def test_pop_many_takes_from_the_first_non_empty_queue(fake_redis):
+    async def scenario():
+        queue_manager = AsyncQueueManager()
+        await queue_manager.push_many('worker_1', _tasks(2, 'sibling'))
+        await queue_manager.push_many('tasks', _tasks(2, 'shared'))
+        first = await queue_manager.pop_many(['worker_0', 'tasks', 'worker_1'], 5, timeout=0)
+        second = await queue_manager.pop_many(['worker_0', 'tasks', 'worker_1'], 5, timeout=0)
+        return [task['id'] for task in first], [task['id'] for task in second]
+
+    assert asyncio.run(scenario()) == (['shared_0', 'shared_1'], ['sibling_0', 'sibling_1'])
+
+def test_expired_leases_are_reaped_and_redelivered(fake_redis):
+    queue_manager = QueueManager()
+    queue_manager.push_many(SHARED_QUEUE, _tasks(3))
+    claimed = queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 2, timeout=0, visibility_timeout=30)
+    assert [task['id'] for task in claimed] == ['task_0', 'task_1']
+    assert fake_redis.llen(processing_list('worker_0')) == 2
+    # Leases that have not expired are left alone
+    assert queue_manager.reap() == {'requeued': 0, 'dead_lettered': 0}
+
+    queue_manager.ack('worker_0', claimed[:1])
+    fake_redis.zadd(lease_key('worker_0'), {claimed[1]['receipt']: 0})
+    assert queue_manager.reap() == {'requeued': 1, 'dead_lettered': 0}
+    assert fake_redis.llen(processing_list('worker_0')) == 0
+    assert fake_redis.sismember(CONSUMERS, 'worker_0') == 0
+
+    # The reaped task goes back to the consuming end, ahead of those still queued
+    redelivered = queue_manager.claim_many(SHARED_QUEUE, 'worker_1', 5, timeout=0)
+    assert [task['id'] for task in redelivered] == ['task_1', 'task_2']
+    assert redelivered[0]['receipt'] == claimed[1]['receipt']
+
+def test_release_counts_a_delivery_attempt(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_DELIVERY_ATTEMPTS', 3)
+    queue_manager = QueueManager(codec=JsonCodec())
+    queue_manager.push_task(SHARED_QUEUE, _tasks(1)[0])
+
+    for attempt in (1, 2):
+        claimed = queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 1, timeout=0)
+        assert queue_manager.release('worker_0', claimed) == 1
+        assert int(fake_redis.get('attempts:task_0')) == attempt
+        assert fake_redis.llen(SHARED_QUEUE) == 1
+    # Releasing an acked task is a no-op
+    claimed = queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 1, timeout=0)
+    queue_manager.ack('worker_0', claimed)
+    assert queue_manager.release('worker_0', claimed) == 0
+    assert int(fake_redis.get('attempts:task_0')) == 2
+
+def test_tasks_are_dead_lettered_after_max_attempts(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_DELIVERY_ATTEMPTS', 3)
+    queue_manager = QueueManager()
+    queue_manager.push_task(SHARED_QUEUE, _tasks(1)[0])
+
+    outcomes = []
+    for _ in range(3):
+        claimed = queue_manager.claim_many(SHARED_QUEUE, 'worker_0', 1, timeout=0, visibility_timeout=0)
+        assert len(claimed) == 1
+        time.sleep(0.01)
+        outcomes.append(queue_manager.reap())
+    assert outcomes[-1] == {'requeued': 0, 'dead_lettered': 1}
+    assert [outcome['requeued'] for outcome in outcomes[:-1]] == [1, 1]
+    assert fake_redis.llen(SHARED_QUEUE) == 0
+    dead = fake_redis.lrange(settings.DEAD_LETTER_QUEUE, 0, -1)
+    assert [decode(payload)['id'] for payload in dead] == ['task_0']
+    # The counter is dropped with the task
+    assert fake_redis.keys('attempts:*') == []
+
+def test_a_notification_without_a_payload_keeps_the_waiter(fake_redis):
+    async def scenario():
+        dispatcher = ResultDispatcher(async_queue_manager.get_redis_client())
+        waiter = asyncio.get_running_loop().create_future()
+        dispatcher.waiters['task_0'] = waiter
+        # Another reader already took the result
+        await dispatcher._deliver(['task_0'])
+        assert dispatcher.waiters == {'task_0': waiter} and not waiter.done()
+
+        await AsyncQueueManager().push_result(_result('task_0'))
+        await dispatcher._deliver(['task_0'])
+        assert dispatcher.waiters == {}
+        return await waiter
+
+    assert asyncio.run(scenario()) == _result('task_0')
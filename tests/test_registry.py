@@ -0,0 +1,58 @@
+import numpy as np
+import torch
+from sklearn.ensemble import RandomForestClassifier
+from src.models.intelligent_router import IntelligentRouter
+from src.models.registry import ModelRegistry
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+def _routing_data(n):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 3, n), rng.integers(1, 4, n), rng.integers(1, 4, n),
+                         rng.integers(0, 10, n), rng.uniform(0.5, 1.0, n)])
+    return X, rng.integers(0, 5, n)
+
+def test_router_round_trips_memory_mapped(tmp_path):
+    X, y = _routing_data(500)
+    router = IntelligentRouter(cache_size=0)
+    router.train(X, y)
+    registry = ModelRegistry(str(tmp_path))
+
+    assert registry.save_router(router) == 'v0001'
+    loaded = registry.load_router(cache_size=0)
+    arrays = loaded.compiled_model.arrays()
+    assert all(isinstance(arrays[field], np.memmap) for field in ('feature', 'threshold', 'value'))
+    np.testing.assert_array_equal(loaded.predict_proba(X), router.predict_proba(X))
+    np.testing.assert_array_equal(loaded.classes, router.classes)
+
+def test_loaded_router_retrains_on_the_published_window(tmp_path):
+    X, y = _routing_data(600)
+    router = IntelligentRouter(cache_size=0)
+    router.model = RandomForestClassifier(n_estimators=7, max_depth=4)
+    router.train(X, y)
+    registry = ModelRegistry(str(tmp_path))
+    registry.save_router(router)
+
+    loaded = registry.load_router(cache_size=0)
+    window_X, window_y = loaded.training_window()
+    np.testing.assert_array_equal(window_X, X)
+    np.testing.assert_array_equal(window_y, y)
+    assert loaded.model.get_params() == router.model.get_params()
+
+    loaded.update_routing_model({'request': {'channel': 'chat'}, 'correct_route': 'priority_support'})
+    assert loaded.retrain()
+    assert len(loaded.model.estimators_) == 7
+    assert loaded.online_stats()['window_size'] == 601
+
+def test_sentiment_round_trips_memory_mapped(tmp_path):
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=20, hidden_size=8, num_classes=3).eval()
+    registry = ModelRegistry(str(tmp_path))
+    registry.save_sentiment(model)
+    version = registry.save_sentiment(model)
+
+    assert registry.latest_version('sentiment') == version == 'v0002'
+    loaded = registry.load_sentiment()
+    assert not loaded.training
+    features = torch.randn(5, 20)
+    with torch.no_grad():
+        torch.testing.assert_close(loaded(features), model(features), rtol=0, atol=0)
@@ -0,0 +1,136 @@
+import time
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src.models.forest_compiler import CompiledForest
+from src.models.intelligent_router import IntelligentRouter
+
+@pytest.fixture(scope="module")
+def routing_data():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(0, 3, 2000),
+        rng.integers(1, 4, 2000),
+        rng.integers(1, 4, 2000),
+        rng.integers(0, 10, 2000),
+        rng.uniform(0.5, 1.0, 2000)
+    ])
+    y = rng.integers(0, 5, 2000)
+    return X, y
+
+def test_compiled_forest_matches_sklearn_predict_proba(routing_data):
+    X, y = routing_data
+    model = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_allclose(compiled.predict_proba(X[:1]), model.predict_proba(X[:1]))
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+def test_compiled_forest_round_trips_through_arrays(routing_data):
+    X, y = routing_data
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(model)
+    restored = CompiledForest.from_arrays(compiled.arrays())
+
+    np.testing.assert_array_equal(restored.predict_proba(X), compiled.predict_proba(X))
+
+def test_route_batch_matches_route_request(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter(cache_size=0)
+    router.train(X, y)
+    requests = [
+        {'channel': 'chat', 'priority': 'high', 'type': 'complaint',
+         'customer_history_length': 3, 'agent_availability': 0.7},
+        {'channel': 'voice', 'priority': 'low', 'type': 'feedback'},
+        {}
+    ]
+
+    assert router.route_batch(requests) == [router.route_request(r) for r in requests]
+
+def test_unknown_categories_are_rejected_by_both_paths(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter(cache_size=0)
+    router.train(X, y)
+    for request in ({'channel': 'fax'}, {'priority': 'urgent'}, {'type': 'spam'}):
+        with pytest.raises(ValueError):
+            router.route_request(request)
+        with pytest.raises(ValueError):
+            router.route_batch([{'channel': 'chat'}, request])
+    # Missing values take the default in both
+    missing = {'channel': None, 'priority': None, 'type': None}
+    assert router.route_batch([missing]) == [router.route_request(missing)]
+    assert router.route_request(missing)['routing_confidence'] == \
+        router.route_request({})['routing_confidence']
+
+def test_cached_decisions_are_invalidated_by_a_new_generation(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter(cache_size=10)
+    router.train(X, y)
+    request = {'channel': 'chat', 'priority': 'high', 'type': 'complaint'}
+    first = router.route_request(request)
+    assert router.route_request(request) == first
+    assert router.cache_stats()['hits'] == 1
+
+    # retrain() leaves the cache alone; the generation in the key keeps the
+    # new model from answering with its predecessor's entries
+    assert router.retrain()
+    router.route_request(request)
+    assert router.cache_stats() == {'hits': 1, 'misses': 2, 'size': 2, 'hit_rate': 1 / 3}
+
+def test_feedback_retrain_swaps_in_new_model(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter(feedback_window=500)
+    router.train(X, y)
+    request = {'channel': 'voice', 'priority': 'high', 'type': 'complaint',
+               'customer_history_length': 3, 'agent_availability': 0.9}
+    router.route_request(request)
+    generation = router.generation
+
+    # Flood the window with one answer for this request
+    for _ in range(500):
+        router.update_routing_model({'request': request, 'was_correct_routing': False,
+                                     'correct_route': 'automated_response'})
+    router.update_routing_model({'request': request, 'routed_to': 'nowhere'})
+    stats = router.online_stats()
+    assert stats['pending_feedback'] == 500 and stats['feedback_ignored'] == 1
+
+    # Only automated_response remains in the window, so it cannot be fit yet
+    assert not router.retrain()
+    router.update_routing_model({'request': {**request, 'channel': 'chat'},
+                                 'routed_to': 'general_support'})
+    assert router.retrain()
+    assert router.generation == generation + 1
+    assert router.online_stats()['pending_feedback'] == 0
+    # The cached decision belonged to the previous generation
+    assert router.route_request(request)['assigned_to'] == 'automated_response'
+
+def test_retrain_waits_for_a_minimum_window(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter(cache_size=0, min_retrain_examples=100)
+    for i in range(99):
+        router.update_routing_model({'request': {'customer_history_length': i}, 'correct_route': i % 5})
+    # An unfitted router (e.g. the worker's fallback) is not replaced by a
+    # forest fit on a handful of feedback rows
+    assert not router.retrain()
+    assert router.generation == 0
+    router.update_routing_model({'request': {}, 'correct_route': 0})
+    assert router.retrain()
+    assert router.generation == 1
+
+def test_background_learning_retrains_after_enough_feedback(routing_data):
+    X, y = routing_data
+    router = IntelligentRouter()
+    router.train(X, y)
+    router.start_online_learning(retrain_every=10, interval=None)
+    try:
+        for i in range(10):
+            router.update_routing_model({'request': {'customer_history_length': i},
+                                         'correct_route': i % 5})
+        deadline = time.monotonic() + 30
+        while router.online_stats()['retrains'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        router.stop_online_learning()
+    assert router.online_stats()['retrains'] == 1
+    assert router.generation == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import torch
+from src.models.sentiment_analyzer import SentimentAnalyzer
+
+def test_training_forward_matches_paper_softmax_and_is_differentiable():
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3)
+    x = torch.randn(5, 10)
+    probs = model(x)
+
+    features = model.feature_extraction(x).detach().numpy()
+    theta = model.softmax_classifier.theta.detach().numpy()
+    logits = features @ theta.T
+    expected = np.exp(logits - logits.max(axis=1, keepdims=True))
+    expected /= expected.sum(axis=1, keepdims=True)
+    assert torch.allclose(probs, torch.from_numpy(expected).float(), atol=1e-6)
+
+    torch.nn.functional.nll_loss(torch.log(probs), torch.tensor([0, 1, 2, 0, 1])).backward()
+    assert model.layer1.weight.grad is not None and model.layer1.weight.grad.abs().sum() > 0
+
+def test_training_and_inference_compute_the_same_function():
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3)
+    x = torch.randn(5, 10)
+    train_probs = model.train()(x)
+    with torch.no_grad():
+        eval_probs = model.eval()(x)
+    assert torch.allclose(train_probs, eval_probs, atol=1e-6)
+
+    # Every parameter used at inference is trained
+    torch.log(train_probs).sum().backward()
+    assert all(param.grad is not None for param in model.parameters())
+
+def test_theta_is_stored_once_as_the_inference_weight():
+    model = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3)
+    assert model.softmax_classifier.theta is model.layer3.weight
+    assert list(model.state_dict()) == ['layer1.weight', 'layer1.bias', 'layer2.weight',
+                                        'layer2.bias', 'layer3.weight']
+
+    # A loaded model's head keeps using the loaded weight
+    loaded = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3)
+    loaded.load_state_dict(model.state_dict(), assign=True)
+    assert loaded.softmax_classifier.theta is loaded.layer3.weight
+
+def test_update_weights_acts_on_the_inference_head():
+    model = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3)
+    before = model.layer3.weight.detach().clone()
+    model.update_weights(torch.randn(16, 10), torch.randint(0, 3, (16,)))
+    assert not torch.equal(model.layer3.weight, before)
+
+def test_quantized_copy_tracks_float_model():
+    torch.manual_seed(0)
+    model = SentimentAnalyzer(input_size=10, hidden_size=8, num_classes=3).eval()
+    quantized = model.quantized()
+    assert isinstance(model.layer1, torch.nn.Linear)
+    x = torch.randn(32, 10)
+    with torch.inference_mode():
+        assert torch.allclose(quantized(x), model(x), atol=0.05)
@@ -0,0 +1,49 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from src.data.stream import (
+    MESSAGE_TEMPLATES, due_slices, feed_queue, interaction_batches, interactions_to_tasks
+)
+from src.distributed.backends import MemoryBackend
+from src.distributed.memory_queue_manager import MemoryQueueManager
+
+def test_batches_are_chunked_and_continuous():
+    start = np.datetime64('2024-01-01T00:00:00')
+    chunks = list(interaction_batches(25, chunk_size=10, rate=2.0, start=start, seed=0))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    frame = pd.concat(chunks)
+    assert frame['timestamp'].dtype == 'datetime64[us]'
+    assert frame['timestamp'].iloc[0] == pd.Timestamp(start)
+    assert (frame['timestamp'].diff().dropna() == pd.Timedelta(milliseconds=500)).all()
+    assert frame['customer_id'].iloc[12] == 'CUST-0012'
+    for channel, message in zip(frame['channel'], frame['message']):
+        assert message in MESSAGE_TEMPLATES[channel]
+
+def test_poisson_arrivals_match_target_rate():
+    frame = pd.concat(interaction_batches(20000, chunk_size=5000, rate=100.0, poisson=True, seed=0))
+    gaps = frame['timestamp'].diff().dropna().dt.total_seconds()
+    assert gaps.min() >= 0
+    assert abs(gaps.mean() - 0.01) < 0.0005
+    assert abs(gaps.std() - 0.01) < 0.001  # Exponential: std equals mean
+
+def test_due_slices_and_tasks():
+    batches = interaction_batches(50, chunk_size=20, rate=100.0, seed=0)
+    slices = list(due_slices(batches, tick=0.1))
+    assert sum(len(frame) for _, frame in slices) == 50
+    assert [due for due, _ in slices] == sorted(due for due, _ in slices)
+    tasks = interactions_to_tasks(slices[0][1])
+    assert {task['type'] for task in tasks} == {'sentiment_analysis', 'routing'}
+    assert len(tasks) == 2 * len(slices[0][1])
+    assert tasks[0]['id'].replace('_sentiment', '_routing') == tasks[1]['id']
+
+def test_stream_can_start_at_the_epoch():
+    start = np.datetime64(0, 'us')
+    frame = next(interaction_batches(1, start=start, seed=0))
+    assert frame['timestamp'].iloc[0] == pd.Timestamp(0)
+
+def test_feed_queue_submits_through_the_backend():
+    backend = MemoryBackend(MemoryQueueManager())
+    batches = interaction_batches(30, chunk_size=10, rate=1000.0, seed=0)
+    report = asyncio.run(feed_queue(batches, backend, speedup=100.0))
+    assert report['events'] == 30
+    assert asyncio.run(backend.depth()) == 60
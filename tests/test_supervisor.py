@@ -0,0 +1,199 @@
+import asyncio
+import itertools
+import types
+from src.distributed import supervisor as supervisor_module
+from src.distributed.backends import MemoryBackend
+from src.distributed.memory_queue_manager import MemoryQueueManager
+from src.distributed.supervisor import (
+    RETIRE_GRACE_SECONDS, ScalingPolicy, Supervisor, desired_replicas, restart_delay
+)
+
+POLICY = ScalingPolicy(min_replicas=1, max_replicas=5, target_queue_depth=100, target_latency_ms=1000)
+
+def test_pool_scales_with_queue_depth():
+    assert desired_replicas(2, 200, 0, POLICY) == 2  # On target
+    assert desired_replicas(2, 210, 0, POLICY) == 2  # Within tolerance
+    assert desired_replicas(2, 600, 0, POLICY) == 5  # Capped at max_replicas
+    assert desired_replicas(2, 300, 0, POLICY) == 3
+    assert desired_replicas(4, 100, 0, POLICY) == 1
+    assert desired_replicas(3, 0, 0, POLICY) == 1  # Idle pools shrink to min_replicas
+    assert desired_replicas(0, 50, 0, POLICY) == 1
+
+def test_latency_can_scale_up_a_short_queue():
+    assert desired_replicas(2, 0, 2000, POLICY) == 4
+    # The larger of the two ratios wins
+    assert desired_replicas(2, 300, 2000, POLICY) == 4
+    assert desired_replicas(2, 300, 2000, POLICY._replace(target_latency_ms=0)) == 3
+
+def test_restart_backoff_doubles_up_to_the_cap():
+    policy = ScalingPolicy(restart_backoff=1, max_restart_backoff=10)
+    assert [restart_delay(n, policy) for n in range(6)] == [0, 1, 2, 4, 8, 10]
+
+def test_policy_reads_known_config_keys():
+    policy = ScalingPolicy.from_config({'min_replicas': 2, 'max_replicas': 8,
+                                        'target_cpu_utilization': 70, 'interval': 5})
+    assert (policy.min_replicas, policy.max_replicas, policy.interval) == (2, 8, 5)
+    assert policy.target_queue_depth == ScalingPolicy().target_queue_depth
+
+class FakeProcess:
+    """Stands in for a worker process; exits on SIGTERM unless told to hang"""
+    pids = itertools.count(100)
+
+    def __init__(self, target, args, name):
+        self.worker_id = args[0]
+        self.pid = None
+        self.exitcode = None
+        self.alive = False
+        self.hangs = False
+        self.terminated = self.killed = False
+
+    def start(self):
+        self.pid = next(self.pids)
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.terminated = True
+        if not self.hangs:
+            self.exit(-15)
+
+    def kill(self):
+        self.killed = True
+        self.exit(-9)
+
+    def join(self, timeout=None):
+        pass
+
+    def exit(self, code):
+        self.alive, self.exitcode = False, code
+
+class FakeContext:
+    def __init__(self):
+        self.processes = []
+
+    def Process(self, target, args, name):
+        self.processes.append(FakeProcess(target, args, name))
+        return self.processes[-1]
+
+class SupervisedBackend(MemoryBackend):
+    """The memory backend under another name (the supervisor refuses memory)"""
+
+    name = 'supervised'
+
+    def __init__(self):
+        super().__init__(MemoryQueueManager())
+        self.routed = []
+
+    async def set_workers(self, worker_ids):
+        self.routed.append(list(worker_ids))
+        return 0
+
+def _supervisor(monkeypatch, **policy):
+    monkeypatch.setattr(supervisor_module, 'CHECK_INTERVAL', 0.01)
+    supervisor = Supervisor(ScalingPolicy(**policy), backend=SupervisedBackend())
+    supervisor.context = FakeContext()
+    return supervisor
+
+def _clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(supervisor_module, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def _alive(supervisor):
+    return sorted(slot.worker_id for slot in supervisor.slots.values()
+                  if slot.process is not None and slot.process.is_alive())
+
+def test_scaling_starts_and_retires_workers_and_reroutes(monkeypatch):
+    supervisor = _supervisor(monkeypatch)
+    asyncio.run(supervisor.scale_to(3))
+    assert _alive(supervisor) == [0, 1, 2]
+
+    asyncio.run(supervisor.scale_to(1))
+    assert _alive(supervisor) == [0]
+    retired = supervisor.context.processes[1:]
+    assert all(process.terminated for process in retired)
+    assert supervisor.backend.routed == [[0, 1, 2], [0]]
+
+    # The lowest free ids are reused when scaling up again
+    asyncio.run(supervisor.scale_to(2))
+    assert _alive(supervisor) == [0, 1]
+    assert supervisor.backend.routed[-1] == [0, 1]
+
+def test_queue_depth_scales_the_pool_up(monkeypatch):
+    supervisor = _supervisor(monkeypatch, target_queue_depth=10, target_latency_ms=0)
+
+    async def scenario():
+        await supervisor.scale_to(1)
+        await supervisor.backend.submit([{'id': f'task_{i}', 'type': 'routing'} for i in range(30)])
+        await supervisor.evaluate()
+    asyncio.run(scenario())
+    assert _alive(supervisor) == [0, 1, 2]
+    assert supervisor.backend.routed[-1] == [0, 1, 2]
+
+def test_crashed_worker_is_restarted_after_backoff(monkeypatch):
+    now = _clock(monkeypatch)
+    supervisor = _supervisor(monkeypatch, restart_backoff=1, max_restart_backoff=60)
+    asyncio.run(supervisor.scale_to(1))
+
+    for attempt, delay in enumerate([1, 2, 4], start=2):
+        supervisor.slots[0].process.exit(1)
+        supervisor.check_workers()
+        assert _alive(supervisor) == []
+        now[0] += delay - 0.1
+        supervisor.check_workers()
+        assert _alive(supervisor) == []
+        now[0] += 0.1
+        supervisor.check_workers()
+        assert _alive(supervisor) == [0]
+        assert len(supervisor.context.processes) == attempt
+
+    # A worker that stays up long enough starts over at the first delay
+    now[0] += 60
+    supervisor.slots[0].process.exit(1)
+    supervisor.check_workers()
+    now[0] += 1
+    supervisor.check_workers()
+    assert _alive(supervisor) == [0]
+
+def test_retired_worker_that_ignores_sigterm_is_killed(monkeypatch):
+    now = _clock(monkeypatch)
+    supervisor = _supervisor(monkeypatch)
+    asyncio.run(supervisor.scale_to(2))
+    stuck = supervisor.slots[1].process
+    stuck.hangs = True
+
+    asyncio.run(supervisor.scale_to(1))
+    supervisor.check_workers()
+    assert stuck.terminated and stuck.is_alive() and supervisor.retiring
+
+    now[0] += RETIRE_GRACE_SECONDS
+    supervisor.check_workers()
+    assert stuck.killed and supervisor.retiring == []
+
+def test_run_supervises_until_stopped_then_shuts_every_worker_down(monkeypatch):
+    supervisor = _supervisor(monkeypatch, min_replicas=1, max_replicas=4, interval=0,
+                             target_queue_depth=10, target_latency_ms=0, scale_down_delay=0,
+                             restart_backoff=0.01)
+
+    async def scenario():
+        runner = asyncio.ensure_future(supervisor.run(initial_replicas=2))
+        await asyncio.sleep(0.2)
+        assert _alive(supervisor) == [0]  # An idle queue shrinks to min_replicas
+
+        await supervisor.backend.submit([{'id': f'task_{i}', 'type': 'routing'} for i in range(40)])
+        await asyncio.sleep(0.2)
+        assert _alive(supervisor) == [0, 1, 2, 3]
+        supervisor.slots[3].process.exit(1)  # Restarted by the loop
+        await asyncio.sleep(0.2)
+        assert _alive(supervisor) == [0, 1, 2, 3]
+
+        supervisor.stop()
+        await runner
+    asyncio.run(scenario())
+
+    processes = supervisor.context.processes
+    assert len(processes) == 6  # 2 initial, 3 scaled up, 1 restart
+    assert not any(process.is_alive() for process in processes)
+    assert supervisor.slots == {} and supervisor.retiring == []
@@ -0,0 +1,29 @@
+import torch
+from src.models.sentiment_analyzer import SentimentAnalyzer
+from src.training.train_sentiment import (HELD_OUT_MESSAGES, generate_sentiment_data, make_batch_loader,
+                                          seed_everything, train_sentiment_analyzer)
+
+def test_batch_loader_slices_every_sample_once():
+    X = torch.arange(10, dtype=torch.float32).reshape(10, 1)
+    y = torch.arange(10)
+    batches = list(make_batch_loader(X, y, batch_size=4, seed=0))
+    assert [len(batch_y) for _, batch_y in batches] == [4, 4, 2]
+    assert sorted(torch.cat([batch_y for _, batch_y in batches]).tolist()) == list(range(10))
+    assert all(torch.equal(batch_x[:, 0].long(), batch_y) for batch_x, batch_y in batches)
+
+def test_seeded_training_is_reproducible():
+    X = torch.randn(256, 20)
+    y = torch.randint(0, 3, (256,))
+
+    def train():
+        seed_everything(0)
+        model = SentimentAnalyzer(20, 8, 3)
+        train_sentiment_analyzer(model, make_batch_loader(X, y, batch_size=32, seed=0), num_epochs=2)
+        return model.state_dict()
+
+    first, second = train(), train()
+    assert all(torch.equal(first[key], second[key]) for key in first)
+
+def test_held_out_messages_never_appear_in_training_data():
+    texts, _ = generate_sentiment_data(1000)
+    assert not set(texts) & {text for text, _ in HELD_OUT_MESSAGES}
@@ -0,0 +1,71 @@
+import asyncio
+from src.distributed.backends import MemoryBackend
+from src.distributed.memory_queue_manager import MemoryQueueManager
+from src.distributed.worker import Worker
+
+def _tasks(types):
+    return [{'id': f'task_{i}', 'type': task_type, 'data': {'i': i}} for i, task_type in enumerate(types)]
+
+def _worker(**kwargs):
+    return Worker(0, backend=MemoryBackend(MemoryQueueManager()), **kwargs)
+
+def test_batch_fills_up_within_max_wait():
+    async def scenario():
+        worker = _worker(batch_size=4, max_wait_ms=1000)
+        await worker.backend.submit(_tasks(['routing'] * 2))
+
+        async def late_arrivals():
+            await asyncio.sleep(0.05)
+            await worker.backend.submit(_tasks(['routing'] * 3))
+        asyncio.ensure_future(late_arrivals())
+        full = await worker.collect_batch()
+
+        # A batch that cannot fill is cut off at max_wait
+        worker.max_wait = 0.05
+        rest = await worker.collect_batch()
+        return len(full), len(rest)
+
+    assert asyncio.run(scenario()) == (4, 1)
+
+def test_tasks_are_grouped_by_type_and_answered_in_order():
+    calls = []
+
+    async def routing(batch):
+        calls.append(('routing', [data['i'] for data in batch]))
+        return [{'route': data['i']} for data in batch]
+
+    async def sentiment(batch):
+        calls.append(('sentiment', [data['i'] for data in batch]))
+        return [{'sentiment': data['i']} for data in batch]
+
+    worker = _worker()
+    worker.process_routing_batch = routing
+    worker.process_sentiment_batch = sentiment
+    tasks = _tasks(['routing', 'sentiment_analysis', 'routing', 'unknown', 'sentiment_analysis'])
+    results = asyncio.run(worker.process_batch(tasks))
+
+    assert calls == [('routing', [0, 2]), ('sentiment', [1, 4])]
+    assert [result['task_id'] for result in results] == [task['id'] for task in tasks]
+    assert [result['result'] for result in results] == [
+        {'route': 0}, {'sentiment': 1}, {'route': 2},
+        {'error': 'Unknown task type: unknown'}, {'sentiment': 4}
+    ]
+    assert all(result['processing_ms'] >= 0 for result in results)
+
+def test_failed_batch_is_released_for_redelivery():
+    async def scenario():
+        worker = _worker(batch_size=3, max_wait_ms=0)
+
+        async def fail(tasks):
+            worker.stop()
+            raise RuntimeError('model crashed')
+        worker.process_batch = fail
+        await worker.backend.submit(_tasks(['routing'] * 3))
+        await worker.run()
+        return await worker.backend.queue_lengths()
+
+    assert asyncio.run(scenario()) == {'tasks': 3, 'worker_0': 0}
+
+def test_worker_config_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert _worker().router_config['cache_size']